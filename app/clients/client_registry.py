@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict, Optional
+
+from deputydev_core.clients.http.base_http_client import BaseHTTPClient
+from sanic import Sanic
+
+from app.clients.one_dev_client import OneDevClient
+from app.clients.web_client import WebClient
+
+
+class ClientRegistry:
+    """
+    App-scoped registry of HTTP clients, stored on `app.ctx.http_clients`.
+
+    Each upstream gets exactly one client (and so one pooled aiohttp session and connector) for the lifetime
+    of the server, so keep-alive connections and the DNS cache are reused across requests instead of paying
+    for a fresh TCP/TLS handshake on every backend round trip.
+
+    The stats count client lookups: `registry_hits` are lookups served by the existing client. Whether a request
+    then reuses a pooled connection is up to the client's connector.
+    """
+
+    ONE_DEV = "one_dev"
+    WEB = "web"
+
+    _factories: Dict[str, Callable[[], BaseHTTPClient]] = {
+        ONE_DEV: OneDevClient,
+        WEB: WebClient,
+    }
+
+    @classmethod
+    def _get_registry(cls) -> Dict[str, Any]:
+        app = Sanic.get_app()
+        if not hasattr(app.ctx, "http_clients"):
+            app.ctx.http_clients = {"clients": {}, "stats": {}}
+        return app.ctx.http_clients
+
+    @classmethod
+    def _get_client(cls, upstream: str) -> BaseHTTPClient:
+        registry = cls._get_registry()
+        stats = registry["stats"].setdefault(upstream, {"sessions_created": 0, "acquired": 0, "registry_hits": 0})
+        stats["acquired"] += 1
+        client: Optional[BaseHTTPClient] = registry["clients"].get(upstream)
+        if client is None:
+            client = cls._factories[upstream]()
+            registry["clients"][upstream] = client
+            stats["sessions_created"] += 1
+        else:
+            stats["registry_hits"] += 1
+        return client
+
+    @classmethod
+    def one_dev_client(cls) -> OneDevClient:
+        return cls._get_client(cls.ONE_DEV)
+
+    @classmethod
+    def web_client(cls) -> WebClient:
+        return cls._get_client(cls.WEB)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, int]]:
+        registry = cls._get_registry()
+        return {upstream: dict(stats) for upstream, stats in registry["stats"].items()}
+
+    @classmethod
+    async def close(cls) -> None:
+        registry = cls._get_registry()
+        clients: Dict[str, BaseHTTPClient] = registry["clients"]
+        for client in clients.values():
+            await client.close_session()
+        clients.clear()
@@ -11,6 +11,14 @@ from app.utils.response_headers_handler import handle_client_response
 from app.utils.util import get_common_headers
 
 
+class EmbeddingBatchError(Exception):
+    pass
+
+
+class RetryableEmbeddingError(EmbeddingBatchError):
+    """A batch the backend couldn't serve right now (rate limited or a server error), worth retrying later."""
+
+
 class OneDevClient(BaseHTTPClient):
     def __init__(self, config=None):
         if not config:
@@ -41,6 +49,8 @@ class OneDevClient(BaseHTTPClient):
         payload.update({"use_grace_period": ConfigManager.configs["USE_GRACE_PERIOD_FOR_EMBEDDING"]})
         headers = {**headers, **get_common_headers()}
         result = await self.post(url=self._host + path, json=payload, headers=headers)
+        if result.status_code == 429 or result.status_code >= 500:
+            raise RetryableEmbeddingError(f"Embedding request failed with status {result.status_code}")
         return result
 
     @handle_client_response
@@ -1,12 +1,14 @@
 from deputydev_core.clients.http.base_http_client import BaseHTTPClient
+from deputydev_core.utils.config_manager import ConfigManager
 
 
 class WebClient(BaseHTTPClient):
     def __init__(self, config=None):
-        timeout = 60
-        limit = 0
-        limit_per_host = 0
-        ttl_dns_cache = 10
+        web_client_config = (config or ConfigManager.configs or {}).get("WEB_CLIENT") or {}
+        timeout = web_client_config.get("TIMEOUT") or 60
+        limit = web_client_config.get("LIMIT") or 0
+        limit_per_host = web_client_config.get("LIMIT_PER_HOST") or 0
+        ttl_dns_cache = web_client_config.get("TTL_DNS_CACHE") or 10
         super().__init__(
             timeout=timeout,
             limit=limit,
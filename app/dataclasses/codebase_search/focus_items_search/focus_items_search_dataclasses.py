@@ -24,3 +24,6 @@ class FocusSearchParams(BaseModel):
     type: Optional[SearchKeywordType] = None
     keyword: str
     repo_path: str
+    # opaque id of the client session (e.g. one search box of one window) whose newer queries supersede this one,
+    # no supersession without it
+    search_session_id: Optional[str] = None
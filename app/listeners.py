@@ -1,4 +1,8 @@
+from app.clients.client_registry import ClientRegistry
+from app.services.embedding_cache_service import EmbeddingCacheService
 from app.services.mcp_service import McpService
+from app.services.process_pool_manager import ProcessPoolManager
+from app.services.repo_watcher_service import RepoWatcherService
 from app.utils.constants import ListenerEventTypes
 
 
@@ -10,6 +14,11 @@ async def close_server(app, _):
     if McpService.mcp_client:
         await McpService.mcp_client.dispose()
 
+    await ClientRegistry.close()
+    ProcessPoolManager.shutdown()
+    EmbeddingCacheService.close()
+    RepoWatcherService.stop_all()
+
 
 listeners = [
     (close_server, ListenerEventTypes.BEFORE_SERVER_STOP.value),
@@ -7,3 +7,7 @@ class UpdateVectorStoreParams(BaseModel):
     repo_path: str
     chunkable_files: Optional[List[str]] = []
     sync: Optional[bool] = False
+    # e.g. open editors and recently edited files, indexed ahead of the rest and signalled with PARTIAL_READY
+    priority_files: Optional[List[str]] = []
+    # send a full indexing status snapshot once, then only the files whose status changed
+    indexing_status_delta: Optional[bool] = False
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from deputydev_core.models.dao.weaviate.chunk_files import ChunkFiles
+from deputydev_core.models.dto.chunk_file_dto import ChunkFileDTO
+from deputydev_core.services.repository.base_weaviate_repository import (
+    BaseWeaviateRepository,
+)
+from deputydev_core.services.repository.dataclasses.main import (
+    WeaviateSyncAndAsyncClients,
+)
+from weaviate.classes.config import DataType, Property, Tokenization
+from weaviate.collections.classes.filters import Filter, _Filters
+
+
+class ChunkFilesRepository(BaseWeaviateRepository):
+    KEYWORD_TYPE_PROPERTIES: Dict[str, List[str]] = {
+        "class": ["classes"],
+        "function": ["functions"],
+        "file": ["file_path"],
+    }
+    FETCH_PAGE_SIZE = 1000
+    # chunk files are shared by every repo with the same file version, so each one lists the scopes of its repos
+    REPO_SCOPES_PROPERTY = "repo_scopes"
+    # concurrent object updates while tagging chunk files with a repo scope
+    UPDATE_CONCURRENCY = 32
+
+    def __init__(self, weaviate_client: WeaviateSyncAndAsyncClients) -> None:
+        super().__init__(weaviate_client, ChunkFiles.collection_name)
+
+    @staticmethod
+    def get_repo_scope(repo_path: str) -> str:
+        return hashlib.sha256(repo_path.encode()).hexdigest()[:16]
+
+    @classmethod
+    def to_dto(cls, uuid: Any, properties: Dict[str, Any]) -> ChunkFileDTO:
+        properties = {key: value for key, value in properties.items() if key != cls.REPO_SCOPES_PROPERTY}
+        return ChunkFileDTO(**properties, id=str(uuid))
+
+    @staticmethod
+    def _get_file_hashes_filter(files: List[Tuple[str, str]]) -> _Filters:
+        return Filter.any_of(
+            filters=[
+                Filter.all_of(
+                    filters=[
+                        Filter.by_property("file_path").equal(file_path),
+                        Filter.by_property("file_hash").equal(file_hash),
+                    ]
+                )
+                for file_path, file_hash in files
+            ]
+        )
+
+    async def ensure_repo_scopes_property(self) -> None:
+        """Adds the repo scopes property to collections created without it, existing objects are left untagged."""
+        await self.ensure_collection_connections()
+        collection_config = await self.async_collection.config.get()
+        if any(prop.name == self.REPO_SCOPES_PROPERTY for prop in collection_config.properties):
+            return
+        await self.async_collection.config.add_property(
+            Property(
+                name=self.REPO_SCOPES_PROPERTY,
+                data_type=DataType.TEXT_ARRAY,
+                tokenization=Tokenization.FIELD,
+                skip_vectorization=True,
+            )
+        )
+
+    async def add_repo_scope(self, repo_scope: str, files_and_hashes: Dict[str, str], batch_size: int = 200) -> int:
+        """Tags every chunk file of the given file versions with the repo scope. Returns how many were tagged."""
+        await self.ensure_collection_connections()
+        untagged_objects: List[Tuple[Any, List[str]]] = []
+        files = list(files_and_hashes.items())
+        for start in range(0, len(files), batch_size):
+            filters = self._get_file_hashes_filter(files[start : start + batch_size])
+            offset = 0
+            while True:
+                results = await self.async_collection.query.fetch_objects(
+                    filters=filters,
+                    limit=self.FETCH_PAGE_SIZE,
+                    offset=offset,
+                    return_properties=[self.REPO_SCOPES_PROPERTY],
+                )
+                for item in results.objects:
+                    repo_scopes = item.properties.get(self.REPO_SCOPES_PROPERTY) or []
+                    if repo_scope not in repo_scopes:
+                        untagged_objects.append((item.uuid, [*repo_scopes, repo_scope]))
+                if len(results.objects) < self.FETCH_PAGE_SIZE:
+                    break
+                offset += self.FETCH_PAGE_SIZE
+
+        for start in range(0, len(untagged_objects), self.UPDATE_CONCURRENCY):
+            await asyncio.gather(
+                *(
+                    self.async_collection.data.update(uuid=uuid, properties={self.REPO_SCOPES_PROPERTY: repo_scopes})
+                    for uuid, repo_scopes in untagged_objects[start : start + self.UPDATE_CONCURRENCY]
+                )
+            )
+        return len(untagged_objects)
+
+    async def search_by_keyword(
+        self, keyword: str, keyword_type: Optional[str], repo_scope: str, limit: int
+    ) -> List[ChunkFileDTO]:
+        """
+        Fetch chunk files of the repo scope whose classes, functions or file path contain the keyword. The filter
+        has a constant size, whatever the number of files in the repo.
+        """
+        await self.ensure_collection_connections()
+        if keyword_type:
+            properties = self.KEYWORD_TYPE_PROPERTIES[keyword_type]
+        else:
+            properties = [prop for props in self.KEYWORD_TYPE_PROPERTIES.values() for prop in props]
+        filters = Filter.all_of(
+            filters=[
+                Filter.by_property(self.REPO_SCOPES_PROPERTY).contains_any([repo_scope]),
+                Filter.any_of(filters=[Filter.by_property(prop).like(f"*{keyword}*") for prop in properties]),
+            ]
+        )
+        results = await self.async_collection.query.fetch_objects(filters=filters, limit=limit)
+        return [self.to_dto(item.uuid, item.properties) for item in results.objects]
+
+    async def get_chunk_files_by_file_hashes(
+        self, files_and_hashes: Dict[str, str], batch_size: int = 200
+    ) -> List[ChunkFileDTO]:
+        """Fetch every chunk file of the given file versions, querying `batch_size` files at a time."""
+        await self.ensure_collection_connections()
+        chunk_files: List[ChunkFileDTO] = []
+        files = list(files_and_hashes.items())
+        for start in range(0, len(files), batch_size):
+            filters = self._get_file_hashes_filter(files[start : start + batch_size])
+            offset = 0
+            while True:
+                results = await self.async_collection.query.fetch_objects(
+                    filters=filters, limit=self.FETCH_PAGE_SIZE, offset=offset
+                )
+                chunk_files.extend(self.to_dto(item.uuid, item.properties) for item in results.objects)
+                if len(results.objects) < self.FETCH_PAGE_SIZE:
+                    break
+                offset += self.FETCH_PAGE_SIZE
+        return chunk_files
+
+    async def delete_chunk_files_by_file_hashes(self, files_and_hashes: Dict[str, str], batch_size: int = 200) -> None:
+        """Delete every chunk file of the given file versions, `batch_size` files at a time."""
+        await self.ensure_collection_connections()
+        files = list(files_and_hashes.items())
+        for start in range(0, len(files), batch_size):
+            filters = self._get_file_hashes_filter(files[start : start + batch_size])
+            await self.async_collection.data.delete_many(where=filters)
@@ -5,11 +5,13 @@ from app.routes.chunks import chunks
 from app.routes.codebase_read import codebase_read
 from app.routes.diff_applicator import diff_applicator
 from app.routes.ide_review import review
+from app.routes.indexing import indexing
 from app.routes.initialization import initialization
 from app.routes.mcp import mcp
 from app.routes.ping import ping
 from app.routes.search import focus_search
 from app.routes.shutdown import shutdown
+from app.routes.stats import stats
 from app.routes.url import url_reader
 
 blueprints = [
@@ -23,6 +25,8 @@ blueprints = [
     url_reader,
     mcp,
     review,
+    stats,
+    indexing,
 ]
 
 v1_binary_blueprints = Blueprint.group(*blueprints, url_prefix="v1")
@@ -1,7 +1,7 @@
 import asyncio
 import json
 import traceback
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from deputydev_core.services.tools.focussed_snippet_search.dataclass.main import (
     DirectoryStructureParams,
@@ -16,8 +16,16 @@ from sanic.exceptions import BadRequest
 
 from app.models.dtos.update_vector_store_params import UpdateVectorStoreParams
 from app.services.batch_chunk_search_service import BatchSearchService
+from app.services.indexing_job_manager import (
+    IndexingJobCancelledError,
+    IndexingJobManager,
+    IndexingJobSubscriber,
+)
 from app.services.initialization_service import InitializationService
 from app.services.relevant_chunk_service import RelevantChunksService
+from app.services.relevant_chunks_session import RelevantChunksSession
+from app.utils.indexing_status_tracker import IndexingStatusMode, IndexingStatusTracker
+from app.utils.interactive_activity import interactive
 from app.utils.request_handlers import request_handler
 from app.utils.ripgrep_path import get_rg_path
 from app.utils.route_error_handler.error_type_handlers.tool_handler import ToolErrorHandler
@@ -51,6 +59,32 @@ async def relevant_chunks(request: Request, ws: Websocket) -> None:
         AppLogger.log_error(traceback.format_exc())
 
 
+@chunks.websocket("/relevant_chunks_session", name="relevant_chunks_session_ws")
+@request_handler
+@get_error_handler(special_handlers=[])
+async def relevant_chunks_session(request: Request, ws: Websocket) -> None:
+    """
+    Long-lived variant of /relevant_chunks: accepts many queries tagged with a request_id on one socket,
+    answers them as they complete and supports {"type": "CANCEL", "request_id": ...} to abort a query.
+    Every query is tracked as interactive activity, see RelevantChunksSession.
+    """
+    try:
+        await RelevantChunksSession(ws).run()
+    except Exception as e:  # noqa: BLE001
+        AppLogger.log_error(traceback.format_exc())
+        await ws.send(
+            json.dumps(
+                {
+                    "status": "FAILED",
+                    "error_code": 500,
+                    "error_type": "SERVER_ERROR",
+                    "error_message": f"Relevant chunks session failed due to: {str(e)}",
+                    "traceback": str(traceback.format_exc()),
+                }
+            )
+        )
+
+
 @chunks.route("/get-focus-chunks", methods=["POST"], name="get_focus_chunks")
 @request_handler
 @get_error_handler(special_handlers=[])
@@ -80,17 +114,39 @@ async def directory_format(_request: Request) -> HTTPResponse:
 @chunks.websocket("/update_chunks", name="update_chunks_ws")
 @request_handler
 @get_error_handler(special_handlers=[])
-async def update_vector_store(request: Request, ws: Websocket) -> None:
+async def update_vector_store(request: Request, ws: Websocket) -> None:  # noqa: C901
     try:
         data = await ws.recv()
         payload = json.loads(data)
         payload = UpdateVectorStoreParams(**payload)
         files_indexing_status = {}
-
-        async def indexing_progress_callback(progress: float, indexing_status: List[Dict[str, str]]) -> None:
-            nonlocal files_indexing_status
+        files_indexing_summary = None
+        indexing_status_tracker = IndexingStatusTracker() if payload.indexing_status_delta else None
+
+        def get_indexing_status_fields(
+            indexing_status: Dict[str, Dict[str, str]], indexing_summary: Optional[Dict[str, int]]
+        ) -> Dict[str, Any]:
+            if indexing_summary is not None:
+                # streamed indexing only has statuses for the batch in flight
+                return {
+                    "indexing_status": list(indexing_status.values()),
+                    "indexing_status_mode": IndexingStatusMode.BATCH,
+                    "indexing_summary": indexing_summary,
+                }
+            if not indexing_status_tracker:
+                return {"indexing_status": list(indexing_status.values())}
+            mode, changed_files = indexing_status_tracker.get_changes(indexing_status)
+            return {"indexing_status": changed_files, "indexing_status_mode": mode}
+
+        async def indexing_progress_callback(
+            progress: float,
+            indexing_status: Dict[str, Dict[str, str]],
+            indexing_summary: Optional[Dict[str, int]] = None,
+        ) -> None:
+            nonlocal files_indexing_status, files_indexing_summary
             """Sends progress updates to the WebSocket."""
             files_indexing_status = indexing_status
+            files_indexing_summary = indexing_summary
             await ws.send(
                 json.dumps(
                     {
@@ -98,7 +154,7 @@ async def update_vector_store(request: Request, ws: Websocket) -> None:
                         "status": "IN_PROGRESS",
                         "repo_path": payload.repo_path,
                         "progress": progress,
-                        "indexing_status": list(indexing_status.values()),
+                        **get_indexing_status_fields(indexing_status, indexing_summary),
                     }
                 )
             )
@@ -115,48 +171,69 @@ async def update_vector_store(request: Request, ws: Websocket) -> None:
                 )
             )
 
-        indexing_task, embedding_task = await InitializationService.update_chunks(
-            payload, indexing_progress_callback, embedding_progress_callback
+        async def partial_ready_callback(files: List[str]) -> None:
+            """Signals that the priority files are searchable, ahead of the rest of the repo."""
+            await ws.send(
+                json.dumps(
+                    {
+                        "task": "INDEXING",
+                        "status": "PARTIAL_READY",
+                        "repo_path": payload.repo_path,
+                        "files": files,
+                    }
+                )
+            )
+
+        # concurrent requests for the same repo share one indexing job, see IndexingJobManager
+        job = IndexingJobManager.submit(
+            payload,
+            InitializationService.update_chunks,
+            IndexingJobSubscriber(
+                indexing_progress_callback,
+                embedding_progress_callback if payload.sync else None,
+                partial_ready_callback if payload.priority_files else None,
+            ),
         )
-        indexing_done, embedding_done = False, False
-
-        if indexing_task or embedding_task:
-            while True:
-                if not indexing_done and indexing_task and indexing_task.done():
-                    indexing_done = True
-                    await ws.send(
-                        json.dumps(
-                            {
-                                "task": "INDEXING",
-                                "status": "COMPLETED",
-                                "repo_path": payload.repo_path,
-                                "progress": 100,
-                                "indexing_status": list(files_indexing_status.values()),
-                            }
-                        )
+        indexing_task, embedding_task = job.indexing_done, job.embedding_done if payload.sync else None
+        pending_tasks = {task for task in (indexing_task, embedding_task) if task}
+        while pending_tasks:
+            done_tasks, pending_tasks = await asyncio.wait(pending_tasks, return_when=asyncio.FIRST_COMPLETED)
+            for done_task in done_tasks:
+                # re-raises the failure of the indexing job
+                done_task.result()
+            if indexing_task in done_tasks:
+                await ws.send(
+                    json.dumps(
+                        {
+                            "task": "INDEXING",
+                            "status": "COMPLETED",
+                            "repo_path": payload.repo_path,
+                            "progress": 100,
+                            **get_indexing_status_fields(files_indexing_status, files_indexing_summary),
+                        }
                     )
-                if not embedding_done and embedding_task and embedding_task.done():
-                    embedding_done = True
-                    await ws.send(
-                        json.dumps(
-                            {
-                                "task": "EMBEDDING",
-                                "status": "COMPLETED",
-                                "repo_path": payload.repo_path,
-                                "progress": 100,
-                            }
-                        )
+                )
+            if embedding_task in done_tasks:
+                await ws.send(
+                    json.dumps(
+                        {
+                            "task": "EMBEDDING",
+                            "status": "COMPLETED",
+                            "repo_path": payload.repo_path,
+                            "progress": 100,
+                        }
                     )
-                if (not indexing_task or indexing_task.done()) and (not embedding_task or embedding_task.done()):
-                    break
-                await asyncio.sleep(0.5)
+                )
 
+    except IndexingJobCancelledError as error:
+        await ws.send(json.dumps({"status": "CANCELLED", "repo_path": payload.repo_path, "message": str(error)}))
     except Exception:  # noqa: BLE001
         await ws.send(json.dumps({"status": "FAILED", "message": traceback.format_exc()}))
 
 
 @chunks.route("/batch_chunks_search", methods=["POST"], name="batch_chunks_search")
 @get_error_handler(special_handlers=[ToolErrorHandler])
+@interactive
 async def get_autocomplete_keyword_type_chunks(_request: Request) -> HTTPResponse:
     payload = _request.json
     if not payload:
@@ -16,6 +16,7 @@ from sanic import Blueprint, HTTPResponse
 from sanic.exceptions import BadRequest
 from sanic.request import Request
 
+from app.utils.interactive_activity import interactive
 from app.utils.route_error_handler.error_type_handlers.tool_handler import ToolErrorHandler
 from app.utils.route_error_handler.route_error_handler import get_error_handler
 
@@ -24,6 +25,7 @@ codebase_read = Blueprint("codebase_read", url_prefix="")
 
 @codebase_read.route("/iteratively-read-file", methods=["POST"], name="iteratively_read_file")
 @get_error_handler(special_handlers=[ToolErrorHandler])
+@interactive
 async def read_file(_request: Request) -> HTTPResponse:
     json_body = _request.json
     if not json_body:
@@ -0,0 +1,39 @@
+import json
+
+from sanic import Blueprint, HTTPResponse, Request
+from sanic.exceptions import BadRequest
+
+from app.services.indexing_job_manager import IndexingJobManager
+from app.services.indexing_scheduler import IndexingScheduler
+
+indexing = Blueprint("indexing", url_prefix="indexing")
+
+
+@indexing.route("/status", methods=["GET"], name="indexing_status")
+async def indexing_status(_request: Request) -> HTTPResponse:
+    repo_path = _request.args.get("repo_path")
+    if not repo_path:
+        raise BadRequest("repo_path is required.")
+    return HTTPResponse(body=json.dumps({"data": IndexingJobManager.get_job_status(repo_path)}))
+
+
+@indexing.route("/cancel", methods=["POST"], name="cancel_indexing")
+async def cancel_indexing(_request: Request) -> HTTPResponse:
+    repo_path = (_request.json or {}).get("repo_path")
+    if not repo_path:
+        raise BadRequest("repo_path is required.")
+    cancelled_jobs = IndexingJobManager.cancel(repo_path)
+    return HTTPResponse(body=json.dumps({"data": {"repo_path": repo_path, "cancelled_jobs": len(cancelled_jobs)}}))
+
+
+@indexing.route("/allocation", methods=["GET"], name="indexing_allocation")
+async def indexing_allocation(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": IndexingScheduler.get_stats()}))
+
+
+@indexing.route("/focus", methods=["POST"], name="focus_indexing")
+async def focus_indexing(_request: Request) -> HTTPResponse:
+    # a null repo_path clears the focus
+    repo_path = (_request.json or {}).get("repo_path")
+    IndexingScheduler.set_focus(repo_path)
+    return HTTPResponse(body=json.dumps({"data": IndexingScheduler.get_stats()}))
@@ -17,9 +17,10 @@ from sanic.request import Request
 from app.dataclasses.codebase_search.focus_items_search.focus_items_search_dataclasses import (
     FocusSearchParams,
 )
-from app.services.codebase_search.focus_items_search.focus_items_search_service import (
-    FocusSearchService,
+from app.services.codebase_search.focus_items_search.focus_search_coordinator import (
+    FocusSearchCoordinator,
 )
+from app.utils.interactive_activity import interactive
 from app.utils.ripgrep_path import get_rg_path
 from app.utils.route_error_handler.error_type_handlers.tool_handler import ToolErrorHandler
 from app.utils.route_error_handler.route_error_handler import get_error_handler
@@ -30,7 +31,10 @@ focus_search = Blueprint("focus_search", url_prefix="")
 @focus_search.route("/get-focus-search-results", methods=["POST"], name="get_focus_search_results")
 async def get_focus_search_results(_request: Request) -> HTTPResponse:
     json_body = _request.json
-    chunks = await FocusSearchService.get_search_results(payload=FocusSearchParams(**json_body))
+    chunks = await FocusSearchCoordinator.get_search_results(payload=FocusSearchParams(**json_body))
+    if chunks is None:
+        # a newer request of the same search session superseded this one, its response is the one that matters
+        return HTTPResponse(body=json.dumps({"data": [], "superseded": True}))
     response = {
         "data": [chunk.model_dump(mode="json") for chunk in chunks],
     }
@@ -56,6 +60,7 @@ async def get_files_in_dir(_request: Request) -> HTTPResponse:
 
 @focus_search.route("/grep-search", methods=["POST"], name="grep_search")
 @get_error_handler(special_handlers=[ToolErrorHandler])
+@interactive
 async def grep_search(_request: Request) -> HTTPResponse:
     json_body = _request.json
     if not json_body:
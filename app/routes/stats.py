@@ -0,0 +1,74 @@
+import json
+
+from sanic import Blueprint, HTTPResponse, Request
+
+from app.clients.client_registry import ClientRegistry
+from app.services.adaptive_embedding_controller import AdaptiveEmbeddingController
+from app.services.chunkable_files_cache import ChunkableFilesCache
+from app.services.codebase_search.focus_items_search.focus_search_coordinator import (
+    FocusSearchCoordinator,
+)
+from app.services.cpu_governor import CpuGovernor
+from app.services.embedding_cache_service import EmbeddingCacheService
+from app.services.indexing_job_manager import IndexingJobManager
+from app.services.indexing_prefilter import IndexingPrefilter
+from app.services.relevant_chunks_cache import RelevantChunksCache
+from app.services.repo_watcher_service import RepoWatcherService
+from app.services.streaming_indexing_pipeline import StreamingIndexingPipeline
+
+stats = Blueprint("stats", url_prefix="stats")
+
+
+@stats.route("/http-clients", methods=["GET"], name="http_clients_stats")
+async def http_clients_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": ClientRegistry.get_stats()}))
+
+
+@stats.route("/relevant-chunks-cache", methods=["GET"], name="relevant_chunks_cache_stats")
+async def relevant_chunks_cache_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": RelevantChunksCache.get_stats()}))
+
+
+@stats.route("/embedding-cache", methods=["GET"], name="embedding_cache_stats")
+async def embedding_cache_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": EmbeddingCacheService.get_stats()}))
+
+
+@stats.route("/focus-search", methods=["GET"], name="focus_search_stats")
+async def focus_search_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": FocusSearchCoordinator.get_stats()}))
+
+
+@stats.route("/chunkable-files-cache", methods=["GET"], name="chunkable_files_cache_stats")
+async def chunkable_files_cache_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": ChunkableFilesCache.get_stats()}))
+
+
+@stats.route("/repo-watcher", methods=["GET"], name="repo_watcher_stats")
+async def repo_watcher_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": RepoWatcherService.get_stats()}))
+
+
+@stats.route("/indexing-jobs", methods=["GET"], name="indexing_jobs_stats")
+async def indexing_jobs_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": IndexingJobManager.get_stats()}))
+
+
+@stats.route("/embedding-controller", methods=["GET"], name="embedding_controller_stats")
+async def embedding_controller_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": AdaptiveEmbeddingController.get_stats()}))
+
+
+@stats.route("/streaming-indexing", methods=["GET"], name="streaming_indexing_stats")
+async def streaming_indexing_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": StreamingIndexingPipeline.get_stats()}))
+
+
+@stats.route("/indexing-prefilter", methods=["GET"], name="indexing_prefilter_stats")
+async def indexing_prefilter_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": IndexingPrefilter.get_stats()}))
+
+
+@stats.route("/cpu-governor", methods=["GET"], name="cpu_governor_stats")
+async def cpu_governor_stats(_request: Request) -> HTTPResponse:
+    return HTTPResponse(body=json.dumps({"data": CpuGovernor.get_stats()}))
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.clients.one_dev_client import EmbeddingBatchError, RetryableEmbeddingError
+
+EmbeddingBatchRunner = Callable[[List[str]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class AdaptiveEmbeddingController:
+    """
+    AIMD control of the embedding traffic to the backend, shared by every caller of `create_embedding`.
+
+    Texts are re-batched to the current batch size and at most `concurrency_limit` batches are in flight across
+    the server. Every batch that succeeds within TARGET_LATENCY_SECONDS grows the batch size by BATCH_SIZE_STEP and
+    the concurrency by about one per window of in-flight requests. A slow batch, or one failing with a rate limit,
+    server error or timeout, halves both and is retried with full-jitter exponential backoff. Any other failure
+    fails the call right away, cancelling its other batches.
+
+    Interactive calls, e.g. embedding a search query, skip the concurrency limit so they never queue behind
+    indexing, their batches still count as in flight for the others.
+    """
+
+    EMBEDDINGS_KEY = "embeddings"
+    TOKENS_USED_KEY = "tokens_used"
+    THROUGHPUT_WINDOW_SECONDS = 60
+
+    batch_size: Optional[float] = None
+    concurrency_limit: Optional[float] = None
+    in_flight = 0
+    _condition: Optional[asyncio.Condition] = None
+    # (finished_at, texts) of the batches finished within the throughput window
+    _finished_batches: Deque[Tuple[float, int]] = deque()
+    requests = 0
+    failures = 0
+    retries = 0
+    slow_requests = 0
+    texts_embedded = 0
+    total_latency_seconds = 0.0
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("EMBEDDING_CONTROLLER") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    def _get_bounds(cls) -> Tuple[int, int, int, int]:
+        controller_config = cls._get_config()
+        return (
+            controller_config.get("MIN_BATCH_SIZE") or 8,
+            controller_config.get("MAX_BATCH_SIZE") or 256,
+            controller_config.get("MIN_CONCURRENCY") or 1,
+            controller_config.get("MAX_CONCURRENCY") or 16,
+        )
+
+    @classmethod
+    def _get_batch_size(cls) -> int:
+        if cls.batch_size is None:
+            cls.batch_size = cls._get_config().get("INITIAL_BATCH_SIZE") or 64
+        return int(cls.batch_size)
+
+    @classmethod
+    def _get_concurrency_limit(cls) -> int:
+        if cls.concurrency_limit is None:
+            cls.concurrency_limit = cls._get_config().get("INITIAL_CONCURRENCY") or 4
+        return int(cls.concurrency_limit)
+
+    @classmethod
+    def _get_condition(cls) -> asyncio.Condition:
+        if cls._condition is None:
+            cls._condition = asyncio.Condition()
+        return cls._condition
+
+    @classmethod
+    def _on_success(cls, texts: int, latency_seconds: float) -> None:
+        controller_config = cls._get_config()
+        cls.texts_embedded += texts
+        cls.total_latency_seconds += latency_seconds
+        cls._finished_batches.append((time.monotonic(), texts))
+        cls._prune_finished_batches()
+        if latency_seconds > (controller_config.get("TARGET_LATENCY_SECONDS") or 5):
+            cls.slow_requests += 1
+            cls._decrease()
+            return
+        # waiting batches are admitted on the next release, there always is one while they wait
+        _min_batch_size, max_batch_size, _min_concurrency, max_concurrency = cls._get_bounds()
+        batch_size, concurrency_limit = cls._get_batch_size(), cls._get_concurrency_limit()
+        cls.batch_size = min(max_batch_size, batch_size + (controller_config.get("BATCH_SIZE_STEP") or 8))
+        cls.concurrency_limit = min(max_concurrency, (cls.concurrency_limit or 1) + 1 / concurrency_limit)
+
+    @classmethod
+    def _prune_finished_batches(cls) -> None:
+        now = time.monotonic()
+        while cls._finished_batches and now - cls._finished_batches[0][0] > cls.THROUGHPUT_WINDOW_SECONDS:
+            cls._finished_batches.popleft()
+
+    @classmethod
+    def _decrease(cls) -> None:
+        min_batch_size, _max_batch_size, min_concurrency, _max_concurrency = cls._get_bounds()
+        cls.batch_size = max(min_batch_size, cls._get_batch_size() / 2)
+        cls.concurrency_limit = max(min_concurrency, cls._get_concurrency_limit() / 2)
+
+    @classmethod
+    async def _run_batch(cls, texts: List[str], run_batch: EmbeddingBatchRunner, interactive: bool) -> Dict[str, Any]:
+        controller_config = cls._get_config()
+        max_retries = controller_config.get("MAX_RETRIES", 3)
+        base_backoff_seconds = controller_config.get("BASE_BACKOFF_SECONDS") or 0.5
+        max_backoff_seconds = controller_config.get("MAX_BACKOFF_SECONDS") or 10
+        condition = cls._get_condition()
+        attempt = 0
+        while True:
+            async with condition:
+                if not interactive:
+                    await condition.wait_for(lambda: cls.in_flight < cls._get_concurrency_limit())
+                cls.in_flight += 1
+            started_at = time.monotonic()
+            error: Optional[BaseException] = None
+            try:
+                cls.requests += 1
+                result = await run_batch(texts)
+                if not result or len(result.get(cls.EMBEDDINGS_KEY) or []) != len(texts):
+                    raise EmbeddingBatchError(f"Embedding response without {len(texts)} embeddings")
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:  # noqa: BLE001
+                error = ex
+            finally:
+                async with condition:
+                    cls.in_flight -= 1
+                    condition.notify_all()
+
+            if error is None:
+                cls._on_success(len(texts), time.monotonic() - started_at)
+                return result
+            cls.failures += 1
+            if not isinstance(error, (RetryableEmbeddingError, asyncio.TimeoutError)):
+                raise error
+            cls._decrease()
+            if attempt >= max_retries:
+                raise error
+            attempt += 1
+            cls.retries += 1
+            backoff_seconds = random.uniform(0, min(max_backoff_seconds, base_backoff_seconds * 2**attempt))
+            AppLogger.log_info(f"Embedding batch failed ({error}), retrying in {backoff_seconds:.2f}s")
+            await asyncio.sleep(backoff_seconds)
+
+    @classmethod
+    async def create_embeddings(
+        cls, texts: List[str], run_batch: EmbeddingBatchRunner, interactive: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Embeds the texts through `run_batch`, which sends one batch of texts to the backend. Returns the merged
+        response, or None once a batch failed.
+        """
+        if not cls.is_enabled():
+            return await run_batch(texts)
+        batch_size = cls._get_batch_size()
+        batch_tasks = [
+            asyncio.create_task(cls._run_batch(texts[start : start + batch_size], run_batch, interactive))
+            for start in range(0, len(texts), batch_size)
+        ]
+        try:
+            results = await asyncio.gather(*batch_tasks)
+        except BaseException as error:
+            # the call fails as a whole, don't leave the other batches running or retrying
+            for batch_task in batch_tasks:
+                batch_task.cancel()
+            if isinstance(error, (EmbeddingBatchError, asyncio.TimeoutError)):
+                AppLogger.log_error(f"Embedding failed: {error}")
+                return None
+            raise
+        merged_result = {**results[0], cls.EMBEDDINGS_KEY: [], cls.TOKENS_USED_KEY: 0}
+        for result in results:
+            merged_result[cls.EMBEDDINGS_KEY].extend(result[cls.EMBEDDINGS_KEY])
+            merged_result[cls.TOKENS_USED_KEY] += result.get(cls.TOKENS_USED_KEY) or 0
+        return merged_result
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        cls._prune_finished_batches()
+        successful_requests = cls.requests - cls.failures
+        return {
+            "batch_size": cls._get_batch_size(),
+            "concurrency_limit": cls._get_concurrency_limit(),
+            "in_flight": cls.in_flight,
+            "requests": cls.requests,
+            "failures": cls.failures,
+            "retries": cls.retries,
+            "slow_requests": cls.slow_requests,
+            "texts_embedded": cls.texts_embedded,
+            "avg_latency_seconds": cls.total_latency_seconds / successful_requests if successful_requests else 0.0,
+            "embeddings_per_second": sum(texts for _, texts in cls._finished_batches) / cls.THROUGHPUT_WINDOW_SECONDS,
+        }
@@ -1,4 +1,3 @@
-from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List
 
 from deputydev_core.services.initialization.extension_initialisation_manager import (
@@ -11,11 +10,12 @@ from deputydev_core.services.tools.focussed_snippet_search.dataclass.main import
 from deputydev_core.services.tools.focussed_snippet_search.focussed_snippet_search import (
     FocussedSnippetSearch,
 )
-from deputydev_core.utils.config_manager import ConfigManager
 from deputydev_core.utils.constants.enums import ContextValueKeys
 from deputydev_core.utils.weaviate import get_weaviate_client
 
-from app.clients.one_dev_client import OneDevClient
+from app.clients.client_registry import ClientRegistry
+from app.services.embedding_service import EmbeddingService
+from app.services.process_pool_manager import ProcessPoolManager
 from app.utils.ripgrep_path import get_rg_path
 
 
@@ -27,15 +27,14 @@ class BatchSearchService:
         """
         repo_path = payload.repo_path
         ripgrep_path = get_rg_path()
-        one_dev_client = OneDevClient()
-        with ProcessPoolExecutor(max_workers=ConfigManager.configs["NUMBER_OF_WORKERS"]) as executor:
-            initialisation_manager = ExtensionInitialisationManager(
-                repo_path=repo_path,
-                auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
-                process_executor=executor,
-                one_dev_client=one_dev_client,
-                ripgrep_path=ripgrep_path,
-            )
-            weaviate_client = await get_weaviate_client(initialisation_manager)
-            chunks = await FocussedSnippetSearch.search_code(payload, weaviate_client, initialisation_manager)
+        one_dev_client = EmbeddingService(ClientRegistry.one_dev_client())
+        initialisation_manager = ExtensionInitialisationManager(
+            repo_path=repo_path,
+            auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
+            process_executor=ProcessPoolManager.get_executor(),
+            one_dev_client=one_dev_client,
+            ripgrep_path=ripgrep_path,
+        )
+        weaviate_client = await get_weaviate_client(initialisation_manager)
+        chunks = await FocussedSnippetSearch.search_code(payload, weaviate_client, initialisation_manager)
         return chunks
@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from deputydev_core.services.initialization.extension_initialisation_manager import (
+    ExtensionInitialisationManager,
+)
+from deputydev_core.services.shared_chunks.shared_chunks_manager import (
+    SharedChunksManager,
+)
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.services.git_blob_hasher import GitBlobHasher
+from app.utils.git_utils import run_git
+
+FileStat = Tuple[int, int]
+
+
+class FileHashMode:
+    # hashes computed by deputydev_core
+    CONTENT = "CONTENT"
+    # git object IDs, see GitBlobHasher
+    GIT_BLOB = "GIT_BLOB"
+
+
+class RepoFilesSnapshot:
+    """
+    Chunkable files and hashes of a repo, with the git state and file stats they were computed from.
+
+    `files_and_hashes` is never mutated, a refresh that changes hashes replaces it, so it can be handed out
+    without a copy and its fingerprint computed once per change.
+    """
+
+    def __init__(self, git_dir: Path, git_common_dir: Path, path_prefix: str, files_and_hashes: Dict[str, str]) -> None:
+        self.git_dir = git_dir
+        # where the branch refs live, the main repo's git dir for a linked worktree
+        self.git_common_dir = git_common_dir
+        # repo_path relative to the root of the work tree, as `git status` reports paths from there
+        self.path_prefix = path_prefix
+        self.files_and_hashes = files_and_hashes
+        self.file_stats: Dict[str, Optional[FileStat]] = {}
+        self.dirty_files: Set[str] = set()
+        self.head: Tuple[str, int, int] = ("", -1, -1)
+        self.index_mtime = -1
+        self.checked_at = 0.0
+        self._fingerprint: Optional[str] = None
+
+    @staticmethod
+    def get_fingerprint_of(files_and_hashes: Dict[str, str]) -> str:
+        hasher = hashlib.sha256()
+        for file_path in sorted(files_and_hashes):
+            hasher.update(f"{file_path}\0{files_and_hashes[file_path]}\n".encode())
+        return hasher.hexdigest()
+
+    def get_fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = self.get_fingerprint_of(self.files_and_hashes)
+        return self._fingerprint
+
+    def set_files_and_hashes(self, files_and_hashes: Dict[str, str]) -> None:
+        self.files_and_hashes = files_and_hashes
+        self._fingerprint = None
+
+
+class ChunkableFilesCache:
+    """
+    Per-repo cache of the chunkable file -> hash map, so focus searches and updates don't re-walk and re-hash
+    the whole repo every time.
+
+    A snapshot is revalidated with cheap signals, cheapest first:
+    - a changed HEAD (checkout, commit, pull) changes the hash of every file, so the full map is recomputed;
+    - otherwise the files that were dirty at the last `git status` are stat'ed, as they are the ones being edited;
+    - when `.git/index` changed or DIRTY_CHECK_INTERVAL_SECONDS passed, `git status` finds newly dirty files.
+    Only files whose stat changed are rehashed. Repos that aren't git repos are not cached.
+
+    Hashes come from deputydev_core by default. With HASH_MODE set to GIT_BLOB, files are listed the same way
+    but clean tracked files take their blob ID from the git index instead. Switching modes changes every hash,
+    so a repo is re-indexed once after a switch.
+    """
+
+    _snapshots: Dict[str, RepoFilesSnapshot] = {}
+    _locks: Dict[str, asyncio.Lock] = {}
+    full_loads = 0
+    incremental_loads = 0
+    files_rehashed = 0
+    hits = 0
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("CHUNKABLE_FILES_CACHE") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    def get_hash_mode(cls) -> str:
+        return cls._get_config().get("HASH_MODE") or FileHashMode.CONTENT
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[FileStat]:
+        try:
+            file_stat = path.stat()
+        except OSError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    @classmethod
+    def _get_git_state(cls, git_dir: Path, git_common_dir: Path) -> Tuple[Tuple[str, int, int], int]:
+        # HEAD and the index are per worktree, branch refs are shared by every worktree of the repo
+        head_content = (git_dir / "HEAD").read_text().strip()
+        ref_stat = cls._stat(git_common_dir / head_content[5:]) if head_content.startswith("ref: ") else None
+        packed_refs_stat = cls._stat(git_common_dir / "packed-refs")
+        index_stat = cls._stat(git_dir / "index")
+        head = (
+            head_content,
+            ref_stat[0] if ref_stat else -1,
+            packed_refs_stat[0] if packed_refs_stat else -1,
+        )
+        return head, index_stat[0] if index_stat else -1
+
+    @classmethod
+    async def _get_dirty_files(cls, repo_path: str, path_prefix: str) -> Optional[Set[str]]:
+        output = await run_git(repo_path, "status", "--porcelain=v1", "-z", "--untracked-files=all", "--", ".")
+        if output is None:
+            return None
+        dirty_paths: List[str] = []
+        entries = output.decode(errors="replace").split("\0")
+        index = 0
+        while index < len(entries):
+            entry = entries[index]
+            index += 1
+            if len(entry) < 4:
+                continue
+            dirty_paths.append(entry[3:])
+            # renames and copies are followed by their source path
+            if entry[0] in "RC":
+                dirty_paths.append(entries[index])
+                index += 1
+        return {str(Path(path[len(path_prefix) :])) for path in dirty_paths if path.startswith(path_prefix)}
+
+    @classmethod
+    async def hash_files(cls, repo_path: str, ripgrep_path: str, file_paths: List[str]) -> Dict[str, str]:
+        """Hashes only the given files, with the configured hash mode."""
+        if cls.get_hash_mode() == FileHashMode.GIT_BLOB:
+            return await GitBlobHasher.hash_files(repo_path, ripgrep_path, file_paths)
+        initialization_manager = ExtensionInitialisationManager(repo_path=repo_path, ripgrep_path=ripgrep_path)
+        local_repo = initialization_manager.get_local_repo(chunkable_files=file_paths)
+        return await local_repo.get_chunkable_files_and_commit_hashes()
+
+    @classmethod
+    async def _hash_all_files(
+        cls, repo_path: str, ripgrep_path: str, dirty_files: Optional[Set[str]]
+    ) -> Dict[str, str]:
+        if cls.get_hash_mode() == FileHashMode.GIT_BLOB:
+            return await GitBlobHasher.get_files_and_hashes(repo_path, ripgrep_path, dirty_files)
+        return await SharedChunksManager.initialize_chunks(repo_path, ripgrep_path=ripgrep_path)
+
+    @classmethod
+    async def _load_snapshot(cls, repo_path: str, ripgrep_path: str) -> Optional[RepoFilesSnapshot]:
+        rev_parse_output = await run_git(
+            repo_path, "rev-parse", "--absolute-git-dir", "--git-common-dir", "--show-prefix"
+        )
+        if rev_parse_output is None:
+            return None
+        git_dir, git_common_dir, path_prefix = (rev_parse_output.decode().split("\n") + [""])[:3]
+        # the common dir is printed relative to repo_path unless it's elsewhere
+        git_common_dir_path = Path(repo_path) / git_common_dir
+
+        head, index_mtime = await asyncio.to_thread(cls._get_git_state, Path(git_dir), git_common_dir_path)
+        dirty_files = await cls._get_dirty_files(repo_path, path_prefix)
+        files_and_hashes = await cls._hash_all_files(repo_path, ripgrep_path, dirty_files)
+        snapshot = RepoFilesSnapshot(Path(git_dir), git_common_dir_path, path_prefix, dict(files_and_hashes))
+        snapshot.head, snapshot.index_mtime = head, index_mtime
+        snapshot.dirty_files = dirty_files or set()
+        snapshot.file_stats = await asyncio.to_thread(
+            lambda: {file_path: cls._stat(Path(repo_path) / file_path) for file_path in snapshot.dirty_files}
+        )
+        snapshot.checked_at = time.monotonic()
+        cls.full_loads += 1
+        return snapshot
+
+    @classmethod
+    async def _refresh_snapshot(cls, repo_path: str, ripgrep_path: str, snapshot: RepoFilesSnapshot) -> bool:
+        """Brings the snapshot up to date in place. Returns False if it has to be reloaded from scratch."""
+        head, index_mtime = await asyncio.to_thread(cls._get_git_state, snapshot.git_dir, snapshot.git_common_dir)
+        if head != snapshot.head:
+            return False
+
+        candidates = set(snapshot.dirty_files)
+        dirty_check_interval = cls._get_config().get("DIRTY_CHECK_INTERVAL_SECONDS") or 2
+        if index_mtime != snapshot.index_mtime or time.monotonic() - snapshot.checked_at > dirty_check_interval:
+            dirty_files = await cls._get_dirty_files(repo_path, snapshot.path_prefix)
+            if dirty_files is None:
+                return False
+            candidates |= dirty_files
+            snapshot.dirty_files = dirty_files
+            snapshot.index_mtime = index_mtime
+            snapshot.checked_at = time.monotonic()
+
+        current_stats = await asyncio.to_thread(
+            lambda: {file_path: cls._stat(Path(repo_path) / file_path) for file_path in candidates}
+        )
+        changed_files = [
+            file_path
+            for file_path, file_stat in current_stats.items()
+            if file_path not in snapshot.file_stats or snapshot.file_stats[file_path] != file_stat
+        ]
+        if not changed_files:
+            cls.hits += 1
+            return True
+
+        # stats are recorded before hashing, so a file modified while it is being hashed is picked up next time
+        snapshot.file_stats.update({file_path: current_stats[file_path] for file_path in changed_files})
+        existing_files = [file_path for file_path in changed_files if current_stats[file_path] is not None]
+        rehashed_files = await cls.hash_files(repo_path, ripgrep_path, existing_files) if existing_files else {}
+        files_and_hashes = dict(snapshot.files_and_hashes)
+        for file_path in changed_files:
+            files_and_hashes.pop(file_path, None)
+        files_and_hashes.update(rehashed_files)
+        snapshot.set_files_and_hashes(files_and_hashes)
+        cls.incremental_loads += 1
+        cls.files_rehashed += len(existing_files)
+        return True
+
+    @classmethod
+    async def get_chunkable_files_and_hashes(cls, repo_path: str, ripgrep_path: str) -> Dict[str, str]:
+        files_and_hashes, _ = await cls.get_chunkable_files_and_fingerprint(repo_path, ripgrep_path)
+        return dict(files_and_hashes)
+
+    @classmethod
+    async def get_chunkable_files_and_fingerprint(cls, repo_path: str, ripgrep_path: str) -> Tuple[Dict[str, str], str]:
+        """
+        The chunkable files and hashes with a fingerprint of them, for query paths that only read the map: it is
+        the snapshot's own map, which must not be mutated, and the fingerprint is computed once per snapshot change.
+        """
+        if not cls.is_enabled():
+            files_and_hashes = await cls._hash_all_files(repo_path, ripgrep_path, dirty_files=None)
+            return files_and_hashes, RepoFilesSnapshot.get_fingerprint_of(files_and_hashes)
+
+        async with cls._locks.setdefault(repo_path, asyncio.Lock()):
+            snapshot = cls._snapshots.get(repo_path)
+            try:
+                if snapshot is not None and not await cls._refresh_snapshot(repo_path, ripgrep_path, snapshot):
+                    snapshot = None
+            except Exception as ex:  # noqa: BLE001
+                AppLogger.log_error(f"Failed to revalidate chunkable files of {repo_path}: {ex}")
+                snapshot = None
+
+            if snapshot is None:
+                cls._snapshots.pop(repo_path, None)
+                snapshot = await cls._load_snapshot(repo_path, ripgrep_path)
+                if snapshot is None:
+                    files_and_hashes = await cls._hash_all_files(repo_path, ripgrep_path, dirty_files=None)
+                    return files_and_hashes, RepoFilesSnapshot.get_fingerprint_of(files_and_hashes)
+                cls._snapshots[repo_path] = snapshot
+            return snapshot.files_and_hashes, snapshot.get_fingerprint()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return {
+            "repos": len(cls._snapshots),
+            "hits": cls.hits,
+            "full_loads": cls.full_loads,
+            "incremental_loads": cls.incremental_loads,
+            "files_rehashed": cls.files_rehashed,
+        }
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from pathlib import Path, PurePath
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.dataclasses.codebase_search.focus_items_search.focus_items_search_dataclasses import (
+    FocusItem,
+    SearchKeywordType,
+)
+from app.utils.ripgrep_path import list_repo_files
+from app.utils.util import score_keyword_match
+
+
+class DirectoryEntry(NamedTuple):
+    path: str
+    name: str
+    lowered_name: str
+    depth: int
+
+
+def score_fuzzy_match(keyword: str, value: str) -> float:
+    """
+    Scores keywords whose characters appear in order, but not contiguously, in the value. Always ranks below a
+    substring match, and higher the more compact the matched span is.
+    """
+    position = -1
+    first_position = None
+    for char in keyword:
+        position = value.find(char, position + 1)
+        if position == -1:
+            return 0.0
+        if first_position is None:
+            first_position = position
+    if first_position is None:
+        return 0.0
+    span = position - first_position + 1
+    return 0.3 * len(keyword) / span
+
+
+class DirectoryIndex:
+    """Directories of a repo that contain at least one non-ignored file, with the mtimes they were indexed at."""
+
+    def __init__(self, entries: List[DirectoryEntry], mtimes: Dict[str, int]) -> None:
+        self.entries = entries
+        self.mtimes = mtimes
+        self.validated_at = time.monotonic()
+
+    def search(self, repo_path: str, keyword: str, limit: int) -> List[FocusItem]:
+        # scope the search exactly like the os.walk based search: the keyword's parent directory, if it exists
+        abs_repo_path = Path(repo_path)
+        abs_text_path = abs_repo_path / keyword
+        last_path_component = abs_text_path.name.lower()
+        search_dir = abs_text_path.parent if last_path_component else abs_repo_path
+        if not search_dir.exists():
+            search_dir = abs_repo_path
+        scope = os.path.relpath(search_dir, abs_repo_path)
+        scope_prefix = "" if scope == "." else scope + os.sep
+
+        scored_entries: List[Tuple[float, DirectoryEntry]] = []
+        for entry in self.entries:
+            if not entry.path.startswith(scope_prefix):
+                continue
+            score = score_keyword_match(last_path_component, entry.lowered_name) or score_fuzzy_match(
+                last_path_component, entry.lowered_name
+            )
+            if score:
+                scored_entries.append((score, entry))
+
+        scored_entries.sort(key=lambda scored_entry: (-scored_entry[0], scored_entry[1].depth, scored_entry[1].path))
+        return [
+            FocusItem(type=SearchKeywordType.DIRECTORY, value=entry.name, path=entry.path, score=score)
+            for score, entry in scored_entries[:limit]
+        ]
+
+
+class DirectoryIndexService:
+    """
+    Keeps one DirectoryIndex per repo, built in the background from `rg --files` so ignore rules are respected.
+
+    An index is revalidated at most every DIRECTORY_INDEX_REVALIDATE_SECONDS: adding, removing or renaming an entry
+    changes the mtime of its parent directory, so a changed mtime of any indexed directory (or of the root
+    .gitignore) triggers a rebuild. The stale index keeps serving requests until the new one is ready. A rebuild
+    drops the directories that no longer hold any file, and the index of a repo that no longer exists.
+
+    Only the indexes of the DIRECTORY_INDEX_MAX_REPOS most recently searched repos are kept.
+    """
+
+    _indexes: Dict[str, DirectoryIndex] = {}
+    _tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("DIRECTORY_INDEX_ENABLED", True)
+
+    @classmethod
+    def get_revalidate_interval(cls) -> float:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("DIRECTORY_INDEX_REVALIDATE_SECONDS") or 5
+
+    @classmethod
+    def get_max_cached_repos(cls) -> int:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("DIRECTORY_INDEX_MAX_REPOS") or 8
+
+    @classmethod
+    def _set_index(cls, repo_path: str, index: DirectoryIndex) -> None:
+        # dicts keep insertion order, so the first key is the least recently searched repo
+        cls._indexes.pop(repo_path, None)
+        cls._indexes[repo_path] = index
+        while len(cls._indexes) > cls.get_max_cached_repos():
+            del cls._indexes[next(iter(cls._indexes))]
+
+    @classmethod
+    def get_index(cls, repo_path: str) -> Optional[DirectoryIndex]:
+        """Returns the repo's index if it is built, and schedules a build or revalidation when one is due."""
+        index = cls._indexes.get(repo_path)
+        if index is not None:
+            cls._set_index(repo_path, index)
+        if repo_path not in cls._tasks:
+            if index is None:
+                cls._tasks[repo_path] = asyncio.create_task(cls._build_index(repo_path))
+            elif time.monotonic() - index.validated_at > cls.get_revalidate_interval():
+                cls._tasks[repo_path] = asyncio.create_task(cls._revalidate_index(repo_path, index))
+        return index
+
+    @classmethod
+    async def _build_index(cls, repo_path: str) -> None:
+        try:
+            if not await asyncio.to_thread(os.path.isdir, repo_path):
+                # the repo was removed or moved away
+                cls._indexes.pop(repo_path, None)
+                return
+            file_paths = await list_repo_files(repo_path)
+            index = await asyncio.to_thread(cls._create_index, repo_path, file_paths)
+            cls._set_index(repo_path, index)
+            AppLogger.log_info(f"Directory index built for {repo_path} with {len(index.entries)} directories")
+        except Exception as ex:  # noqa: BLE001
+            AppLogger.log_error(f"Failed to build directory index for {repo_path}: {ex}")
+        finally:
+            cls._tasks.pop(repo_path, None)
+
+    @classmethod
+    def _create_index(cls, repo_path: str, file_paths: List[str]) -> DirectoryIndex:
+        directories: Set[PurePath] = set()
+        for file_path in file_paths:
+            for parent in PurePath(file_path).parents:
+                if parent in directories or not parent.parts:
+                    break
+                directories.add(parent)
+
+        entries = [
+            DirectoryEntry(
+                path=str(directory),
+                name=directory.name,
+                lowered_name=directory.name.lower(),
+                depth=len(directory.parts),
+            )
+            for directory in directories
+        ]
+        paths_to_watch = [repo_path, str(Path(repo_path) / ".gitignore")]
+        paths_to_watch.extend(str(Path(repo_path) / entry.path) for entry in entries)
+        return DirectoryIndex(entries, cls._get_mtimes(paths_to_watch))
+
+    @classmethod
+    def _get_mtimes(cls, paths: List[str]) -> Dict[str, int]:
+        mtimes: Dict[str, int] = {}
+        for path in paths:
+            try:
+                mtimes[path] = Path(path).stat().st_mtime_ns
+            except OSError:
+                mtimes[path] = -1
+        return mtimes
+
+    @classmethod
+    async def _revalidate_index(cls, repo_path: str, index: DirectoryIndex) -> None:
+        try:
+            current_mtimes = await asyncio.to_thread(cls._get_mtimes, list(index.mtimes))
+            if current_mtimes == index.mtimes:
+                index.validated_at = time.monotonic()
+                return
+            await cls._build_index(repo_path)
+        except Exception as ex:  # noqa: BLE001
+            AppLogger.log_error(f"Failed to revalidate directory index for {repo_path}: {ex}")
+        finally:
+            cls._tasks.pop(repo_path, None)
@@ -18,9 +18,6 @@ from deputydev_core.services.repository.chunk_files_service import ChunkFilesSer
 from deputydev_core.services.repository.dataclasses.main import (
     WeaviateSyncAndAsyncClients,
 )
-from deputydev_core.services.shared_chunks.shared_chunks_manager import (
-    SharedChunksManager,
-)
 from deputydev_core.utils.app_logger import AppLogger
 from deputydev_core.utils.config_manager import ConfigManager
 from deputydev_core.utils.weaviate import get_weaviate_client
@@ -30,7 +27,13 @@ from app.dataclasses.codebase_search.focus_items_search.focus_items_search_datac
     FocusSearchParams,
     SearchKeywordType,
 )
+from app.repository.chunk_files_repository import ChunkFilesRepository
+from app.services.chunkable_files_cache import ChunkableFilesCache
+from app.services.codebase_search.focus_items_search.directory_index_service import DirectoryIndexService
+from app.services.codebase_search.focus_items_search.repo_scope_service import RepoScopeService
+from app.services.codebase_search.focus_items_search.symbol_index_service import SymbolIndexService
 from app.utils.ripgrep_path import get_rg_path
+from app.utils.util import score_keyword_match
 
 
 class FocusSearchService:
@@ -58,6 +61,14 @@ class FocusSearchService:
             List of matching directories
         """
         try:
+            max_results = 7
+
+            if DirectoryIndexService.is_enabled():
+                directory_index = DirectoryIndexService.get_index(repo_path)
+                if directory_index is not None:
+                    return directory_index.search(repo_path, keyword, max_results)
+
+            # the index is still being built, walk the file system instead
             results: List[FocusItem] = []
             seen_dirs: Set[str] = set()
 
@@ -70,8 +81,6 @@ class FocusSearchService:
             if not search_dir.exists():
                 search_dir = abs_repo_path
 
-            max_results = 7
-
             for root, dirs, _ in os.walk(search_dir, topdown=True):
                 for dir_name in dirs:
                     abs_current_dir_path = Path(root) / dir_name
@@ -156,13 +165,54 @@ class FocusSearchService:
     ) -> List[FocusItem]:
         focus_items_map: Dict[str, FocusItem] = {}
         for chunk_file_properties in raw_search_result:
-            chunk_file_dto = ChunkFileDTO(**chunk_file_properties.properties, id=str(chunk_file_properties.uuid))
+            chunk_file_dto = ChunkFilesRepository.to_dto(chunk_file_properties.uuid, chunk_file_properties.properties)
             score = getattr(chunk_file_properties.metadata, "score", 0.0)
             cls.add_chunk_file_to_focus_item_map(focus_items_map, chunk_file_dto, score, search_type)
 
         sorted_focus_items = sorted(focus_items_map.values(), key=lambda x: x.score, reverse=True)
         return sorted_focus_items
 
+    @classmethod
+    def get_chunk_file_score(
+        cls, chunk_file_dto: ChunkFileDTO, keyword: str, search_type: Optional[SearchKeywordType] = None
+    ) -> float:
+        values: List[str] = []
+        if search_type in (None, SearchKeywordType.CLASS):
+            values.extend(chunk_file_dto.classes or [])
+        if search_type in (None, SearchKeywordType.FUNCTION):
+            values.extend(chunk_file_dto.functions or [])
+        if search_type in (None, SearchKeywordType.FILE):
+            values.append(Path(chunk_file_dto.file_path).name)
+        return max((score_keyword_match(keyword, value) for value in values), default=0.0)
+
+    @classmethod
+    async def get_repo_scoped_search_results(
+        cls,
+        weaviate_client: WeaviateSyncAndAsyncClients,
+        payload: FocusSearchParams,
+        chunkable_files_and_hashes: Dict[str, str],
+    ) -> List[FocusItem]:
+        """
+        Search the chunk files tagged with the repo's scope (see RepoScopeService), so the filter has a constant
+        size. The fetch is over-fetched by REPO_SCOPED_OVERFETCH_FACTOR, as hits of older versions of the repo's
+        files, which keep their tag, are dropped.
+        """
+        search_config = ConfigManager.configs["AUTOCOMPLETE_SEARCH"]
+        limit = search_config["MAX_RECORDS_TO_RETURN"]
+        chunk_files = await ChunkFilesRepository(weaviate_client).search_by_keyword(
+            keyword=payload.keyword,
+            keyword_type=payload.type.value if payload.type else None,
+            repo_scope=ChunkFilesRepository.get_repo_scope(payload.repo_path),
+            limit=limit * (search_config.get("REPO_SCOPED_OVERFETCH_FACTOR") or 5),
+        )
+        focus_items_map: Dict[str, FocusItem] = {}
+        for chunk_file_dto in chunk_files:
+            if chunkable_files_and_hashes.get(chunk_file_dto.file_path) != chunk_file_dto.file_hash:
+                continue
+            score = cls.get_chunk_file_score(chunk_file_dto, payload.keyword, payload.type)
+            cls.add_chunk_file_to_focus_item_map(focus_items_map, chunk_file_dto, score, payload.type)
+        return sorted(focus_items_map.values(), key=lambda x: x.score, reverse=True)[:limit]
+
     @classmethod
     async def get_search_results(cls, payload: FocusSearchParams) -> List[FocusItem]:
         if not payload.keyword:
@@ -181,10 +231,33 @@ class FocusSearchService:
                 weaviate_client = await cls.initialise_weaviate_client(payload.repo_path)
                 chunk_files_service = ChunkFilesService(weaviate_client)
                 ripgrep_path = get_rg_path()
-                chunkable_files_and_hashes = await SharedChunksManager.initialize_chunks(
+                # read-only, see ChunkableFilesCache.get_chunkable_files_and_fingerprint
+                chunkable_files_and_hashes, _ = await ChunkableFilesCache.get_chunkable_files_and_fingerprint(
                     payload.repo_path, ripgrep_path=ripgrep_path
                 )
 
+                if SymbolIndexService.is_enabled():
+                    symbol_index = SymbolIndexService.get_index(
+                        payload.repo_path, weaviate_client, chunkable_files_and_hashes
+                    )
+                    if symbol_index is not None:
+                        result = symbol_index.search(
+                            payload.keyword,
+                            payload.type,
+                            ConfigManager.configs["AUTOCOMPLETE_SEARCH"]["MAX_RECORDS_TO_RETURN"],
+                            chunkable_files_and_hashes,
+                        )
+                        AppLogger.log_info(f"Total execution time: {time.perf_counter() - start_time:.6f} sec")
+                        return result
+
+                # until the repo's chunk files are tagged with its scope, the per-file filter below is used
+                if RepoScopeService.is_enabled() and RepoScopeService.is_ready(payload.repo_path):
+                    result = await cls.get_repo_scoped_search_results(
+                        weaviate_client, payload, chunkable_files_and_hashes
+                    )
+                    AppLogger.log_info(f"Total execution time: {time.perf_counter() - start_time:.6f} sec")
+                    return result
+
                 # now, based on whether the type is defined or not, get the chunks from weaviate via specific fuctions
                 raw_search_result = []
                 # TODO: This is fucking ugly. Both the conditions internally share more than 90% of the code. Just passing the type as a parameter would have been better.
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.dataclasses.codebase_search.focus_items_search.focus_items_search_dataclasses import (
+    FocusItem,
+    FocusSearchParams,
+)
+from app.services.codebase_search.focus_items_search.focus_items_search_service import (
+    FocusSearchService,
+)
+from app.utils.interactive_activity import interactive
+
+QueryKey = Tuple[str, Optional[str], str]
+SessionKey = Tuple[str, str]
+
+
+class SharedSearch:
+    """One running search execution and the number of requests waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[List[FocusItem]]") -> None:
+        self.task = task
+        self.subscribers = 0
+
+
+class PendingRequest:
+    def __init__(self, query_key: QueryKey, shared_search: SharedSearch) -> None:
+        self.query_key = query_key
+        self.shared_search = shared_search
+        self.waiter: "asyncio.Future[List[FocusItem]]" = asyncio.ensure_future(asyncio.shield(shared_search.task))
+        self.superseded = False
+
+
+class FocusSearchCoordinator:
+    """
+    Runs focus searches with superseding semantics per search session and repo: a newer request carrying the same
+    `search_session_id` for the same repo answers the older one right away, and the older search is cancelled
+    once no request is waiting on it anymore. Requests without a session id are never superseded, so concurrent
+    searches of different windows don't cancel each other. Identical concurrent queries, from any session, share
+    a single execution.
+    """
+
+    _shared_searches: Dict[QueryKey, SharedSearch] = {}
+    _pending_requests: Dict[SessionKey, PendingRequest] = {}
+    requests = 0
+    coalesced = 0
+    superseded = 0
+    cancelled = 0
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("SUPERSEDE_STALE_REQUESTS", True)
+
+    @classmethod
+    def _subscribe(cls, query_key: QueryKey, payload: FocusSearchParams) -> SharedSearch:
+        shared_search = cls._shared_searches.get(query_key)
+        if shared_search is None:
+            shared_search = SharedSearch(asyncio.create_task(FocusSearchService.get_search_results(payload)))
+            cls._shared_searches[query_key] = shared_search
+            shared_search.task.add_done_callback(lambda _task: cls._forget(query_key, shared_search))
+        else:
+            cls.coalesced += 1
+        shared_search.subscribers += 1
+        return shared_search
+
+    @classmethod
+    def _forget(cls, query_key: QueryKey, shared_search: SharedSearch) -> None:
+        if cls._shared_searches.get(query_key) is shared_search:
+            del cls._shared_searches[query_key]
+
+    @classmethod
+    def _unsubscribe(cls, shared_search: SharedSearch) -> None:
+        shared_search.subscribers -= 1
+        if shared_search.subscribers <= 0 and not shared_search.task.done():
+            shared_search.task.cancel()
+            cls.cancelled += 1
+
+    @classmethod
+    @interactive
+    async def get_search_results(cls, payload: FocusSearchParams) -> Optional[List[FocusItem]]:
+        """Returns the search results, or None if a newer request of the same search session superseded this one."""
+        if not cls.is_enabled():
+            return await FocusSearchService.get_search_results(payload)
+
+        cls.requests += 1
+        query_key = (payload.repo_path, payload.type.value if payload.type else None, payload.keyword)
+        session_key = (payload.search_session_id, payload.repo_path) if payload.search_session_id else None
+
+        # subscribe before releasing the previous request, so a repeated query keeps its execution alive
+        request = PendingRequest(query_key, cls._subscribe(query_key, payload))
+        if session_key is not None:
+            previous_request = cls._pending_requests.get(session_key)
+            cls._pending_requests[session_key] = request
+            if previous_request is not None and not previous_request.waiter.done():
+                previous_request.superseded = True
+                previous_request.waiter.cancel()
+
+        try:
+            return await request.waiter
+        except asyncio.CancelledError:
+            if request.superseded:
+                cls.superseded += 1
+                return None
+            raise
+        finally:
+            cls._unsubscribe(request.shared_search)
+            if session_key is not None and cls._pending_requests.get(session_key) is request:
+                del cls._pending_requests[session_key]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return {
+            "requests": cls.requests,
+            "coalesced": cls.coalesced,
+            "superseded": cls.superseded,
+            "cancelled": cls.cancelled,
+            "in_flight": len(cls._shared_searches),
+        }
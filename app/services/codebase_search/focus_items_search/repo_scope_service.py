@@ -0,0 +1,74 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+from deputydev_core.services.repository.dataclasses.main import (
+    WeaviateSyncAndAsyncClients,
+)
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.repository.chunk_files_repository import ChunkFilesRepository
+
+
+class RepoScopeService:
+    """
+    Tags the chunk files of each indexed repo snapshot with the repo's scope, so focus autocomplete filters on a
+    single repo_scopes value instead of one clause per file of the repo.
+
+    Migration: collections created before the property existed get it added on first use, and the chunk files a
+    repo already had are tagged by the first full snapshot indexed after start. Until then the repo isn't ready and
+    autocomplete keeps using the per-file filter. Chunk files of older file versions keep their tag, so callers
+    still check hits against the current file hashes.
+    """
+
+    _ready_repos: Set[str] = set()
+    _property_ensured = False
+    _property_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("REPO_SCOPED_FILTERING", True)
+
+    @classmethod
+    def is_ready(cls, repo_path: str) -> bool:
+        return repo_path in cls._ready_repos
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forgets every tag, e.g. once the vector store was wiped."""
+        cls._ready_repos.clear()
+        cls._property_ensured = False
+
+    @classmethod
+    async def _ensure_property(cls, chunk_files_repository: ChunkFilesRepository) -> None:
+        if cls._property_lock is None:
+            cls._property_lock = asyncio.Lock()
+        async with cls._property_lock:
+            if not cls._property_ensured:
+                await chunk_files_repository.ensure_repo_scopes_property()
+                cls._property_ensured = True
+
+    @classmethod
+    async def on_files_indexed(
+        cls,
+        repo_path: str,
+        weaviate_client: WeaviateSyncAndAsyncClients,
+        files_and_hashes: Dict[str, str],
+        is_full_snapshot: bool,
+    ) -> None:
+        """Tags the chunk files of the indexed files, a full snapshot makes the repo ready for scoped search."""
+        if not cls.is_enabled():
+            return
+        try:
+            chunk_files_repository = ChunkFilesRepository(weaviate_client)
+            await cls._ensure_property(chunk_files_repository)
+            tagged = await chunk_files_repository.add_repo_scope(
+                ChunkFilesRepository.get_repo_scope(repo_path), files_and_hashes
+            )
+        except Exception as ex:  # noqa: BLE001
+            AppLogger.log_error(f"Failed to tag chunk files of {repo_path} with its repo scope: {ex}")
+            return
+        if tagged:
+            AppLogger.log_info(f"Tagged {tagged} chunk files of {repo_path} with its repo scope")
+        if is_full_snapshot:
+            cls._ready_repos.add(repo_path)
@@ -0,0 +1,265 @@
+import asyncio
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from deputydev_core.models.dto.chunk_file_dto import ChunkFileData, ChunkFileDTO
+from deputydev_core.services.repository.dataclasses.main import (
+    WeaviateSyncAndAsyncClients,
+)
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.dataclasses.codebase_search.focus_items_search.focus_items_search_dataclasses import (
+    FocusItem,
+    SearchKeywordType,
+)
+from app.repository.chunk_files_repository import ChunkFilesRepository
+from app.utils.util import score_keyword_match
+
+
+class SymbolEntry(NamedTuple):
+    type: SearchKeywordType
+    value: str
+    file_path: str
+    file_hash: str
+    chunk_file: ChunkFileData
+
+
+class SymbolIndex:
+    """
+    In-memory substring index over the classes, functions and file names of a repo's chunk files.
+
+    Distinct lowercased values form a vocabulary with postings for every substring of up to three characters.
+    Keywords of up to three characters are resolved by their own postings, longer keywords by intersecting the
+    postings of their trigrams. A value and its postings are dropped once no indexed file references it.
+    """
+
+    GRAM_LENGTH = 3
+
+    def __init__(self) -> None:
+        self._vocabulary: Dict[str, int] = {}
+        self._values: Dict[int, str] = {}
+        self._entries: Dict[int, List[SymbolEntry]] = {}
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._next_value_id = 0
+        self._file_entries: Dict[str, List[SymbolEntry]] = {}
+        self.file_hashes: Dict[str, str] = {}
+
+    @classmethod
+    def _grams_of(cls, value: str) -> Set[str]:
+        return {
+            value[index : index + length]
+            for length in range(1, cls.GRAM_LENGTH + 1)
+            for index in range(len(value) - length + 1)
+        }
+
+    def _get_value_id(self, value: str) -> int:
+        lowered_value = value.lower()
+        value_id = self._vocabulary.get(lowered_value)
+        if value_id is not None:
+            return value_id
+        value_id = self._next_value_id
+        self._next_value_id += 1
+        self._vocabulary[lowered_value] = value_id
+        self._values[value_id] = lowered_value
+        self._entries[value_id] = []
+        for gram in self._grams_of(lowered_value):
+            self._grams[gram].add(value_id)
+        return value_id
+
+    def _remove_value(self, value_id: int) -> None:
+        lowered_value = self._values.pop(value_id)
+        del self._vocabulary[lowered_value]
+        del self._entries[value_id]
+        for gram in self._grams_of(lowered_value):
+            postings = self._grams[gram]
+            postings.discard(value_id)
+            if not postings:
+                del self._grams[gram]
+
+    def remove_file(self, file_path: str) -> None:
+        value_ids = {self._vocabulary[entry.value.lower()] for entry in self._file_entries.pop(file_path, [])}
+        for value_id in value_ids:
+            self._entries[value_id] = [entry for entry in self._entries[value_id] if entry.file_path != file_path]
+            if not self._entries[value_id]:
+                self._remove_value(value_id)
+        self.file_hashes.pop(file_path, None)
+
+    def set_file(self, file_path: str, file_hash: str, chunk_files: List[ChunkFileDTO]) -> None:
+        self.remove_file(file_path)
+        # files without chunk files aren't indexed in the vector store yet, leave them to be picked up by an update
+        if not chunk_files:
+            return
+
+        entries: List[SymbolEntry] = []
+        file_name = Path(file_path).name
+        for chunk_file_dto in chunk_files:
+            chunk_file_data = ChunkFileData(**chunk_file_dto.model_dump(mode="json"))
+            values_by_type = {
+                SearchKeywordType.CLASS: chunk_file_dto.classes or [],
+                SearchKeywordType.FUNCTION: chunk_file_dto.functions or [],
+                SearchKeywordType.FILE: [file_name],
+            }
+            for search_type, values in values_by_type.items():
+                for value in values:
+                    entry = SymbolEntry(search_type, value, file_path, file_hash, chunk_file_data)
+                    self._entries[self._get_value_id(value)].append(entry)
+                    entries.append(entry)
+        self._file_entries[file_path] = entries
+        self.file_hashes[file_path] = file_hash
+
+    def _get_candidate_value_ids(self, keyword: str) -> Set[int]:
+        if len(keyword) <= self.GRAM_LENGTH:
+            return set(self._grams.get(keyword, set()))
+        trigrams = {keyword[index : index + self.GRAM_LENGTH] for index in range(len(keyword) - self.GRAM_LENGTH + 1)}
+        postings = sorted((self._grams.get(trigram, set()) for trigram in trigrams), key=len)
+        if not postings[0]:
+            return set()
+        candidate_ids = set(postings[0]).intersection(*postings[1:])
+        return {value_id for value_id in candidate_ids if keyword in self._values[value_id]}
+
+    def search(
+        self,
+        keyword: str,
+        search_type: Optional[SearchKeywordType],
+        limit: int,
+        chunkable_files_and_hashes: Dict[str, str],
+    ) -> List[FocusItem]:
+        lowered_keyword = keyword.lower()
+        candidate_ids = sorted(
+            self._get_candidate_value_ids(lowered_keyword),
+            key=lambda value_id: (
+                -score_keyword_match(lowered_keyword, self._values[value_id]),
+                len(self._values[value_id]),
+            ),
+        )
+
+        focus_items_map: Dict[str, FocusItem] = {}
+        for value_id in candidate_ids:
+            for entry in self._entries[value_id]:
+                if search_type and entry.type != search_type:
+                    continue
+                # skip entries of files that changed since they were indexed
+                if chunkable_files_and_hashes.get(entry.file_path) != entry.file_hash:
+                    continue
+                key = f"{entry.type.value}_{entry.value}_{entry.file_path}"
+                if key not in focus_items_map:
+                    if len(focus_items_map) >= limit:
+                        continue
+                    focus_items_map[key] = FocusItem(
+                        type=entry.type,
+                        value=entry.value,
+                        path=entry.file_path,
+                        chunks=[],
+                        score=score_keyword_match(lowered_keyword, entry.value),
+                    )
+                focus_items_map[key].chunks.append(entry.chunk_file)
+            if len(focus_items_map) >= limit:
+                break
+        return list(focus_items_map.values())
+
+
+class SymbolIndexService:
+    """
+    Keeps one SymbolIndex per repo. An index is built lazily in the background on first use and is updated
+    incrementally whenever update_chunks re-indexes files, until then callers fall back to Weaviate.
+
+    Only the indexes of the SYMBOL_INDEX_MAX_REPOS most recently searched repos are kept.
+    """
+
+    _indexes: Dict[str, SymbolIndex] = {}
+    _build_tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("SYMBOL_INDEX_ENABLED", True)
+
+    @classmethod
+    def get_max_cached_repos(cls) -> int:
+        return ConfigManager.configs["AUTOCOMPLETE_SEARCH"].get("SYMBOL_INDEX_MAX_REPOS") or 8
+
+    @classmethod
+    def _set_index(cls, repo_path: str, index: SymbolIndex) -> None:
+        # dicts keep insertion order, so the first key is the least recently searched repo
+        cls._indexes.pop(repo_path, None)
+        cls._indexes[repo_path] = index
+        while len(cls._indexes) > cls.get_max_cached_repos():
+            del cls._indexes[next(iter(cls._indexes))]
+
+    @classmethod
+    def get_index(
+        cls,
+        repo_path: str,
+        weaviate_client: WeaviateSyncAndAsyncClients,
+        chunkable_files_and_hashes: Dict[str, str],
+    ) -> Optional[SymbolIndex]:
+        """Returns the repo's index if it is warm, otherwise starts building it and returns None."""
+        index = cls._indexes.get(repo_path)
+        if index is not None:
+            cls._set_index(repo_path, index)
+        elif repo_path not in cls._build_tasks:
+            cls._build_tasks[repo_path] = asyncio.create_task(
+                cls._build_index(repo_path, weaviate_client, dict(chunkable_files_and_hashes))
+            )
+        return index
+
+    @classmethod
+    async def _build_index(
+        cls, repo_path: str, weaviate_client: WeaviateSyncAndAsyncClients, chunkable_files_and_hashes: Dict[str, str]
+    ) -> None:
+        try:
+            index = SymbolIndex()
+            await cls._load_files(index, weaviate_client, chunkable_files_and_hashes)
+            cls._set_index(repo_path, index)
+            AppLogger.log_info(f"Symbol index built for {repo_path} with {len(index.file_hashes)} files")
+        except Exception as ex:  # noqa: BLE001
+            AppLogger.log_error(f"Failed to build symbol index for {repo_path}: {ex}")
+        finally:
+            cls._build_tasks.pop(repo_path, None)
+
+    @classmethod
+    async def _load_files(
+        cls, index: SymbolIndex, weaviate_client: WeaviateSyncAndAsyncClients, files_and_hashes: Dict[str, str]
+    ) -> None:
+        chunk_files = await ChunkFilesRepository(weaviate_client).get_chunk_files_by_file_hashes(files_and_hashes)
+        chunk_files_by_path: Dict[str, List[ChunkFileDTO]] = defaultdict(list)
+        for chunk_file_dto in chunk_files:
+            chunk_files_by_path[chunk_file_dto.file_path].append(chunk_file_dto)
+        for file_path, file_hash in files_and_hashes.items():
+            index.set_file(file_path, file_hash, chunk_files_by_path.get(file_path, []))
+
+    @classmethod
+    def on_files_removed(cls, repo_path: str, file_paths: List[str]) -> None:
+        """Drops files whose chunks were removed from the vector store."""
+        index = cls._indexes.get(repo_path)
+        if index is None:
+            return
+        for file_path in file_paths:
+            index.remove_file(file_path)
+
+    @classmethod
+    async def on_files_updated(
+        cls,
+        repo_path: str,
+        weaviate_client: WeaviateSyncAndAsyncClients,
+        files_and_hashes: Dict[str, str],
+        is_full_snapshot: bool,
+    ) -> None:
+        """Re-indexes the files whose hash changed and, for a full snapshot, drops files that no longer exist."""
+        index = cls._indexes.get(repo_path)
+        if index is None:
+            return
+        try:
+            if is_full_snapshot:
+                for file_path in [file_path for file_path in index.file_hashes if file_path not in files_and_hashes]:
+                    index.remove_file(file_path)
+            changed_files = {
+                file_path: file_hash
+                for file_path, file_hash in files_and_hashes.items()
+                if index.file_hashes.get(file_path) != file_hash
+            }
+            if changed_files:
+                await cls._load_files(index, weaviate_client, changed_files)
+        except Exception as ex:  # noqa: BLE001
+            AppLogger.log_error(f"Failed to update symbol index for {repo_path}: {ex}")
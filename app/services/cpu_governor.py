@@ -0,0 +1,161 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.services.process_pool_manager import ProcessPoolManager
+from app.utils.interactive_activity import InteractiveActivity
+from app.utils.throttled_executor import ThrottledExecutor
+
+
+class BackgroundState:
+    IDLE = "IDLE"
+    INDEXING_GOVERNED = "INDEXING_GOVERNED"
+    INDEXING_UNGOVERNED = "INDEXING_UNGOVERNED"
+
+
+class CpuGovernor:
+    """
+    Makes indexing yield the CPU to interactive requests. While any indexing job runs, its chunking tasks go
+    through ThrottledExecutors (see IndexingScheduler): as soon as an interactive request is in flight only
+    INTERACTIVE_CONCURRENCY of them run on the shared pool at once, leaving the other workers to the request.
+    Full speed resumes once no interactive request ran for RESUME_QUIET_SECONDS, or after MAX_THROTTLE_SECONDS
+    of continuous throttling, for at least MIN_FULL_SPEED_SECONDS, so a steady stream of requests can't starve
+    indexing.
+
+    The stats put the chunking throughput lost while throttled next to the interactive latencies with governed,
+    ungoverned (ENABLED false) and no indexing.
+    """
+
+    _active_jobs = 0
+    _task: Optional["asyncio.Task[None]"] = None
+    _executors: "weakref.WeakSet[ThrottledExecutor]" = weakref.WeakSet()
+    _indexing_started_at: Optional[float] = None
+    _throttled_at: Optional[float] = None
+    throttled = False
+    throttles = 0
+    forced_resumes = 0
+    indexing_seconds = 0.0
+    throttled_seconds = 0.0
+    tasks_finished_full_speed = 0
+    tasks_finished_throttled = 0
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("CPU_GOVERNOR") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    def get_indexing_concurrency(cls) -> int:
+        max_workers = ProcessPoolManager.get_max_workers()
+        if not cls.throttled:
+            return max_workers
+        return min(max_workers, cls._get_config().get("INTERACTIVE_CONCURRENCY", 1))
+
+    @classmethod
+    def add_executor(cls, executor: ThrottledExecutor) -> None:
+        """Registers an executor of indexing chunking tasks, whose limit changes when the governor throttles."""
+        cls._executors.add(executor)
+
+    @classmethod
+    def on_task_finished(cls) -> None:
+        if cls.throttled:
+            cls.tasks_finished_throttled += 1
+        else:
+            cls.tasks_finished_full_speed += 1
+
+    @classmethod
+    def _set_throttled(cls, throttled: bool) -> None:
+        if throttled == cls.throttled:
+            return
+        if throttled:
+            cls.throttles += 1
+            cls._throttled_at = time.monotonic()
+        elif cls._throttled_at is not None:
+            cls.throttled_seconds += time.monotonic() - cls._throttled_at
+            cls._throttled_at = None
+        cls.throttled = throttled
+        for executor in list(cls._executors):
+            executor.on_limit_changed()
+
+    @classmethod
+    async def _govern(cls) -> None:
+        governor_config = cls._get_config()
+        quiet_seconds = governor_config.get("RESUME_QUIET_SECONDS") or 0.5
+        max_throttle_seconds = governor_config.get("MAX_THROTTLE_SECONDS") or 30
+        min_full_speed_seconds = governor_config.get("MIN_FULL_SPEED_SECONDS") or 5
+        try:
+            while True:
+                await InteractiveActivity.wait_until_busy()
+                cls._set_throttled(True)
+                try:
+                    await asyncio.wait_for(InteractiveActivity.wait_until_idle(quiet_seconds), max_throttle_seconds)
+                    cls._set_throttled(False)
+                except asyncio.TimeoutError:
+                    cls.forced_resumes += 1
+                    cls._set_throttled(False)
+                    await asyncio.sleep(min_full_speed_seconds)
+        finally:
+            if cls._task is asyncio.current_task():
+                cls._set_throttled(False)
+
+    @classmethod
+    def on_indexing_started(cls) -> None:
+        cls._active_jobs += 1
+        if cls._active_jobs > 1:
+            return
+        cls._indexing_started_at = time.monotonic()
+        if not cls.is_enabled():
+            InteractiveActivity.background_state = BackgroundState.INDEXING_UNGOVERNED
+            return
+        InteractiveActivity.background_state = BackgroundState.INDEXING_GOVERNED
+        cls._task = asyncio.create_task(cls._govern())
+
+    @classmethod
+    def on_indexing_finished(cls) -> None:
+        cls._active_jobs -= 1
+        if cls._active_jobs:
+            return
+        if cls._indexing_started_at is not None:
+            cls.indexing_seconds += time.monotonic() - cls._indexing_started_at
+            cls._indexing_started_at = None
+        InteractiveActivity.background_state = BackgroundState.IDLE
+        if cls._task is not None:
+            cls._task.cancel()
+            cls._task = None
+        cls._set_throttled(False)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        now = time.monotonic()
+        indexing_seconds = cls.indexing_seconds + (
+            now - cls._indexing_started_at if cls._indexing_started_at is not None else 0
+        )
+        throttled_seconds = cls.throttled_seconds + (now - cls._throttled_at if cls._throttled_at is not None else 0)
+        full_speed_seconds = indexing_seconds - throttled_seconds
+        full_speed_rate = cls.tasks_finished_full_speed / full_speed_seconds if full_speed_seconds > 0 else 0.0
+        throttled_rate = cls.tasks_finished_throttled / throttled_seconds if throttled_seconds > 0 else 0.0
+        # chunking tasks the throttled time would have finished at the full speed rate
+        tasks_lost = max(0.0, (full_speed_rate - throttled_rate) * throttled_seconds)
+        full_speed_tasks = full_speed_rate * indexing_seconds
+        return {
+            "enabled": cls.is_enabled(),
+            "indexing": cls._active_jobs > 0,
+            "throttled": cls.throttled,
+            "indexing_concurrency": cls.get_indexing_concurrency(),
+            "queued_tasks": sum(executor.pending for executor in list(cls._executors)),
+            "throttles": cls.throttles,
+            "forced_resumes": cls.forced_resumes,
+            "indexing_seconds": round(indexing_seconds, 2),
+            "throttled_seconds": round(throttled_seconds, 2),
+            "chunking_tasks_per_second_full_speed": round(full_speed_rate, 2),
+            "chunking_tasks_per_second_throttled": round(throttled_rate, 2),
+            "estimated_chunking_tasks_lost": round(tasks_lost, 1),
+            "throughput_lost_fraction": round(tasks_lost / full_speed_tasks, 4) if full_speed_tasks else 0.0,
+            "interactive_latency": InteractiveActivity.get_latency_stats(),
+        }
@@ -0,0 +1,376 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.utils.constants import LOCAL_STORE_DIR
+
+EMBEDDING_CACHE_VERSION = 1
+
+
+class EmbeddingStore:
+    """
+    Persistent, size-bounded key -> embedding store backed by sqlite.
+
+    Vectors are stored as packed float32 arrays. Once the stored bytes exceed `max_bytes`, the least recently
+    used entries are evicted until the store is back under 90% of the budget. Repos reference the entries they
+    use, so entries no repo needs anymore can be garbage collected and sharing across repos can be measured.
+    """
+
+    # stay well below sqlite's limit on the number of bound parameters per statement
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, db_path: Path, max_bytes: int) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS repo_refs "
+            "(repo_path TEXT NOT NULL, key TEXT NOT NULL, last_seen REAL NOT NULL, PRIMARY KEY (repo_path, key))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS repo_refs_key ON repo_refs (key)")
+        self._connection.commit()
+        self.current_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        self.evictions = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        rows = []
+        with self._lock:
+            for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                batch = keys[start : start + self.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows.extend(
+                    self._connection.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                )
+            if rows:
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, key) for key, _ in rows]
+                )
+                self._connection.commit()
+        return {key: array("f", vector).tolist() for key, vector in rows}
+
+    def set_many(self, entries: Dict[str, List[float]]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in entries.items():
+            packed = array("f", vector).tobytes()
+            rows.append((key, packed, len(packed), now))
+        with self._lock:
+            for key, packed, size, last_access in rows:
+                existing = self._connection.execute("SELECT size FROM embeddings WHERE key = ?", (key,)).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, packed, size, last_access),
+                )
+                self.current_bytes += size - (existing[0] if existing else 0)
+            if self.current_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._connection.commit()
+
+    def _evict(self, target_bytes: int) -> None:
+        cursor = self._connection.execute("SELECT key, size FROM embeddings ORDER BY last_access ASC")
+        keys_to_delete = []
+        for key, size in cursor:
+            if self.current_bytes <= target_bytes:
+                break
+            keys_to_delete.append((key,))
+            self.current_bytes -= size
+        self._connection.executemany("DELETE FROM embeddings WHERE key = ?", keys_to_delete)
+        self._connection.executemany("DELETE FROM repo_refs WHERE key = ?", keys_to_delete)
+        self.evictions += len(keys_to_delete)
+
+    def add_refs(self, repo_path: str, keys: List[str]) -> Tuple[int, int]:
+        """
+        References the entries from a repo. Returns the count and bytes of the entries that were new to the repo
+        but already referenced by another one, i.e. that a per-repo store would have embedded again.
+        """
+        if not keys:
+            return 0, 0
+        shared_entries, shared_bytes = 0, 0
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                batch = keys[start : start + self.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT e.key, e.size FROM embeddings e WHERE e.key IN ({placeholders}) "
+                    "AND NOT EXISTS (SELECT 1 FROM repo_refs r WHERE r.key = e.key AND r.repo_path = ?) "
+                    "AND EXISTS (SELECT 1 FROM repo_refs r WHERE r.key = e.key AND r.repo_path != ?)",
+                    [*batch, repo_path, repo_path],
+                ).fetchall()
+                shared_entries += len(rows)
+                shared_bytes += sum(size for _, size in rows)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO repo_refs (repo_path, key, last_seen) VALUES (?, ?, ?)",
+                [(repo_path, key, now) for key in keys],
+            )
+            self._connection.commit()
+        return shared_entries, shared_bytes
+
+    def collect_garbage(self, ref_ttl_seconds: float, unreferenced_ttl_seconds: float) -> Dict[str, Any]:
+        """
+        Drops the references of repos that no longer exist on disk and the ones not renewed for `ref_ttl_seconds`,
+        then the entries no repo references that weren't used for `unreferenced_ttl_seconds`. Returns what was
+        collected along with the sharing figures of the remaining entries.
+        """
+        now = time.time()
+        with self._lock:
+            repo_paths = [row[0] for row in self._connection.execute("SELECT DISTINCT repo_path FROM repo_refs")]
+            removed_repo_paths = [repo_path for repo_path in repo_paths if not Path(repo_path).exists()]
+            self._connection.executemany(
+                "DELETE FROM repo_refs WHERE repo_path = ?", [(repo_path,) for repo_path in removed_repo_paths]
+            )
+            self._connection.execute("DELETE FROM repo_refs WHERE last_seen < ?", (now - ref_ttl_seconds,))
+            unreferenced_rows = self._connection.execute(
+                "SELECT key, size FROM embeddings WHERE last_access < ? AND key NOT IN (SELECT key FROM repo_refs)",
+                (now - unreferenced_ttl_seconds,),
+            ).fetchall()
+            self._connection.executemany(
+                "DELETE FROM embeddings WHERE key = ?", [(key,) for key, _ in unreferenced_rows]
+            )
+            collected_bytes = sum(size for _, size in unreferenced_rows)
+            self.current_bytes -= collected_bytes
+            referenced_entries, repo_refs, bytes_saved = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(refs.count), 0), COALESCE(SUM(e.size * (refs.count - 1)), 0) "
+                "FROM (SELECT key, COUNT(*) AS count FROM repo_refs GROUP BY key) refs "
+                "JOIN embeddings e ON e.key = refs.key"
+            ).fetchone()
+            self._connection.commit()
+        return {
+            "removed_repos": len(removed_repo_paths),
+            "collected_entries": len(unreferenced_rows),
+            "collected_bytes": collected_bytes,
+            "referenced_entries": referenced_entries,
+            "repo_refs": repo_refs,
+            "dedupe_ratio": repo_refs / referenced_entries if referenced_entries else 1.0,
+            "bytes_saved": bytes_saved,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class EmbeddingCacheService:
+    """
+    Local cache consulted before any `create_embedding` round trip to the backend.
+
+    Keys are derived from the embedding model, the hash of the text and a config version, so a model or config
+    change never returns a vector from a different embedding space.
+
+    Repo references are buffered and written in one batch REF_FLUSH_DELAY_SECONDS after the first pending one, off
+    the lookup path. A key is referenced once per repo between two garbage collections, which renew them all.
+    """
+
+    TEXTS_KEY = "texts"
+    EMBEDDINGS_KEY = "embeddings"
+
+    _store: Optional[EmbeddingStore] = None
+    _store_lock: Optional[asyncio.Lock] = None
+    # set once the store failed to open, the cache then stays off until restart
+    _store_error: Optional[str] = None
+    hits = 0
+    misses = 0
+    cross_repo_hits = 0
+    cross_repo_bytes_saved = 0
+    _last_garbage_collection_at = 0.0
+    _garbage_collection: Optional[Dict[str, Any]] = None
+    # repo path -> keys waiting to be referenced from the repo
+    _pending_refs: Dict[str, Set[str]] = {}
+    # repo path -> keys referenced from the repo since the latest garbage collection
+    _flushed_refs: Dict[str, Set[str]] = {}
+    _flush_task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("EMBEDDING_CACHE") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    async def _get_store(cls) -> Optional[EmbeddingStore]:
+        """The store, opened off the event loop on first use. None if it can't be opened, e.g. on a read-only disk."""
+        if cls._store is not None or cls._store_error is not None:
+            return cls._store
+        if cls._store_lock is None:
+            cls._store_lock = asyncio.Lock()
+        async with cls._store_lock:
+            if cls._store is None and cls._store_error is None:
+                cache_config = cls._get_config()
+                db_path = Path(cache_config.get("PATH") or LOCAL_STORE_DIR / "embedding_cache.sqlite3")
+                try:
+                    cls._store = await asyncio.to_thread(
+                        EmbeddingStore, db_path, max_bytes=cache_config.get("MAX_BYTES") or 512 * 1024 * 1024
+                    )
+                except (OSError, sqlite3.Error) as error:
+                    cls._store_error = str(error)
+                    AppLogger.log_error(f"Failed to open embedding cache at {db_path}, caching is off: {error}")
+        return cls._store
+
+    @classmethod
+    def get_namespace(cls) -> str:
+        embedding_config = ConfigManager.configs.get("EMBEDDING") or {}
+        model = embedding_config.get("MODEL", "")
+        dimension = embedding_config.get("DIMENSION", "")
+        config_version = cls._get_config().get("CONFIG_VERSION", "")
+        return f"{model}:{dimension}:{config_version}:{EMBEDDING_CACHE_VERSION}"
+
+    @classmethod
+    def get_key(cls, namespace: str, text: str) -> str:
+        return f"{namespace}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+    @classmethod
+    async def get_embeddings(cls, texts: List[str], repo_path: Optional[str] = None) -> Dict[str, List[float]]:
+        """
+        Returns the cached embedding of every text that has one, keyed by the text. The hits are referenced from
+        `repo_path` when given, e.g. while indexing a repo.
+        """
+        namespace = cls.get_namespace()
+        keys_to_texts = {cls.get_key(namespace, text): text for text in texts}
+        store = await cls._get_store()
+        try:
+            cached = await asyncio.to_thread(store.get_many, list(keys_to_texts)) if store else {}
+        except sqlite3.Error as error:
+            AppLogger.log_error(f"Failed to read embedding cache: {error}")
+            cached = {}
+        if repo_path and cached:
+            cls._add_refs(repo_path, list(cached))
+        cls.hits += len(cached)
+        cls.misses += len(keys_to_texts) - len(cached)
+        return {keys_to_texts[key]: vector for key, vector in cached.items()}
+
+    @classmethod
+    async def store_embeddings(
+        cls, texts_and_embeddings: Dict[str, List[float]], repo_path: Optional[str] = None
+    ) -> None:
+        namespace = cls.get_namespace()
+        entries = {cls.get_key(namespace, text): embedding for text, embedding in texts_and_embeddings.items()}
+        store = await cls._get_store()
+        if store is None:
+            return
+        try:
+            await asyncio.to_thread(store.set_many, entries)
+        except sqlite3.Error as error:
+            AppLogger.log_error(f"Failed to write embedding cache: {error}")
+            return
+        if repo_path:
+            cls._add_refs(repo_path, list(entries))
+        cls._schedule_garbage_collection()
+
+    @classmethod
+    def _add_refs(cls, repo_path: str, keys: List[str]) -> None:
+        flushed_refs = cls._flushed_refs.get(repo_path) or set()
+        new_keys = [key for key in keys if key not in flushed_refs]
+        if not new_keys:
+            return
+        cls._pending_refs.setdefault(repo_path, set()).update(new_keys)
+        if cls._flush_task is None or cls._flush_task.done():
+            cls._flush_task = asyncio.create_task(cls._flush_refs_later())
+
+    @classmethod
+    async def _flush_refs_later(cls) -> None:
+        await asyncio.sleep(cls._get_config().get("REF_FLUSH_DELAY_SECONDS") or 5)
+        await cls.flush_refs()
+
+    @classmethod
+    async def flush_refs(cls) -> None:
+        """Writes the pending repo references."""
+        pending_refs, cls._pending_refs = cls._pending_refs, {}
+        store = await cls._get_store()
+        if store is None:
+            return
+        for repo_path, keys in pending_refs.items():
+            try:
+                shared_entries, shared_bytes = await asyncio.to_thread(store.add_refs, repo_path, list(keys))
+            except sqlite3.Error as error:
+                AppLogger.log_error(f"Failed to reference embedding cache entries from {repo_path}: {error}")
+                continue
+            cls._flushed_refs.setdefault(repo_path, set()).update(keys)
+            cls.cross_repo_hits += shared_entries
+            cls.cross_repo_bytes_saved += shared_bytes
+
+    @classmethod
+    def _schedule_garbage_collection(cls) -> None:
+        cache_config = cls._get_config()
+        now = time.monotonic()
+        if cls._last_garbage_collection_at and now - cls._last_garbage_collection_at < (
+            cache_config.get("GC_INTERVAL_SECONDS") or 3600
+        ):
+            return
+        cls._last_garbage_collection_at = now
+        asyncio.create_task(cls.collect_garbage())
+
+    @classmethod
+    async def collect_garbage(cls) -> None:
+        cache_config = cls._get_config()
+        # entries only referenced by pending refs would look unreferenced
+        await cls.flush_refs()
+        # references not renewed since would expire, let the repos renew the ones they still use
+        cls._flushed_refs = {}
+        store = await cls._get_store()
+        if store is None:
+            return
+        try:
+            cls._garbage_collection = await asyncio.to_thread(
+                store.collect_garbage,
+                ref_ttl_seconds=cache_config.get("REF_TTL_SECONDS") or 30 * 24 * 3600,
+                unreferenced_ttl_seconds=cache_config.get("UNREFERENCED_TTL_SECONDS") or 7 * 24 * 3600,
+            )
+        except sqlite3.Error as error:
+            AppLogger.log_error(f"Failed to garbage collect embedding cache: {error}")
+            return
+        AppLogger.log_info(f"Embedding cache garbage collection: {cls._garbage_collection}")
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        store = cls._store
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "bytes": store.current_bytes if store else 0,
+            "max_bytes": store.max_bytes if store else None,
+            "evictions": store.evictions if store else 0,
+            "store_error": cls._store_error,
+            "cross_repo_hits": cls.cross_repo_hits,
+            "cross_repo_bytes_saved": cls.cross_repo_bytes_saved,
+            # as of the latest garbage collection
+            "garbage_collection": cls._garbage_collection,
+        }
+
+    @classmethod
+    def close(cls) -> None:
+        if cls._flush_task is not None:
+            cls._flush_task.cancel()
+            cls._flush_task = None
+        if cls._store is not None:
+            for repo_path, keys in cls._pending_refs.items():
+                try:
+                    cls._store.add_refs(repo_path, list(keys))
+                except sqlite3.Error as error:
+                    AppLogger.log_error(f"Failed to reference embedding cache entries from {repo_path}: {error}")
+            cls._pending_refs = {}
+            cls._store.close()
+            cls._store = None
@@ -0,0 +1,55 @@
+from typing import Any, Dict, Optional
+
+from app.clients.one_dev_client import OneDevClient
+from app.services.adaptive_embedding_controller import AdaptiveEmbeddingController
+from app.services.embedding_cache_service import EmbeddingCacheService
+from app.services.indexing_job_manager import IndexingJobManager
+
+
+class EmbeddingService:
+    """
+    The OneDevClient handed to deputydev_core's embedding and initialisation managers. `create_embedding` serves
+    whatever the local embedding cache has, sends the remaining texts to the backend through the
+    AdaptiveEmbeddingController and accounts them to the current indexing job. Everything else goes to the client.
+    """
+
+    def __init__(self, one_dev_client: OneDevClient) -> None:
+        self.one_dev_client = one_dev_client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.one_dev_client, name)
+
+    async def create_embedding(self, payload: Dict[str, Any], headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        texts = payload.get(EmbeddingCacheService.TEXTS_KEY)
+        indexing_job = IndexingJobManager.get_current_job()
+        if indexing_job is not None:
+            indexing_job.check_cancelled()
+        if not isinstance(texts, list):
+            return await self.one_dev_client.create_embedding(payload, headers)
+
+        cache_enabled = EmbeddingCacheService.is_enabled()
+        # chunks embedded while indexing a repo are referenced from it, so the cache knows which repos need them
+        repo_path = indexing_job.payload.repo_path if indexing_job is not None else None
+        embeddings = await EmbeddingCacheService.get_embeddings(texts, repo_path) if cache_enabled else {}
+        missing_texts = list(dict.fromkeys(text for text in texts if text not in embeddings))
+        # a fully cached request consumes no backend tokens
+        result: Optional[Dict[str, Any]] = {"tokens_used": 0}
+        if missing_texts:
+            # the controller re-batches the texts and paces the round trips to what the backend sustains, embeddings
+            # requested outside an indexing job are for interactive queries and skip the queue
+            result = await AdaptiveEmbeddingController.create_embeddings(
+                missing_texts,
+                lambda batch_texts: self.one_dev_client.create_embedding(
+                    {**payload, EmbeddingCacheService.TEXTS_KEY: batch_texts}, headers
+                ),
+                interactive=indexing_job is None,
+            )
+            if not result or EmbeddingCacheService.EMBEDDINGS_KEY not in result:
+                return result
+            fetched_embeddings = dict(zip(missing_texts, result[EmbeddingCacheService.EMBEDDINGS_KEY]))
+            if cache_enabled:
+                await EmbeddingCacheService.store_embeddings(fetched_embeddings, repo_path)
+            embeddings.update(fetched_embeddings)
+        if indexing_job is not None:
+            indexing_job.on_embedded(len(texts), len(missing_texts))
+        return {**result, EmbeddingCacheService.EMBEDDINGS_KEY: [embeddings[text] for text in texts]}
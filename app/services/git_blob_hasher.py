@@ -0,0 +1,134 @@
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from deputydev_core.services.initialization.extension_initialisation_manager import (
+    ExtensionInitialisationManager,
+)
+
+from app.utils.git_utils import git_blob_hash, run_git
+
+# mode of gitlink entries, i.e. submodules, in `git ls-files -s`
+GITLINK_MODE = "160000"
+
+
+class GitBlobHasher:
+    """
+    Hashes repo files with git object IDs. Clean tracked files take the blob ID recorded in the git index, so
+    only dirty and untracked files are hashed, through `git hash-object`, and a repo fingerprint costs time
+    proportional to the number of changed files.
+
+    `git hash-object` applies the same attributes driven filters as `git add` (end-of-line conversion with
+    core.autocrlf, clean filters, LFS pointers), so a dirty file gets the ID it would have once committed. Without
+    a usable git, files are hashed in-process from their raw content, and files behind such filters then hash
+    differently while dirty than once clean.
+
+    Files are discovered with deputydev_core's own chunkable files listing, like in the default hash mode. Files
+    hashed on their own, e.g. dirty files, are kept if their extension is one of the extensions of the repo's last
+    listing.
+    """
+
+    # repo path -> extensions of the chunkable files core listed for it
+    _chunkable_extensions: Dict[str, Set[str]] = {}
+
+    @classmethod
+    async def list_chunkable_files(cls, repo_path: str, ripgrep_path: str) -> List[str]:
+        local_repo = ExtensionInitialisationManager(repo_path=repo_path, ripgrep_path=ripgrep_path).get_local_repo()
+        file_paths = [str(Path(file_path)) for file_path in await local_repo.get_chunkable_files()]
+        cls._chunkable_extensions[repo_path] = {Path(file_path).suffix.lower() for file_path in file_paths}
+        return file_paths
+
+    @classmethod
+    async def filter_chunkable_files(cls, repo_path: str, ripgrep_path: str, file_paths: List[str]) -> List[str]:
+        chunkable_extensions = cls._chunkable_extensions.get(repo_path)
+        if chunkable_extensions is None:
+            await cls.list_chunkable_files(repo_path, ripgrep_path)
+            chunkable_extensions = cls._chunkable_extensions[repo_path]
+        return [file_path for file_path in file_paths if Path(file_path).suffix.lower() in chunkable_extensions]
+
+    @classmethod
+    async def get_index_blob_ids(cls, repo_path: str) -> Dict[str, str]:
+        """Blob IDs of the files staged in the git index, keyed by their path relative to repo_path."""
+        output = await run_git(repo_path, "ls-files", "--stage", "-z")
+        if output is None:
+            return {}
+        blob_ids: Dict[str, str] = {}
+        for entry in output.decode(errors="replace").split("\0"):
+            if not entry:
+                continue
+            info, file_path = entry.split("\t", 1)
+            mode, blob_id, stage = info.split(" ")
+            # unmerged entries are dirty by definition, hash them from the work tree
+            if mode != GITLINK_MODE and stage == "0":
+                blob_ids[str(Path(file_path))] = blob_id
+        return blob_ids
+
+    @classmethod
+    def _hash_files_from_disk(cls, repo_path: str, file_paths: List[str]) -> Dict[str, str]:
+        files_and_hashes: Dict[str, str] = {}
+        for file_path in file_paths:
+            try:
+                files_and_hashes[file_path] = git_blob_hash((Path(repo_path) / file_path).read_bytes())
+            except OSError:
+                continue
+        return files_and_hashes
+
+    @classmethod
+    async def _hash_files_with_git(cls, repo_path: str, file_paths: List[str]) -> Optional[Dict[str, str]]:
+        """Hashes the files with `git hash-object`, None if git failed, e.g. for a file that vanished meanwhile."""
+        if not file_paths:
+            return {}
+        # --stdin-paths reads one path per line and applies the filters of each path
+        output = await run_git(
+            repo_path,
+            "hash-object",
+            "--stdin-paths",
+            stdin="".join(f"{file_path}\n" for file_path in file_paths).encode(),
+        )
+        if output is None:
+            return None
+        blob_ids = output.decode().split()
+        if len(blob_ids) != len(file_paths):
+            return None
+        return dict(zip(file_paths, blob_ids))
+
+    @classmethod
+    async def hash_files(cls, repo_path: str, ripgrep_path: str, file_paths: List[str]) -> Dict[str, str]:
+        """Hashes the given chunkable files from their current content, skipping files that can't be read."""
+        file_paths = await cls.filter_chunkable_files(repo_path, ripgrep_path, file_paths)
+        existing_file_paths = await asyncio.to_thread(
+            lambda: [
+                file_path
+                for file_path in file_paths
+                if "\n" not in file_path and (Path(repo_path) / file_path).is_file()
+            ]
+        )
+        files_and_hashes = await cls._hash_files_with_git(repo_path, existing_file_paths)
+        if files_and_hashes is None:
+            return await asyncio.to_thread(cls._hash_files_from_disk, repo_path, file_paths)
+        # paths git can't take line by line
+        other_file_paths = [file_path for file_path in file_paths if "\n" in file_path]
+        files_and_hashes.update(await asyncio.to_thread(cls._hash_files_from_disk, repo_path, other_file_paths))
+        return files_and_hashes
+
+    @classmethod
+    async def get_files_and_hashes(
+        cls, repo_path: str, ripgrep_path: str, dirty_files: Optional[Set[str]]
+    ) -> Dict[str, str]:
+        """
+        Lists the repo's chunkable files through deputydev_core and hashes them. `dirty_files` are the files
+        `git status` reports as changed, None if unknown, in which case every file is hashed from the work tree.
+        """
+        file_paths = await cls.list_chunkable_files(repo_path, ripgrep_path)
+        index_blob_ids = await cls.get_index_blob_ids(repo_path) if dirty_files is not None else {}
+
+        files_and_hashes: Dict[str, str] = {}
+        files_to_hash: List[str] = []
+        for file_path in file_paths:
+            blob_id = index_blob_ids.get(file_path)
+            if blob_id is not None and file_path not in dirty_files:
+                files_and_hashes[file_path] = blob_id
+            else:
+                files_to_hash.append(file_path)
+        files_and_hashes.update(await cls.hash_files(repo_path, ripgrep_path, files_to_hash))
+        return files_and_hashes
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.utils.constants import LOCAL_STORE_DIR
+
+INDEXING_CHECKPOINT_VERSION = 1
+
+
+class IndexingCheckpoint:
+    """Files of a repo that were chunked, and chunked and embedded, at a given hash."""
+
+    def __init__(self, repo_path: str, version: str, chunked: Dict[str, str], embedded: Dict[str, str]) -> None:
+        self.repo_path = repo_path
+        self.version = version
+        self.chunked = chunked
+        self.embedded = embedded
+
+    def get_pending_files(self, files_and_hashes: Dict[str, str]) -> Dict[str, str]:
+        """The files whose current version isn't fully committed yet."""
+        return {
+            file_path: file_hash
+            for file_path, file_hash in files_and_hashes.items()
+            if self.embedded.get(file_path) != file_hash
+        }
+
+    def record_chunked(self, files_and_hashes: Dict[str, str]) -> bool:
+        """Returns whether anything new was recorded."""
+        new_files = {
+            file_path: file_hash
+            for file_path, file_hash in files_and_hashes.items()
+            if self.chunked.get(file_path) != file_hash
+        }
+        self.chunked.update(new_files)
+        return bool(new_files)
+
+    def record_embedded(self, files_and_hashes: Dict[str, str]) -> None:
+        self.record_chunked(files_and_hashes)
+        self.embedded.update(files_and_hashes)
+
+    def retain_only(self, file_paths: Iterable[str]) -> None:
+        """Forgets files that no longer exist in the repo."""
+        file_paths = set(file_paths)
+        self.chunked = {
+            file_path: file_hash for file_path, file_hash in self.chunked.items() if file_path in file_paths
+        }
+        self.embedded = {
+            file_path: file_hash for file_path, file_hash in self.embedded.items() if file_path in file_paths
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "repo_path": self.repo_path,
+            "version": self.version,
+            "chunked": self.chunked,
+            "embedded": self.embedded,
+        }
+
+
+class IndexingCheckpointService:
+    """
+    Per-repo indexing checkpoints stored as JSON files under LOCAL_STORE_DIR, so a job restarted after the binary
+    was killed skips the files it already chunked and embedded. Only streamed runs (see StreamingIndexingPipeline)
+    write them, as they commit one batch at a time; a single-pass run embeds its files as a whole. Files are replaced atomically, and a checkpoint
+    written with a different chunking/embedding config or deputydev_core version is ignored.
+
+    A checkpoint only lives while a run is unfinished: it is deleted as soon as the run completes, so it never
+    outlives the vector store contents it describes and turns into a permanent skip list.
+    """
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("INDEXING_CHECKPOINTS") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    def get_embedding_max_wait(cls) -> float:
+        return cls._get_config().get("EMBEDDING_MAX_WAIT_SECONDS") or 1800
+
+    @classmethod
+    def _get_directory(cls) -> Path:
+        return Path(cls._get_config().get("PATH") or LOCAL_STORE_DIR / "indexing_checkpoints")
+
+    @classmethod
+    def _get_path(cls, repo_path: str) -> Path:
+        return cls._get_directory() / f"{hashlib.sha256(repo_path.encode()).hexdigest()}.json"
+
+    @classmethod
+    def get_version(cls) -> str:
+        try:
+            core_version = metadata.version("deputydev-core")
+        except metadata.PackageNotFoundError:
+            core_version = ""
+        version_inputs = {
+            "checkpoint_version": INDEXING_CHECKPOINT_VERSION,
+            "core_version": core_version,
+            "chunking": ConfigManager.configs.get("CHUNKING"),
+            "embedding": ConfigManager.configs.get("EMBEDDING"),
+            "config_version": cls._get_config().get("CONFIG_VERSION"),
+        }
+        return hashlib.sha256(json.dumps(version_inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def _read(cls, repo_path: str, version: str) -> IndexingCheckpoint:
+        path = cls._get_path(repo_path)
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return IndexingCheckpoint(repo_path, version, {}, {})
+        except (OSError, ValueError) as error:
+            AppLogger.log_error(f"Ignoring unreadable indexing checkpoint of {repo_path}: {error}")
+            return IndexingCheckpoint(repo_path, version, {}, {})
+        if data.get("version") != version or data.get("repo_path") != repo_path:
+            return IndexingCheckpoint(repo_path, version, {}, {})
+        return IndexingCheckpoint(repo_path, version, data.get("chunked") or {}, data.get("embedded") or {})
+
+    @classmethod
+    async def load(cls, repo_path: str) -> IndexingCheckpoint:
+        return await asyncio.to_thread(cls._read, repo_path, cls.get_version())
+
+    @classmethod
+    def _write(cls, path: Path, content: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as temp_file:
+                temp_file.write(content)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            Path(temp_path).replace(path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    async def save(cls, checkpoint: IndexingCheckpoint) -> None:
+        try:
+            await asyncio.to_thread(cls._write, cls._get_path(checkpoint.repo_path), json.dumps(checkpoint.to_dict()))
+        except OSError as error:
+            AppLogger.log_error(f"Failed to write indexing checkpoint of {checkpoint.repo_path}: {error}")
+
+    @classmethod
+    async def delete(cls, repo_path: str) -> None:
+        """Drops the checkpoint of a repo whose run completed, nothing is left to resume."""
+        try:
+            await asyncio.to_thread(cls._get_path(repo_path).unlink, missing_ok=True)
+        except OSError as error:
+            AppLogger.log_error(f"Failed to delete indexing checkpoint of {repo_path}: {error}")
+
+    @classmethod
+    def clear_all(cls) -> None:
+        """Drops every checkpoint, e.g. once the vector store was wiped and nothing is committed anymore."""
+        for path in cls._get_directory().glob("*.json"):
+            path.unlink(missing_ok=True)
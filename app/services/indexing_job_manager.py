@@ -0,0 +1,433 @@
+import asyncio
+import time
+from asyncio import Task
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.models.dtos.update_vector_store_params import UpdateVectorStoreParams
+from app.services.cpu_governor import CpuGovernor
+from app.services.indexing_scheduler import IndexingScheduler
+from app.utils.throttled_executor import ThrottledExecutor
+
+# (progress, per-file statuses, whole-repo summary), the summary only when the statuses cover a single batch
+IndexingProgressCallback = Callable[..., Awaitable[None]]
+EmbeddingProgressCallback = Callable[[float], Awaitable[None]]
+PartialReadyCallback = Callable[[List[str]], Awaitable[None]]
+UpdateRunner = Callable[
+    [UpdateVectorStoreParams, IndexingProgressCallback, EmbeddingProgressCallback, PartialReadyCallback],
+    Awaitable[Tuple[Union[Task[None], None], Union[Task[None], None]]],
+]
+
+
+class IndexingJobState(Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class IndexingJobCancelledError(Exception):
+    def __init__(self, repo_path: str) -> None:
+        super().__init__(f"Indexing of {repo_path} was cancelled")
+
+
+class IndexingJobSubscriber:
+    def __init__(
+        self,
+        indexing_progress_callback: IndexingProgressCallback,
+        embedding_progress_callback: Optional[EmbeddingProgressCallback] = None,
+        partial_ready_callback: Optional[PartialReadyCallback] = None,
+    ) -> None:
+        self.indexing_progress_callback = indexing_progress_callback
+        self.embedding_progress_callback = embedding_progress_callback
+        self.partial_ready_callback = partial_ready_callback
+
+
+class IndexingJob:
+    """
+    One update_vector_store run for a repo. Progress is fanned out to every subscriber, and subscribers that
+    attach late get the latest progress replayed. A subscriber whose callback fails (e.g. closed websocket) is
+    dropped without affecting the job.
+    """
+
+    def __init__(self, payload: UpdateVectorStoreParams) -> None:
+        self.payload = payload
+        self.subscribers: List[IndexingJobSubscriber] = []
+        loop = asyncio.get_running_loop()
+        self.indexing_done: "asyncio.Future[None]" = loop.create_future()
+        self.embedding_done: "asyncio.Future[None]" = loop.create_future()
+        self.task: Optional[Task[None]] = None
+        # the progress monitor tasks update_vector_store returned
+        self.update_tasks: List[Task[None]] = []
+        # the executors the job submits its chunking tasks to, whose queued tasks are dropped on cancel
+        self.executors: List[ThrottledExecutor] = []
+        self.last_indexing_progress: Optional[Tuple[float, Dict[str, Dict[str, str]], Optional[Dict[str, int]]]] = None
+        self.last_embedding_progress: Optional[float] = None
+        self.partial_ready_files: Optional[List[str]] = None
+        self.state = IndexingJobState.QUEUED
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # the files this run actually chunks and embeds, None until they are known
+        self.files_to_index: Optional[Set[str]] = None
+        self.indexed_files: Set[str] = set()
+        self.chunks_processed = 0
+        self.embeddings_created = 0
+        self.prefilter_report: Optional[Dict[str, Any]] = None
+        # the futures may complete with nobody awaiting them, e.g. for a watcher triggered job
+        self.indexing_done.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self.embedding_done.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    @property
+    def is_full_update(self) -> bool:
+        return not self.payload.chunkable_files
+
+    def covers(self, payload: UpdateVectorStoreParams) -> bool:
+        """Whether running this job also serves the given request."""
+        if payload.sync and not self.payload.sync:
+            return False
+        return set(self.payload.chunkable_files or []) == set(payload.chunkable_files or [])
+
+    def merge(self, payload: UpdateVectorStoreParams) -> None:
+        chunkable_files: List[str] = []
+        if not self.is_full_update and payload.chunkable_files:
+            chunkable_files = list(dict.fromkeys([*(self.payload.chunkable_files or []), *payload.chunkable_files]))
+        self.payload = UpdateVectorStoreParams(
+            repo_path=self.payload.repo_path,
+            chunkable_files=chunkable_files,
+            sync=bool(self.payload.sync or payload.sync),
+            priority_files=list(dict.fromkeys([*(self.payload.priority_files or []), *(payload.priority_files or [])])),
+        )
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.state == IndexingJobState.CANCELLED
+
+    def check_cancelled(self) -> None:
+        """Raised from work the job spawned, e.g. background embedding batches, once the job was cancelled."""
+        if self.is_cancelled:
+            raise IndexingJobCancelledError(self.payload.repo_path)
+
+    def on_embedded(self, chunks: int, embeddings: int) -> None:
+        """Records an embedding batch: chunks it covered, and embeddings actually created by the backend."""
+        self.chunks_processed += chunks
+        self.embeddings_created += embeddings
+
+    def get_status(self) -> Dict[str, Any]:
+        elapsed_seconds = 0.0
+        if self.started_at is not None:
+            elapsed_seconds = (self.finished_at or time.monotonic()) - self.started_at
+
+        def get_rate(count: int) -> float:
+            return round(count / elapsed_seconds, 2) if elapsed_seconds else 0.0
+
+        return {
+            "repo_path": self.payload.repo_path,
+            "state": self.state.value,
+            "is_full_update": self.is_full_update,
+            "sync": bool(self.payload.sync),
+            "indexing_progress": self.last_indexing_progress[0] if self.last_indexing_progress else 0,
+            "embedding_progress": self.last_embedding_progress or 0,
+            "files_total": len(self.files_to_index or ()),
+            "files_indexed": len(self.indexed_files),
+            "chunks_processed": self.chunks_processed,
+            "embeddings_created": self.embeddings_created,
+            "elapsed_seconds": round(elapsed_seconds, 2),
+            "files_per_second": get_rate(len(self.indexed_files)),
+            "chunks_per_second": get_rate(self.chunks_processed),
+            "embeddings_per_second": get_rate(self.embeddings_created),
+            "prefilter": self.prefilter_report,
+        }
+
+    def attach(self, subscriber: IndexingJobSubscriber) -> None:
+        self.subscribers.append(subscriber)
+        if self.last_indexing_progress is not None and not self.indexing_done.done():
+            asyncio.create_task(
+                self._notify(subscriber, subscriber.indexing_progress_callback, *self.last_indexing_progress)
+            )
+        if not self.indexing_done.done():
+            asyncio.create_task(self._replay_partial_ready(subscriber))
+        if (
+            subscriber.embedding_progress_callback
+            and self.last_embedding_progress is not None
+            and not self.embedding_done.done()
+        ):
+            asyncio.create_task(
+                self._notify(subscriber, subscriber.embedding_progress_callback, self.last_embedding_progress)
+            )
+
+    async def _replay_partial_ready(self, subscriber: IndexingJobSubscriber) -> None:
+        if subscriber.partial_ready_callback and self.partial_ready_files is not None:
+            await self._notify(subscriber, subscriber.partial_ready_callback, self.partial_ready_files)
+
+    async def _notify(
+        self, subscriber: IndexingJobSubscriber, callback: Callable[..., Awaitable[None]], *args: Any
+    ) -> None:
+        try:
+            await callback(*args)
+        except Exception:  # noqa: BLE001
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    async def on_indexing_progress(
+        self,
+        progress: float,
+        indexing_status: Dict[str, Dict[str, str]],
+        indexing_summary: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.last_indexing_progress = (progress, indexing_status, indexing_summary)
+        if self.files_to_index is not None:
+            # files that were up to date or already committed by an earlier run are reported COMPLETED too
+            self.indexed_files.update(
+                file_path
+                for file_path, status in indexing_status.items()
+                if file_path in self.files_to_index and status.get("status") == "COMPLETED"
+            )
+        await asyncio.gather(
+            *(
+                self._notify(
+                    subscriber, subscriber.indexing_progress_callback, progress, indexing_status, indexing_summary
+                )
+                for subscriber in list(self.subscribers)
+            )
+        )
+
+    async def on_partial_ready(self, files: List[str]) -> None:
+        self.partial_ready_files = files
+        await asyncio.gather(*(self._replay_partial_ready(subscriber) for subscriber in list(self.subscribers)))
+
+    async def on_embedding_progress(self, progress: float) -> None:
+        self.last_embedding_progress = progress
+        await asyncio.gather(
+            *(
+                self._notify(subscriber, subscriber.embedding_progress_callback, progress)
+                for subscriber in list(self.subscribers)
+                if subscriber.embedding_progress_callback
+            )
+        )
+
+
+_current_job: ContextVar[Optional[IndexingJob]] = ContextVar("current_indexing_job", default=None)
+
+
+class IndexingJobManager:
+    """
+    Single-flight indexing per repo. A request for a repo that is already indexing attaches to the running job
+    if that job covers it, otherwise it is merged into one follow-up job that starts when the running one ends.
+    At most MAX_CONCURRENT_REPOS repos index at the same time across the server. When a slot frees up, a job of
+    the focused repo (see IndexingScheduler.set_focus) is admitted ahead of the others, which wait in order.
+    """
+
+    _running_jobs: Dict[str, IndexingJob] = {}
+    _follow_up_jobs: Dict[str, IndexingJob] = {}
+    _finished_jobs: Dict[str, IndexingJob] = {}
+    # jobs waiting for a slot and the futures admitting them, in the order they arrived
+    _admission_queue: List[Tuple[IndexingJob, "asyncio.Future[None]"]] = []
+    _admitted_jobs = 0
+    jobs_started = 0
+    requests_attached = 0
+    requests_merged = 0
+    jobs_cancelled = 0
+
+    @classmethod
+    def _get_max_concurrent_repos(cls) -> int:
+        jobs_config = ConfigManager.configs.get("INDEXING_JOBS") or {}
+        return jobs_config.get("MAX_CONCURRENT_REPOS") or 2
+
+    @classmethod
+    async def _acquire_slot(cls, job: IndexingJob) -> None:
+        if not cls._admission_queue and cls._admitted_jobs < cls._get_max_concurrent_repos():
+            cls._admitted_jobs += 1
+            return
+        admitted: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        entry = (job, admitted)
+        cls._admission_queue.append(entry)
+        try:
+            await admitted
+        except asyncio.CancelledError:
+            if entry in cls._admission_queue:
+                cls._admission_queue.remove(entry)
+            elif admitted.done() and not admitted.cancelled():
+                # admitted right as it was cancelled
+                cls._release_slot()
+            raise
+
+    @classmethod
+    def _release_slot(cls) -> None:
+        cls._admitted_jobs -= 1
+        while cls._admission_queue and cls._admitted_jobs < cls._get_max_concurrent_repos():
+            focused_repo_path = IndexingScheduler.focused_repo_path
+            # min keeps arrival order between jobs of equal priority
+            entry = min(cls._admission_queue, key=lambda entry: entry[0].payload.repo_path != focused_repo_path)
+            cls._admission_queue.remove(entry)
+            if entry[1].done():
+                continue
+            cls._admitted_jobs += 1
+            entry[1].set_result(None)
+
+    @classmethod
+    def submit(
+        cls,
+        payload: UpdateVectorStoreParams,
+        run_update: UpdateRunner,
+        subscriber: Optional[IndexingJobSubscriber] = None,
+    ) -> IndexingJob:
+        """Returns the job that serves this request, starting or queueing one if needed."""
+        repo_path = payload.repo_path
+        running_job = cls._running_jobs.get(repo_path)
+        follow_up_job = cls._follow_up_jobs.get(repo_path)
+
+        if (
+            running_job is not None
+            and follow_up_job is None
+            and not running_job.indexing_done.done()
+            and running_job.covers(payload)
+        ):
+            job = running_job
+            cls.requests_attached += 1
+        elif follow_up_job is not None:
+            job = follow_up_job
+            job.merge(payload)
+            cls.requests_merged += 1
+        else:
+            job = IndexingJob(payload)
+            if running_job is None:
+                cls._start(job, run_update)
+            else:
+                cls._follow_up_jobs[repo_path] = job
+                asyncio.create_task(cls._start_after(running_job, job, run_update))
+
+        if subscriber is not None:
+            job.attach(subscriber)
+        return job
+
+    @classmethod
+    async def _start_after(cls, running_job: IndexingJob, job: IndexingJob, run_update: UpdateRunner) -> None:
+        if running_job.task is not None:
+            await asyncio.wait([running_job.task])
+        if job.is_cancelled:
+            return
+        if cls._follow_up_jobs.get(job.payload.repo_path) is job:
+            del cls._follow_up_jobs[job.payload.repo_path]
+        cls._start(job, run_update)
+
+    @classmethod
+    def _start(cls, job: IndexingJob, run_update: UpdateRunner) -> None:
+        cls._running_jobs[job.payload.repo_path] = job
+        cls.jobs_started += 1
+        job.task = asyncio.create_task(cls._run(job, run_update))
+
+    @classmethod
+    def _finish(cls, job: IndexingJob, error: Optional[BaseException] = None) -> None:
+        for future in (job.indexing_done, job.embedding_done):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+        job.finished_at = time.monotonic()
+        cls._finished_jobs[job.payload.repo_path] = job
+
+    @classmethod
+    async def _run(cls, job: IndexingJob, run_update: UpdateRunner) -> None:
+        # lets the work spawned by this job, e.g. embedding batches, find it through get_current_job()
+        _current_job.set(job)
+        try:
+            await cls._acquire_slot(job)
+            try:
+                job.state = IndexingJobState.RUNNING
+                job.started_at = time.monotonic()
+                CpuGovernor.on_indexing_started()
+                try:
+                    indexing_task, embedding_task = await run_update(
+                        job.payload, job.on_indexing_progress, job.on_embedding_progress, job.on_partial_ready
+                    )
+                    job.update_tasks = [task for task in (indexing_task, embedding_task) if task]
+                    if indexing_task:
+                        await indexing_task
+                    job.indexing_done.set_result(None)
+                    if embedding_task:
+                        await embedding_task
+                    job.embedding_done.set_result(None)
+                finally:
+                    CpuGovernor.on_indexing_finished()
+            finally:
+                cls._release_slot()
+            job.state = IndexingJobState.COMPLETED
+            cls._finish(job)
+        except asyncio.CancelledError:
+            cls._finish(job, IndexingJobCancelledError(job.payload.repo_path))
+        except Exception as ex:  # noqa: BLE001
+            if job.is_cancelled:
+                # e.g. a chunking task dropped from the job's executor
+                cls._finish(job, IndexingJobCancelledError(job.payload.repo_path))
+                return
+            job.state = IndexingJobState.FAILED
+            AppLogger.log_error(f"Indexing job for {job.payload.repo_path} failed: {ex}")
+            cls._finish(job, ex)
+        finally:
+            if cls._running_jobs.get(job.payload.repo_path) is job:
+                del cls._running_jobs[job.payload.repo_path]
+
+    @classmethod
+    def is_indexing(cls, repo_path: str) -> bool:
+        """Whether a job of the repo is running or queued."""
+        return repo_path in cls._running_jobs or repo_path in cls._follow_up_jobs
+
+    @classmethod
+    def get_current_job(cls) -> Optional[IndexingJob]:
+        """The indexing job the calling code runs for, if any."""
+        return _current_job.get()
+
+    @classmethod
+    def cancel(cls, repo_path: str) -> List[IndexingJob]:
+        """
+        Cancels the running and the queued job of a repo. Embedding batches the job already spawned fail on their
+        next round trip, and the chunking tasks it queued are dropped. Tasks already running on the shared worker
+        pool finish, the pool itself keeps serving the other repos and the interactive searches.
+        """
+        cancelled_jobs: List[IndexingJob] = []
+        follow_up_job = cls._follow_up_jobs.pop(repo_path, None)
+        if follow_up_job is not None:
+            follow_up_job.state = IndexingJobState.CANCELLED
+            cls._finish(follow_up_job, IndexingJobCancelledError(repo_path))
+            cancelled_jobs.append(follow_up_job)
+
+        running_job = cls._running_jobs.get(repo_path)
+        if running_job is not None and running_job.finished_at is None:
+            running_job.state = IndexingJobState.CANCELLED
+            for executor in running_job.executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+            for task in (running_job.task, *running_job.update_tasks):
+                if task is not None:
+                    task.cancel()
+            cancelled_jobs.append(running_job)
+
+        cls.jobs_cancelled += len(cancelled_jobs)
+        return cancelled_jobs
+
+    @classmethod
+    def get_job_status(cls, repo_path: str) -> Optional[Dict[str, Any]]:
+        """Status of the running job of a repo, or else of its latest finished one."""
+        job = cls._running_jobs.get(repo_path) or cls._finished_jobs.get(repo_path)
+        if job is None:
+            return None
+        follow_up_job = cls._follow_up_jobs.get(repo_path)
+        return {**job.get_status(), "follow_up_queued": follow_up_job is not None}
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return {
+            "running_repos": sorted(cls._running_jobs),
+            "queued_repos": sorted(cls._follow_up_jobs),
+            "repos_waiting_for_slot": [job.payload.repo_path for job, _ in cls._admission_queue],
+            "jobs_started": cls.jobs_started,
+            "requests_attached": cls.requests_attached,
+            "requests_merged": cls.requests_merged,
+            "jobs_cancelled": cls.jobs_cancelled,
+        }
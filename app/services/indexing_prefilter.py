@@ -0,0 +1,199 @@
+import asyncio
+import fnmatch
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+DEFAULT_SKIPPED_FILE_PATTERNS = [
+    "*.min.js",
+    "*.min.css",
+    "*.js.map",
+    "*.css.map",
+    "*.lock",
+    "package-lock.json",
+    "pnpm-lock.yaml",
+    "go.sum",
+    "*_pb2.py",
+    "*.pb.go",
+    "node_modules/*",
+    "*/node_modules/*",
+    "vendor/*",
+    "*/vendor/*",
+    "third_party/*",
+    "*/third_party/*",
+]
+
+# linguist's generated code markers, matched against each of the top lines of a file
+DEFAULT_GENERATED_PATTERNS = [
+    r"^(//|#) Code generated .* DO NOT EDIT\.$",
+    r"@generated\b",
+    r"^(//|#) Generated by the protocol buffer compiler\.  DO NOT EDIT!$",
+    r"^// <auto-generated>",
+]
+
+
+class PrefilterSkipReason:
+    PATTERN = "PATTERN"
+    SIZE = "SIZE"
+    BINARY = "BINARY"
+    MINIFIED = "MINIFIED"
+    GENERATED = "GENERATED"
+
+
+class PrefilterResult:
+    def __init__(self) -> None:
+        self.kept_files: Dict[str, str] = {}
+        self.skipped_files: Dict[str, str] = {}
+        # skipped files whose verdict wasn't cached, any chunks they have are from before they were skipped
+        self.newly_skipped_files: Dict[str, str] = {}
+        self.report = PrefilterReport()
+
+
+class PrefilterReport:
+    def __init__(self) -> None:
+        self.files_checked = 0
+        self.files_skipped: Dict[str, int] = {}
+        self.bytes_skipped: Dict[str, int] = {}
+
+    def on_skipped(self, reason: str, file_size: int) -> None:
+        self.files_skipped[reason] = self.files_skipped.get(reason, 0) + 1
+        self.bytes_skipped[reason] = self.bytes_skipped.get(reason, 0) + file_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files_checked": self.files_checked,
+            "files_skipped": sum(self.files_skipped.values()),
+            "bytes_skipped": sum(self.bytes_skipped.values()),
+            "files_skipped_by_reason": self.files_skipped,
+            "bytes_skipped_by_reason": self.bytes_skipped,
+        }
+
+
+class IndexingPrefilter:
+    """
+    Cheap checks ahead of chunking that drop files whose chunks would be useless to search: lockfiles, vendored
+    and minified code, oversized, binary and generated files. Only the first SNIFF_BYTES of a file are read, and
+    the verdict is remembered per file hash, so unchanged files are never read twice. Verdicts are kept for the
+    files of the last full snapshot of the MAX_CACHED_REPOS most recently indexed repos.
+    """
+
+    # repo path -> file path -> (file hash, skip reason and file size, None if the file is kept), least recently
+    # indexed repo first
+    _verdicts: Dict[str, Dict[str, Tuple[str, Optional[Tuple[str, int]]]]] = {}
+    _last_reports: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("INDEXING_PREFILTER") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    def _check_file(
+        cls, file_path: Path, relative_path: str, prefilter_config: Dict[str, Any]
+    ) -> Optional[Tuple[str, int]]:
+        """Returns the reason to skip the file and its size, None if it should be indexed."""
+        try:
+            file_size = file_path.stat().st_size
+        except OSError:
+            return None
+        skipped_file_patterns: List[str] = (
+            prefilter_config.get("SKIPPED_FILE_PATTERNS") or DEFAULT_SKIPPED_FILE_PATTERNS
+        )
+        normalized_path = relative_path.replace("\\", "/")
+        if any(fnmatch.fnmatch(normalized_path, pattern) for pattern in skipped_file_patterns):
+            return PrefilterSkipReason.PATTERN, file_size
+        if file_size > (prefilter_config.get("MAX_FILE_BYTES") or 1024 * 1024):
+            return PrefilterSkipReason.SIZE, file_size
+
+        try:
+            with file_path.open("rb") as file:
+                head = file.read(prefilter_config.get("SNIFF_BYTES") or 8192)
+        except OSError:
+            return None
+        if b"\0" in head:
+            return PrefilterSkipReason.BINARY, file_size
+
+        lines = head.splitlines()
+        # the last sniffed line may continue past the sniffed bytes
+        complete_lines = lines if len(head) == file_size else lines[:-1]
+        max_line_length = prefilter_config.get("MAX_LINE_LENGTH") or 1000
+        if not complete_lines:
+            if len(head) > max_line_length:
+                return PrefilterSkipReason.MINIFIED, file_size
+        elif max(len(line) for line in complete_lines) > max_line_length or sum(
+            len(line) for line in complete_lines
+        ) / len(complete_lines) > (prefilter_config.get("MAX_AVERAGE_LINE_LENGTH") or 200):
+            return PrefilterSkipReason.MINIFIED, file_size
+
+        generated_patterns: List[str] = prefilter_config.get("GENERATED_PATTERNS") or DEFAULT_GENERATED_PATTERNS
+        top_lines = [
+            line.decode(errors="ignore").rstrip("\r")
+            for line in lines[: prefilter_config.get("GENERATED_MARKER_LINES") or 5]
+        ]
+        if any(re.search(pattern, line) for pattern in generated_patterns for line in top_lines):
+            return PrefilterSkipReason.GENERATED, file_size
+        return None
+
+    @classmethod
+    def _get_verdicts(
+        cls, repo_path: str, files_and_hashes: Dict[str, str], is_full_snapshot: bool
+    ) -> Dict[str, Tuple[str, Optional[Tuple[str, int]]]]:
+        verdicts = cls._verdicts.pop(repo_path, {})
+        if is_full_snapshot:
+            # forget the files that were removed since
+            verdicts = {file_path: verdicts[file_path] for file_path in files_and_hashes if file_path in verdicts}
+        cls._verdicts[repo_path] = verdicts
+        max_cached_repos = cls._get_config().get("MAX_CACHED_REPOS") or 8
+        while len(cls._verdicts) > max_cached_repos:
+            del cls._verdicts[next(iter(cls._verdicts))]
+        return verdicts
+
+    @classmethod
+    def _filter_files(cls, repo_path: str, files_and_hashes: Dict[str, str], is_full_snapshot: bool) -> PrefilterResult:
+        prefilter_config = cls._get_config()
+        verdicts = cls._get_verdicts(repo_path, files_and_hashes, is_full_snapshot)
+        result = PrefilterResult()
+        for relative_path, file_hash in files_and_hashes.items():
+            cached_verdict = verdicts.get(relative_path)
+            if cached_verdict is not None and cached_verdict[0] == file_hash:
+                skip = cached_verdict[1]
+            else:
+                skip = cls._check_file(Path(repo_path) / relative_path, relative_path, prefilter_config)
+                verdicts[relative_path] = (file_hash, skip)
+                if skip is not None:
+                    result.newly_skipped_files[relative_path] = file_hash
+            result.report.files_checked += 1
+            if skip is None:
+                result.kept_files[relative_path] = file_hash
+            else:
+                result.skipped_files[relative_path] = file_hash
+                result.report.on_skipped(*skip)
+        return result
+
+    @classmethod
+    async def filter_files(
+        cls, repo_path: str, files_and_hashes: Dict[str, str], is_full_snapshot: bool
+    ) -> PrefilterResult:
+        """Splits the files into the ones worth indexing and the skipped ones, with the report of the latter."""
+        if not cls.is_enabled():
+            result = PrefilterResult()
+            result.kept_files = files_and_hashes
+            return result
+        result = await asyncio.to_thread(cls._filter_files, repo_path, files_and_hashes, is_full_snapshot)
+        report_dict = result.report.to_dict()
+        cls._last_reports[repo_path] = report_dict
+        AppLogger.log_info(
+            f"Indexing prefilter of {repo_path}: skipped {report_dict['files_skipped']} of "
+            f"{report_dict['files_checked']} files, {report_dict['bytes_skipped']} bytes"
+        )
+        return result
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return dict(cls._last_reports)
@@ -0,0 +1,120 @@
+import weakref
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional
+
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.services.cpu_governor import CpuGovernor
+from app.services.process_pool_manager import ProcessPoolManager
+from app.utils.throttled_executor import ThrottledExecutor
+
+
+class IndexingScheduler:
+    """
+    Shares one global budget of WORKER_BUDGET chunking slots (default NUMBER_OF_WORKERS) between the repos that
+    are indexing at the same time. Every indexing run submits its chunking tasks through a ThrottledExecutor whose
+    limit is the repo's current allocation.
+
+    Slots are handed out one at a time to the repo with the fewest slots per weight, the focused repo weighing
+    FOCUS_WEIGHT and the others 1, and no repo gets more slots than it has tasks in flight or queued. The budget
+    is re-split whenever a task finishes, so slots a repo doesn't use go to the others. While the CPU governor
+    throttles indexing, its concurrency caps the whole budget.
+    """
+
+    # repo path -> ThrottledExecutors of its indexing runs
+    _executors: Dict[str, "weakref.WeakSet[ThrottledExecutor]"] = {}
+    focused_repo_path: Optional[str] = None
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("INDEXING_SCHEDULER") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", True)
+
+    @classmethod
+    def get_worker_budget(cls) -> int:
+        worker_budget = cls._get_config().get("WORKER_BUDGET") or ProcessPoolManager.get_max_workers()
+        return min(worker_budget, CpuGovernor.get_indexing_concurrency())
+
+    @classmethod
+    def get_executor(cls, repo_path: str, executor: Executor) -> ThrottledExecutor:
+        """
+        Wraps the executor an indexing run of the repo submits its chunking tasks to. The wrapper is also what lets
+        a cancelled run drop its queued tasks without shutting the shared pool down.
+        """
+        throttled_executor = ThrottledExecutor(executor, lambda: cls.get_allocation(repo_path), cls._on_task_finished)
+        cls._executors.setdefault(repo_path, weakref.WeakSet()).add(throttled_executor)
+        CpuGovernor.add_executor(throttled_executor)
+        return throttled_executor
+
+    @classmethod
+    def set_focus(cls, repo_path: Optional[str]) -> None:
+        cls.focused_repo_path = repo_path
+        cls._on_allocation_changed()
+
+    @classmethod
+    def _on_task_finished(cls) -> None:
+        CpuGovernor.on_task_finished()
+        # the finished task may have freed a slot another repo's allocation grows into
+        cls._on_allocation_changed()
+
+    @classmethod
+    def _on_allocation_changed(cls) -> None:
+        for executors in list(cls._executors.values()):
+            for executor in list(executors):
+                executor.on_limit_changed()
+
+    @classmethod
+    def _get_demands(cls) -> Dict[str, int]:
+        demands: Dict[str, int] = {}
+        for repo_path, executors in list(cls._executors.items()):
+            repo_executors: List[ThrottledExecutor] = list(executors)
+            if not repo_executors:
+                del cls._executors[repo_path]
+                continue
+            demands[repo_path] = sum(executor.in_flight + executor.pending for executor in repo_executors)
+        return demands
+
+    @classmethod
+    def get_allocations(cls) -> Dict[str, int]:
+        demands = cls._get_demands()
+        if not cls.is_enabled():
+            return {repo_path: CpuGovernor.get_indexing_concurrency() for repo_path in demands}
+        focus_weight = cls._get_config().get("FOCUS_WEIGHT") or 3
+        weights = {repo_path: focus_weight if repo_path == cls.focused_repo_path else 1 for repo_path in demands}
+        allocations = {repo_path: 0 for repo_path in demands}
+        for _ in range(cls.get_worker_budget()):
+            unsatisfied_repos = [repo_path for repo_path in demands if allocations[repo_path] < demands[repo_path]]
+            if not unsatisfied_repos:
+                break
+            repo_path = min(
+                unsatisfied_repos,
+                key=lambda repo_path: (allocations[repo_path] / weights[repo_path], -weights[repo_path]),
+            )
+            allocations[repo_path] += 1
+        return allocations
+
+    @classmethod
+    def get_allocation(cls, repo_path: str) -> int:
+        return cls.get_allocations().get(repo_path, 0)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        allocations = cls.get_allocations()
+        repos: Dict[str, Dict[str, Any]] = {}
+        for repo_path, allocation in allocations.items():
+            repo_executors = list(cls._executors.get(repo_path) or [])
+            repos[repo_path] = {
+                "allocated_workers": allocation,
+                "running_tasks": sum(executor.in_flight for executor in repo_executors),
+                "queued_tasks": sum(executor.pending for executor in repo_executors),
+                "focused": repo_path == cls.focused_repo_path,
+            }
+        return {
+            "enabled": cls.is_enabled(),
+            "worker_budget": cls.get_worker_budget(),
+            "focused_repo_path": cls.focused_repo_path,
+            "repos": repos,
+        }
@@ -1,7 +1,6 @@
 import asyncio
 import time
 from asyncio import Task
-from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
 from deputydev_core.services.auth_token_storage.auth_token_service import (
@@ -20,16 +19,30 @@ from deputydev_core.utils.constants.auth import AuthStatus
 from deputydev_core.utils.constants.enums import ContextValueKeys
 from deputydev_core.utils.context_value import ContextValue
 from deputydev_core.utils.context_vars import get_context_value
-from deputydev_core.utils.custom_progress_bar import CustomProgressBar
 from deputydev_core.utils.file_indexing_monitor import FileIndexingMonitor
 from deputydev_core.utils.weaviate import weaviate_connection
 from sanic import Sanic
 from sanic.exceptions import WebsocketClosed
 
+from app.clients.client_registry import ClientRegistry
 from app.clients.one_dev_client import OneDevClient
 from app.models.dtos.update_vector_store_params import UpdateVectorStoreParams
+from app.repository.chunk_files_repository import ChunkFilesRepository
+from app.services.chunkable_files_cache import ChunkableFilesCache
+from app.services.codebase_search.focus_items_search.repo_scope_service import RepoScopeService
+from app.services.codebase_search.focus_items_search.symbol_index_service import SymbolIndexService
+from app.services.embedding_service import EmbeddingService
+from app.services.indexing_checkpoint_service import IndexingCheckpoint, IndexingCheckpointService
+from app.services.indexing_job_manager import IndexingJobManager
+from app.services.indexing_prefilter import IndexingPrefilter, PrefilterResult
+from app.services.indexing_scheduler import IndexingScheduler
+from app.services.process_pool_manager import ProcessPoolManager
+from app.services.relevant_chunks_cache import RelevantChunksCache
+from app.services.repo_watcher_service import RepoWatcherService
+from app.services.streaming_indexing_pipeline import StreamingIndexingPipeline
 from app.services.url_service.url_service import UrlService
 from app.utils.constants import Headers
+from app.utils.observable_progress_bar import ObservableProgressBar
 from app.utils.ripgrep_path import get_rg_path
 
 
@@ -40,80 +53,344 @@ class InitializationService:
         payload: UpdateVectorStoreParams,
         indexing_progress_callback: Callable[[float, List[Dict[str, str]]], Awaitable[None]],
         embedding_progress_callback: Callable[[float], Awaitable[None]],
+        partial_ready_callback: Optional[Callable[[List[str]], Awaitable[None]]] = None,
     ) -> tuple[Union[Task[None], None], Union[Task[None], None]]:
-        return await cls.update_vector_store(payload, indexing_progress_callback, embedding_progress_callback)
+        return await cls.update_vector_store(
+            payload, indexing_progress_callback, embedding_progress_callback, partial_ready_callback
+        )
 
     @classmethod
-    async def update_vector_store(
+    async def update_vector_store(  # noqa: C901
         cls,
         payload: UpdateVectorStoreParams,
         indexing_progress_callback: Callable[[float, List[Dict[str, str]]], Awaitable[None]],
         embedding_progress_callback: Callable[[float], Awaitable[None]],
+        partial_ready_callback: Optional[Callable[[List[str]], Awaitable[None]]] = None,
     ) -> tuple[Union[Task[None], None], Union[Task[None], None]]:
         repo_path = payload.repo_path
         auth_token = ContextValue.get(ContextValueKeys.EXTENSION_AUTH_TOKEN.value)
         chunkable_files = payload.chunkable_files
         ripgrep_path = get_rg_path()
-        with ProcessPoolExecutor(max_workers=ConfigManager.configs["NUMBER_OF_WORKERS"]) as executor:
-            one_dev_client = OneDevClient()
-            body = {"enable_grace_period": ConfigManager.configs["USE_GRACE_PERIOD_FOR_EMBEDDING"]}
-            headers = {"Authorization": f"Bearer {auth_token}"}
-            token_data: Dict[str, Any] = await one_dev_client.verify_auth_token(headers=headers, payload=body)
-            if token_data["status"] == AuthStatus.EXPIRED.value:
-                await cls.handle_expired_token(token_data)
-
-            initialization_manager = ExtensionInitialisationManager(
-                repo_path=repo_path,
-                auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
-                process_executor=executor,
-                one_dev_client=one_dev_client,
-                ripgrep_path=ripgrep_path,
+        executor = IndexingScheduler.get_executor(repo_path, ProcessPoolManager.get_executor())
+        indexing_job = IndexingJobManager.get_current_job()
+        if indexing_job is not None:
+            indexing_job.executors.append(executor)
+        one_dev_client = ClientRegistry.one_dev_client()
+        body = {"enable_grace_period": ConfigManager.configs["USE_GRACE_PERIOD_FOR_EMBEDDING"]}
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        token_data: Dict[str, Any] = await one_dev_client.verify_auth_token(headers=headers, payload=body)
+        if token_data["status"] == AuthStatus.EXPIRED.value:
+            await cls.handle_expired_token(token_data)
+
+        initialization_manager = ExtensionInitialisationManager(
+            repo_path=repo_path,
+            auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
+            process_executor=executor,
+            one_dev_client=EmbeddingService(one_dev_client),
+            ripgrep_path=ripgrep_path,
+        )
+        if chunkable_files:
+            chunkable_files_and_hashes = await ChunkableFilesCache.hash_files(repo_path, ripgrep_path, chunkable_files)
+        else:
+            chunkable_files_and_hashes = await ChunkableFilesCache.get_chunkable_files_and_hashes(
+                repo_path, ripgrep_path=ripgrep_path
+            )
+        AppLogger.log_info(f"Chunkable files and hashes: {len(chunkable_files_and_hashes)}")
+        await SharedChunksManager.update_chunks(repo_path, chunkable_files_and_hashes, chunkable_files)
+        RelevantChunksCache.on_files_updated(repo_path, chunkable_files_and_hashes)
+
+        checkpoint, files_to_index, prefilter_result = await cls._get_files_to_index(
+            repo_path, chunkable_files_and_hashes, is_full_snapshot=not chunkable_files
+        )
+        skipped_files = prefilter_result.skipped_files
+        await cls._drop_skipped_files(repo_path, prefilter_result.newly_skipped_files)
+        if not files_to_index:
+            await indexing_progress_callback(
+                100,
+                {
+                    key: {"file_path": key, "status": "SKIPPED" if key in skipped_files else "COMPLETED"}
+                    for key in chunkable_files_and_hashes
+                },
             )
-            local_repo = initialization_manager.get_local_repo(chunkable_files=chunkable_files)
-            chunkable_files_and_hashes = await local_repo.get_chunkable_files_and_commit_hashes()
-            AppLogger.log_info(f"Chunkable files and hashes: {len(chunkable_files_and_hashes)}")
-            await SharedChunksManager.update_chunks(repo_path, chunkable_files_and_hashes, chunkable_files)
+            if checkpoint is not None:
+                # an interrupted run had committed everything, it's complete now
+                await IndexingCheckpointService.delete(repo_path)
             try:
                 weaviate_client = await weaviate_connection()
-                if weaviate_client:
-                    initialization_manager.weaviate_client = weaviate_client
-                else:
-                    await initialization_manager.initialize_vector_db()
-                indexing_progressbar = CustomProgressBar()
-                embedding_progressbar = CustomProgressBar()
-                files_with_indexing_status = {
-                    key: {"file_path": key, "status": "IN_PROGRESS"} for key in chunkable_files_and_hashes
-                }
             except Exception as e:  # noqa: BLE001
-                AppLogger.log_error(f"Error initializing vector store: {e}")
-            file_indexing_monitor = FileIndexingMonitor(files_with_indexing_status=files_with_indexing_status)
-            if payload.sync:
-                _embedding_progress_monitor_task = asyncio.create_task(
-                    cls._monitor_embedding_progress(embedding_progressbar, embedding_progress_callback, repo_path)
+                AppLogger.log_error(f"Error connecting to vector store: {e}")
+                weaviate_client = None
+            cls._on_files_indexed(
+                repo_path, weaviate_client, chunkable_files_and_hashes, is_full_snapshot=not chunkable_files
+            )
+            return None, None
+
+        try:
+            weaviate_client = await weaviate_connection()
+            if weaviate_client:
+                initialization_manager.weaviate_client = weaviate_client
+            else:
+                await initialization_manager.initialize_vector_db()
+            indexing_progressbar = ObservableProgressBar()
+            embedding_progressbar = ObservableProgressBar()
+        except Exception as e:  # noqa: BLE001
+            AppLogger.log_error(f"Error initializing vector store: {e}")
+        if StreamingIndexingPipeline.should_stream(files_to_index):
+            pipeline = StreamingIndexingPipeline(
+                initialization_manager,
+                repo_path,
+                files_to_index,
+                len(chunkable_files_and_hashes) - len(files_to_index) - len(skipped_files),
+                len(skipped_files),
+                payload.priority_files or [],
+                checkpoint,
+                indexing_progress_callback,
+                embedding_progress_callback if payload.sync else None,
+                partial_ready_callback,
+                cls._get_progress_intervals(),
+                enable_refresh=payload.sync,
+            )
+            pipeline_task = asyncio.create_task(
+                cls._run_streaming_pipeline(
+                    pipeline, initialization_manager, chunkable_files_and_hashes, is_full_snapshot=not chunkable_files
                 )
-            _indexing_progress_monitor_task = asyncio.create_task(
-                cls._monitor_indexing_progress(indexing_progressbar, indexing_progress_callback, file_indexing_monitor)
             )
-            await initialization_manager.prefill_vector_store(
+            return pipeline_task, pipeline_task if payload.sync else None
+
+        files_with_indexing_status = {
+            key: {
+                "file_path": key,
+                "status": "IN_PROGRESS"
+                if key in files_to_index
+                else "SKIPPED"
+                if key in skipped_files
+                else "COMPLETED",
+            }
+            for key in chunkable_files_and_hashes
+        }
+        file_indexing_monitor = FileIndexingMonitor(files_with_indexing_status=files_with_indexing_status)
+        if payload.sync:
+            _embedding_progress_monitor_task = asyncio.create_task(
+                cls._monitor_embedding_progress(embedding_progressbar, embedding_progress_callback, repo_path)
+            )
+        _indexing_progress_monitor_task = asyncio.create_task(
+            cls._monitor_indexing_progress(indexing_progressbar, indexing_progress_callback, file_indexing_monitor)
+        )
+        # a single pass doesn't record progress, an earlier streamed run's checkpoint only serves to skip files
+        has_stale_checkpoint = checkpoint is not None and bool(checkpoint.chunked)
+        if has_stale_checkpoint:
+            _checkpoint_task = asyncio.create_task(
+                cls._delete_checkpoint_once_embedded(repo_path, embedding_progressbar)
+            )
+        try:
+            remaining_files_to_index = await cls._prefill_priority_files(
+                initialization_manager,
+                payload,
                 chunkable_files_and_hashes,
+                files_to_index,
+                file_indexing_monitor,
+                partial_ready_callback,
+            )
+            await initialization_manager.prefill_vector_store(
+                remaining_files_to_index,
                 indexing_progressbar=indexing_progressbar,
                 embedding_progressbar=embedding_progressbar,
                 file_indexing_progress_monitor=file_indexing_monitor,
                 enable_refresh=payload.sync,
             )
+        except BaseException:
+            # the progress bars will never complete, so stop the monitors and let the failure surface right away
+            _indexing_progress_monitor_task.cancel()
+            if payload.sync:
+                _embedding_progress_monitor_task.cancel()
+            if has_stale_checkpoint:
+                _checkpoint_task.cancel()
+            raise
+        cls._on_files_indexed(
+            repo_path,
+            initialization_manager.weaviate_client,
+            chunkable_files_and_hashes,
+            is_full_snapshot=not chunkable_files,
+        )
         if payload.sync:
             return _indexing_progress_monitor_task, _embedding_progress_monitor_task
         else:
             return _indexing_progress_monitor_task, None
 
+    @classmethod
+    async def _run_streaming_pipeline(
+        cls,
+        pipeline: StreamingIndexingPipeline,
+        initialization_manager: ExtensionInitialisationManager,
+        files_and_hashes: Dict[str, str],
+        is_full_snapshot: bool,
+    ) -> None:
+        await pipeline.run()
+        if pipeline.checkpoint is not None:
+            await IndexingCheckpointService.delete(pipeline.repo_path)
+        cls._on_files_indexed(
+            pipeline.repo_path, initialization_manager.weaviate_client, files_and_hashes, is_full_snapshot
+        )
+
+    @classmethod
+    async def _prefill_priority_files(
+        cls,
+        initialization_manager: ExtensionInitialisationManager,
+        payload: UpdateVectorStoreParams,
+        files_and_hashes: Dict[str, str],
+        files_to_index: Dict[str, str],
+        file_indexing_monitor: FileIndexingMonitor,
+        partial_ready_callback: Optional[Callable[[List[str]], Awaitable[None]]],
+    ) -> Dict[str, str]:
+        """
+        Chunks and embeds the pending priority files in a first pass, then signals them as searchable. Returns the
+        files left for the bulk pass.
+        """
+        priority_files = [file_path for file_path in payload.priority_files or [] if file_path in files_and_hashes]
+        remaining_files_to_index = {
+            file_path: file_hash for file_path, file_hash in files_to_index.items() if file_path not in priority_files
+        }
+        # with nothing else pending, the single regular pass indexes the priority files just as soon
+        if not priority_files or not remaining_files_to_index:
+            return files_to_index
+
+        priority_files_to_index = {
+            file_path: files_to_index[file_path] for file_path in priority_files if file_path in files_to_index
+        }
+        if priority_files_to_index:
+            priority_indexing_config = ConfigManager.configs.get("PRIORITY_INDEXING") or {}
+            embedding_progressbar = ObservableProgressBar()
+            await initialization_manager.prefill_vector_store(
+                priority_files_to_index,
+                indexing_progressbar=ObservableProgressBar(),
+                embedding_progressbar=embedding_progressbar,
+                file_indexing_progress_monitor=file_indexing_monitor,
+                enable_refresh=payload.sync,
+            )
+            if not await embedding_progressbar.wait_until_completed(
+                priority_indexing_config.get("EMBEDDING_MAX_WAIT_SECONDS") or 60
+            ):
+                # the priority files aren't searchable yet, they'll be ready with the rest of the repo
+                AppLogger.log_info(
+                    f"Embeddings of {len(priority_files_to_index)} priority files of {payload.repo_path} did not "
+                    "complete in time, not signalling them as ready"
+                )
+                return remaining_files_to_index
+        AppLogger.log_info(
+            f"{len(priority_files)} priority files of {payload.repo_path} are searchable, "
+            f"{len(priority_files_to_index)} of them indexed ahead of {len(remaining_files_to_index)} other files"
+        )
+        if partial_ready_callback:
+            await partial_ready_callback(priority_files)
+        return remaining_files_to_index
+
+    @classmethod
+    async def _get_files_to_index(
+        cls, repo_path: str, files_and_hashes: Dict[str, str], is_full_snapshot: bool
+    ) -> tuple[Optional[IndexingCheckpoint], Dict[str, str], PrefilterResult]:
+        """
+        Skips the files an earlier, interrupted run already chunked and embedded at the same hash, and the ones the
+        prefilter deems not worth indexing.
+        """
+        checkpoint = None
+        # every file goes through the prefilter, files indexed before they were skipped have chunks to drop
+        prefilter_result = await IndexingPrefilter.filter_files(repo_path, files_and_hashes, is_full_snapshot)
+        files_to_index = prefilter_result.kept_files
+        if IndexingCheckpointService.is_enabled():
+            checkpoint = await IndexingCheckpointService.load(repo_path)
+            if is_full_snapshot:
+                checkpoint.retain_only(files_and_hashes)
+            files_to_index = checkpoint.get_pending_files(files_to_index)
+            AppLogger.log_info(
+                f"Indexing checkpoint of {repo_path}: {len(prefilter_result.kept_files) - len(files_to_index)} files "
+                "already committed"
+            )
+        indexing_job = IndexingJobManager.get_current_job()
+        if indexing_job is not None:
+            indexing_job.prefilter_report = prefilter_result.report.to_dict()
+            indexing_job.files_to_index = set(files_to_index)
+        return checkpoint, files_to_index, prefilter_result
+
+    @classmethod
+    async def _drop_skipped_files(cls, repo_path: str, files_and_hashes: Dict[str, str]) -> None:
+        """Deletes the chunk files of files the prefilter just started skipping, so they stop showing in search."""
+        if not files_and_hashes:
+            return
+        try:
+            weaviate_client = await weaviate_connection()
+            if weaviate_client is None:
+                return
+            await ChunkFilesRepository(weaviate_client).delete_chunk_files_by_file_hashes(files_and_hashes)
+        except Exception as e:  # noqa: BLE001
+            AppLogger.log_error(f"Error dropping the chunks of skipped files of {repo_path}: {e}")
+            return
+        SymbolIndexService.on_files_removed(repo_path, list(files_and_hashes))
+
+    @classmethod
+    def _on_files_indexed(
+        cls,
+        repo_path: str,
+        weaviate_client: Optional[WeaviateSyncAndAsyncClients],
+        files_and_hashes: Dict[str, str],
+        is_full_snapshot: bool,
+    ) -> None:
+        """Brings the in-memory indexes and the repo watcher up to date with the files that were just indexed."""
+        # results cached before indexing didn't see the new vector store contents
+        RelevantChunksCache.invalidate_repo(repo_path)
+        if weaviate_client is not None:
+            asyncio.create_task(
+                SymbolIndexService.on_files_updated(
+                    repo_path, weaviate_client, files_and_hashes, is_full_snapshot=is_full_snapshot
+                )
+            )
+            asyncio.create_task(
+                RepoScopeService.on_files_indexed(
+                    repo_path, weaviate_client, files_and_hashes, is_full_snapshot=is_full_snapshot
+                )
+            )
+        else:
+            AppLogger.log_info(f"No vector store connection, symbol index and repo scope of {repo_path} are left as is")
+        if is_full_snapshot:
+            RepoWatcherService.watch(repo_path, files_and_hashes, cls.reindex_files)
+        else:
+            RepoWatcherService.on_files_indexed(repo_path, files_and_hashes)
+
+    @classmethod
+    async def _delete_checkpoint_once_embedded(
+        cls, repo_path: str, embedding_progressbar: ObservableProgressBar
+    ) -> None:
+        """
+        Deletes the checkpoint an earlier, interrupted streamed run left once a single-pass run embedded the rest.
+        Single-pass runs embed their files as a whole, so they have no progress to checkpoint and restart if killed.
+        """
+        try:
+            # embedding may keep going in the background after chunking, don't wait on it forever
+            if await embedding_progressbar.wait_until_completed(IndexingCheckpointService.get_embedding_max_wait()):
+                await IndexingCheckpointService.delete(repo_path)
+        except asyncio.CancelledError:
+            return
+
+    @classmethod
+    async def reindex_files(cls, repo_path: str, files_and_hashes: Optional[Dict[str, str]]) -> None:
+        """
+        Re-indexes only the given files, or the repo's full snapshot for None, through the repo's indexing job queue.
+        Used by the repo watcher.
+        """
+        chunkable_files = list(files_and_hashes) if files_and_hashes is not None else []
+        job = IndexingJobManager.submit(
+            UpdateVectorStoreParams(repo_path=repo_path, chunkable_files=chunkable_files), cls.update_chunks
+        )
+        await job.indexing_done
+
     @classmethod
     async def _monitor_indexing_progress(
         cls,
-        progress_bar: CustomProgressBar,
+        progress_bar: ObservableProgressBar,
         progress_callback: Callable[[float, List[Dict[str, str]]], Awaitable[None]],
         file_indexing_monitor: FileIndexingMonitor,
     ) -> None:
-        """A separate task that can monitor and report progress while chunking happens"""
+        """A separate task that reports progress whenever it changes while chunking happens"""
+        min_interval, max_interval = cls._get_progress_intervals()
         try:
             while True:
                 try:
@@ -125,15 +402,16 @@ class InitializationService:
                     return  # Or break
                 if progress_bar.is_completed():
                     return
-                await asyncio.sleep(0.5)
+                await progress_bar.wait_for_change(min_interval, max_interval)
         except asyncio.CancelledError:
             return
 
     @classmethod
     async def _monitor_embedding_progress(
-        cls, progress_bar: CustomProgressBar, progress_callback: Callable[[float], Awaitable[None]], repo_path: str
+        cls, progress_bar: ObservableProgressBar, progress_callback: Callable[[float], Awaitable[None]], repo_path: str
     ) -> None:
-        """A separate task that can monitor and report progress while Embedding happens"""
+        """A separate task that reports progress whenever it changes while Embedding happens"""
+        min_interval, max_interval = cls._get_progress_intervals()
         try:
             while True:
                 try:
@@ -145,10 +423,21 @@ class InitializationService:
                 except WebsocketClosed:
                     AppLogger.log_info("Websocket closed during embedding progress. Stopping progress monitoring.")
                     return  # Or break
-                await asyncio.sleep(2)
+                await progress_bar.wait_for_change(min_interval, max_interval)
         except asyncio.CancelledError:
             return
 
+    @classmethod
+    def _get_progress_intervals(cls) -> tuple[float, float]:
+        """
+        Returns the minimum interval between two progress messages (coalescing bursts of changes) and the maximum
+        time a monitor sleeps without any change before re-sending the current progress.
+        """
+        progress_config = ConfigManager.configs.get("INDEXING_PROGRESS") or {}
+        max_messages_per_second = progress_config.get("MAX_MESSAGES_PER_SECOND") or 2
+        max_interval = progress_config.get("MAX_INTERVAL_SECONDS") or 10
+        return 1 / max_messages_per_second, max_interval
+
     @classmethod
     async def handle_expired_token(cls, token_data: Dict[str, Any]) -> str:
         auth_token = token_data["encrypted_session_data"]
@@ -215,9 +504,14 @@ class InitializationService:
             if new_weaviate_process:  # set only in case of windows
                 app.ctx.weaviate_process = new_weaviate_process
             if schema_cleaned:
+                # nothing recorded in the checkpoints, nor tagged with a repo scope, is in the vector store anymore
+                IndexingCheckpointService.clear_all()
+                RepoScopeService.reset()
                 asyncio.create_task(UrlService().refill_urls_data())
             asyncio.create_task(cls.maintain_weaviate_heartbeat())
 
+        ProcessPoolManager.initialize()
+
     @classmethod
     async def get_config(cls, base_config: Dict = {}) -> None:
         time_start = time.perf_counter()
@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Any, Dict, List, Optional
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+from sanic import Sanic
+
+
+def init_worker(niceness: int, configs: Optional[Dict[str, Any]]) -> None:
+    # runs in every worker as it starts. Workers that aren't forked from the server (forkserver, or spawn on
+    # Windows) start without the configs the server fetched, so they get a snapshot of them
+    if configs is not None and not ConfigManager.configs:
+        ConfigManager.initialize(in_memory=True)
+        ConfigManager.set(configs)
+    # on Linux a nicer process also gets a lower IO priority
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class ProcessPoolManager:
+    """
+    Owns the app-wide ProcessPoolExecutor stored on `app.ctx.process_executor`.
+
+    The pool is created once (at `/init`, or lazily on first use) and shared by every service that needs
+    to run chunking work in worker processes. A pool whose worker died abruptly is marked broken by the
+    stdlib and can't accept new work, so it is rebuilt transparently the next time it is requested.
+
+    With WORKER_POOL.START_METHOD set to "forkserver", workers are forked from a small server process that only
+    preloaded the chunking modules, instead of from the Sanic process with its clients, sockets and churning heap.
+    They get a snapshot of the configs as the pool is built, so configs changed later don't reach them.
+    Workers run with WORKER_POOL.NICE (default 0) added to their niceness; the pool also runs interactive chunking,
+    which a non-zero value slows down too.
+    """
+
+    # modules the chunking workers need, imported once by the forkserver; missing ones are skipped by the stdlib
+    DEFAULT_PRELOAD_MODULES = [
+        "tree_sitter",
+        "tree_sitter_language_pack",
+        "deputydev_core.services.chunking",
+    ]
+
+    @classmethod
+    def get_max_workers(cls) -> int:
+        return ConfigManager.configs["NUMBER_OF_WORKERS"]
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("WORKER_POOL") or {}
+
+    @classmethod
+    def get_preload_modules(cls) -> List[str]:
+        return cls._get_config().get("PRELOAD_MODULES") or cls.DEFAULT_PRELOAD_MODULES
+
+    @classmethod
+    def get_worker_nice(cls) -> int:
+        return cls._get_config().get("NICE") or 0
+
+    @classmethod
+    def get_mp_context(cls, start_method: Optional[str] = None) -> Optional[BaseContext]:
+        """
+        The multiprocessing context of the workers, None for the process-wide default start method. forkserver is
+        only available on POSIX, elsewhere the default is kept.
+        """
+        start_method = start_method or cls._get_config().get("START_METHOD")
+        if not start_method or start_method not in multiprocessing.get_all_start_methods():
+            return None
+        context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # only takes effect until the forkserver is started, i.e. for the first pool
+            context.set_forkserver_preload(cls.get_preload_modules())
+        return context
+
+    @classmethod
+    def _get_current_executor(cls) -> Optional[ProcessPoolExecutor]:
+        app = Sanic.get_app()
+        return getattr(app.ctx, "process_executor", None)
+
+    @classmethod
+    def _is_healthy(cls, executor: ProcessPoolExecutor) -> bool:
+        # `_broken` is set once a worker terminates abruptly, `_shutdown_thread` once shutdown() is called
+        return not getattr(executor, "_broken", False) and not getattr(executor, "_shutdown_thread", False)
+
+    @classmethod
+    def initialize(cls) -> ProcessPoolExecutor:
+        return cls.get_executor()
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        app = Sanic.get_app()
+        executor = cls._get_current_executor()
+        if executor is not None and cls._is_healthy(executor):
+            return executor
+
+        if executor is not None:
+            AppLogger.log_info("Process pool is broken, rebuilding it")
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        mp_context = cls.get_mp_context()
+        # forked workers share the server's configs
+        start_method = (mp_context or multiprocessing.get_context()).get_start_method()
+        configs = dict(ConfigManager.configs) if start_method != "fork" else None
+        executor = ProcessPoolExecutor(
+            max_workers=cls.get_max_workers(),
+            mp_context=mp_context,
+            initializer=init_worker,
+            initargs=(cls.get_worker_nice(), configs),
+        )
+        app.ctx.process_executor = executor
+        return executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        executor = cls._get_current_executor()
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        Sanic.get_app().ctx.process_executor = None
@@ -1,4 +1,3 @@
-from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Dict, List
 
 from deputydev_core.services.embedding.extension_embedding_manager import (
@@ -10,11 +9,16 @@ from deputydev_core.services.initialization.extension_initialisation_manager imp
 from deputydev_core.services.tools.focussed_snippet_search.dataclass.main import FocusChunksParams
 from deputydev_core.services.tools.relevant_chunks.dataclass.main import RelevantChunksParams
 from deputydev_core.services.tools.relevant_chunks.relevant_chunk import RelevantChunks as CoreRelevantChunksService
-from deputydev_core.utils.config_manager import ConfigManager
 from deputydev_core.utils.constants.enums import ContextValueKeys
 from deputydev_core.utils.weaviate import weaviate_connection
 
-from app.clients.one_dev_client import OneDevClient
+from app.clients.client_registry import ClientRegistry
+from app.services.chunkable_files_cache import ChunkableFilesCache
+from app.services.embedding_service import EmbeddingService
+from app.services.indexing_job_manager import IndexingJobManager
+from app.services.process_pool_manager import ProcessPoolManager
+from app.services.relevant_chunks_cache import RelevantChunksCache
+from app.utils.interactive_activity import interactive
 from app.utils.ripgrep_path import get_rg_path
 
 
@@ -22,47 +26,62 @@ class RelevantChunksService:
     def __init__(self, repo_path: str) -> None:
         self.repo_path = repo_path
 
+    @interactive
     async def get_relevant_chunks(self, payload: RelevantChunksParams) -> Dict[str, Any]:
         repo_path = payload.repo_path
-        one_dev_client = OneDevClient()
+        one_dev_client = EmbeddingService(ClientRegistry.one_dev_client())
         ripgrep_path = get_rg_path()
         embedding_manager = ExtensionEmbeddingManager(
             auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
             one_dev_client=one_dev_client,
         )
+        cache_key = None
+        if RelevantChunksCache.is_enabled():
+            (
+                chunkable_files_and_hashes,
+                repo_fingerprint,
+            ) = await ChunkableFilesCache.get_chunkable_files_and_fingerprint(repo_path, ripgrep_path=ripgrep_path)
+            cache_key = RelevantChunksCache.get_cache_key(payload, chunkable_files_and_hashes, repo_fingerprint)
+            cached_relevant_chunks = RelevantChunksCache.get(cache_key)
+            if cached_relevant_chunks is not None:
+                return cached_relevant_chunks
+
         weaviate_client = await weaviate_connection()
-        with ProcessPoolExecutor(max_workers=ConfigManager.configs["NUMBER_OF_WORKERS"]) as executor:
-            initialization_manager = ExtensionInitialisationManager(
-                repo_path=repo_path,
-                auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
-                process_executor=executor,
-                one_dev_client=one_dev_client,
-                weaviate_client=weaviate_client,
-                ripgrep_path=ripgrep_path,
-            )
-            relevant_chunks = await CoreRelevantChunksService(repo_path, ripgrep_path).get_relevant_chunks(
-                payload,
-                one_dev_client,
-                embedding_manager,
-                initialization_manager,
-                executor,
-                ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
-            )
+        executor = ProcessPoolManager.get_executor()
+        initialization_manager = ExtensionInitialisationManager(
+            repo_path=repo_path,
+            auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
+            process_executor=executor,
+            one_dev_client=one_dev_client,
+            weaviate_client=weaviate_client,
+            ripgrep_path=ripgrep_path,
+        )
+        relevant_chunks = await CoreRelevantChunksService(repo_path, ripgrep_path).get_relevant_chunks(
+            payload,
+            one_dev_client,
+            embedding_manager,
+            initialization_manager,
+            executor,
+            ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
+        )
+        # results computed while the repo is being indexed may be partial
+        if cache_key is not None and not IndexingJobManager.is_indexing(repo_path):
+            RelevantChunksCache.set(cache_key, relevant_chunks)
         return relevant_chunks
 
+    @interactive
     async def get_focus_chunks(self, payload: FocusChunksParams) -> List[Dict[str, Any]]:
-        one_dev_client = OneDevClient()
+        one_dev_client = EmbeddingService(ClientRegistry.one_dev_client())
         ripgrep_path = get_rg_path()
-        with ProcessPoolExecutor(max_workers=ConfigManager.configs["NUMBER_OF_WORKERS"]) as executor:
-            initialisation_manager = ExtensionInitialisationManager(
-                repo_path=payload.repo_path,
-                auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
-                process_executor=executor,
-                one_dev_client=one_dev_client,
-                ripgrep_path=ripgrep_path,
-            )
+        initialisation_manager = ExtensionInitialisationManager(
+            repo_path=payload.repo_path,
+            auth_token_key=ContextValueKeys.EXTENSION_AUTH_TOKEN.value,
+            process_executor=ProcessPoolManager.get_executor(),
+            one_dev_client=one_dev_client,
+            ripgrep_path=ripgrep_path,
+        )
 
-            focus_chunks = await CoreRelevantChunksService(payload.repo_path, ripgrep_path).get_focus_chunks(
-                payload, initialisation_manager
-            )
+        focus_chunks = await CoreRelevantChunksService(payload.repo_path, ripgrep_path).get_focus_chunks(
+            payload, initialisation_manager
+        )
         return focus_chunks
@@ -0,0 +1,87 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from deputydev_core.services.tools.relevant_chunks.dataclass.main import RelevantChunksParams
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.utils.lru_ttl_cache import LruTtlCache
+from app.utils.util import hash_content
+
+
+class RelevantChunksCache:
+    """
+    LRU+TTL cache of relevant-chunk results.
+
+    Entries are keyed by the repo path, a digest of the request (with the query whitespace-normalized, focus
+    chunks included) and a fingerprint of the repo's chunkable files and hashes, so a result is never served once
+    any file hash has changed. Entries of a repo are also dropped eagerly when an update reports changed hashes.
+
+    The key doesn't cover the vector store contents, so results aren't cached while the repo is being indexed, as
+    they may be partial, and a repo's entries are dropped once its files were indexed.
+    """
+
+    _cache: Optional[LruTtlCache[Dict[str, Any]]] = None
+    _repo_hashes: Dict[str, Dict[str, str]] = {}
+    _repo_fingerprints: Dict[str, str] = {}
+
+    @classmethod
+    def _get_cache(cls) -> LruTtlCache[Dict[str, Any]]:
+        if cls._cache is None:
+            cache_config = ConfigManager.configs.get("RELEVANT_CHUNKS_CACHE") or {}
+            cls._cache = LruTtlCache(
+                max_entries=cache_config.get("MAX_ENTRIES") or 256,
+                max_bytes=cache_config.get("MAX_BYTES") or 64 * 1024 * 1024,
+                ttl_seconds=cache_config.get("TTL_SECONDS") or 600,
+                size_of=lambda result: len(json.dumps(result)),
+            )
+        return cls._cache
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        cache_config = ConfigManager.configs.get("RELEVANT_CHUNKS_CACHE") or {}
+        return cache_config.get("ENABLED", True)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.split())
+
+    @classmethod
+    def get_cache_key(
+        cls, payload: RelevantChunksParams, chunkable_files_and_hashes: Dict[str, str], repo_fingerprint: str
+    ) -> Tuple[str, str, str]:
+        """`repo_fingerprint` fingerprints `chunkable_files_and_hashes`, see ChunkableFilesCache, which is kept as is."""
+        payload_dict = payload.model_dump(mode="json")
+        if isinstance(payload_dict.get("query"), str):
+            payload_dict["query"] = cls.normalize_query(payload_dict["query"])
+        payload_digest = hash_content(json.dumps(payload_dict, sort_keys=True))
+        if cls._repo_fingerprints.get(payload.repo_path) != repo_fingerprint:
+            cls._repo_fingerprints[payload.repo_path] = repo_fingerprint
+            cls._repo_hashes[payload.repo_path] = chunkable_files_and_hashes
+        return payload.repo_path, payload_digest, repo_fingerprint
+
+    @classmethod
+    def get(cls, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        return cls._get_cache().get(key)
+
+    @classmethod
+    def set(cls, key: Tuple[str, str, str], result: Dict[str, Any]) -> None:
+        cls._get_cache().set(key, result)
+
+    @classmethod
+    def invalidate_repo(cls, repo_path: str) -> None:
+        cls._get_cache().invalidate_where(lambda key: key[0] == repo_path)
+        cls._repo_hashes.pop(repo_path, None)
+        cls._repo_fingerprints.pop(repo_path, None)
+
+    @classmethod
+    def on_files_updated(cls, repo_path: str, files_and_hashes: Dict[str, str]) -> None:
+        """Drops the cached results of a repo if any of the given files now has a different hash."""
+        known_hashes = cls._repo_hashes.get(repo_path)
+        if known_hashes is None:
+            return
+        if any(known_hashes.get(file_path) != file_hash for file_path, file_hash in files_and_hashes.items()):
+            cls.invalidate_repo(repo_path)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return cls._get_cache().get_stats()
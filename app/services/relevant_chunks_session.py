@@ -0,0 +1,104 @@
+import asyncio
+import json
+import traceback
+from typing import Any, Dict
+
+from deputydev_core.services.tools.relevant_chunks.dataclass.main import RelevantChunksParams
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+from sanic import Websocket
+
+from app.services.relevant_chunk_service import RelevantChunksService
+from app.utils.interactive_activity import interactive
+
+
+class RelevantChunksSessionMessageType:
+    QUERY = "QUERY"
+    CANCEL = "CANCEL"
+
+
+class RelevantChunksSession:
+    """
+    Serves many relevant-chunk queries over a single long-lived websocket.
+
+    Every incoming message carries a `request_id`. QUERY messages (the default type) are processed concurrently,
+    bounded by a semaphore, and their responses are sent back as soon as they complete, tagged with the same
+    `request_id`. A CANCEL message aborts the in-flight query with that `request_id`. Each query is tracked as
+    interactive activity, not the session, which stays open while idle.
+    """
+
+    def __init__(self, ws: Websocket) -> None:
+        self.ws = ws
+        session_config = ConfigManager.configs.get("RELEVANT_CHUNKS_SESSION") or {}
+        self.semaphore = asyncio.Semaphore(session_config.get("MAX_CONCURRENT_QUERIES") or 4)
+        self.in_flight: Dict[str, asyncio.Task[None]] = {}
+        self.send_lock = asyncio.Lock()
+
+    async def run(self) -> None:
+        try:
+            async for data in self.ws:
+                await self._handle_message(data)
+        finally:
+            for task in self.in_flight.values():
+                task.cancel()
+
+    async def _handle_message(self, data: str) -> None:
+        try:
+            message: Dict[str, Any] = json.loads(data)
+        except json.JSONDecodeError as e:
+            await self._send_error(None, f"Invalid message: {str(e)}")
+            return
+        if not isinstance(message, dict):
+            await self._send_error(None, "Invalid message: expected a JSON object")
+            return
+
+        request_id = message.pop("request_id", None)
+        message_type = message.pop("type", RelevantChunksSessionMessageType.QUERY)
+        if not request_id:
+            await self._send_error(None, "request_id is required")
+            return
+
+        if message_type == RelevantChunksSessionMessageType.CANCEL:
+            task = self.in_flight.get(request_id)
+            if task:
+                task.cancel()
+            return
+
+        if request_id in self.in_flight:
+            await self._send_error(request_id, f"Query with request_id {request_id} is already in progress")
+            return
+        self.in_flight[request_id] = asyncio.create_task(self._process_query(request_id, message))
+
+    @interactive
+    async def _process_query(self, request_id: str, payload: Dict[str, Any]) -> None:
+        try:
+            async with self.semaphore:
+                params = RelevantChunksParams(**payload)
+                relevant_chunks_data = await RelevantChunksService(params.repo_path).get_relevant_chunks(params)
+            await self._send({"request_id": request_id, "status": "COMPLETED", "data": relevant_chunks_data})
+        except asyncio.CancelledError:
+            await self._send({"request_id": request_id, "status": "CANCELLED"})
+        except Exception as e:  # noqa: BLE001
+            AppLogger.log_error(traceback.format_exc())
+            await self._send_error(request_id, f"Can not find relevant chunks due to: {str(e)}")
+        finally:
+            self.in_flight.pop(request_id, None)
+
+    async def _send_error(self, request_id: str | None, error_message: str) -> None:
+        await self._send(
+            {
+                "request_id": request_id,
+                "status": "FAILED",
+                "error_code": 500,
+                "error_type": "SERVER_ERROR",
+                "error_message": error_message,
+                "traceback": str(traceback.format_exc()),
+            }
+        )
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        async with self.send_lock:
+            try:
+                await self.ws.send(json.dumps(message))
+            except Exception:  # noqa: BLE001
+                AppLogger.log_info(f"Could not send response for request {message.get('request_id')}, socket closed")
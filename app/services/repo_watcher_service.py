@@ -0,0 +1,201 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.services.chunkable_files_cache import ChunkableFilesCache
+from app.utils.interactive_activity import InteractiveActivity
+from app.utils.ripgrep_path import get_rg_path
+
+# re-indexes the given files of the repo, or the whole repo's snapshot for None
+ReindexCallback = Callable[[str, Optional[Dict[str, str]]], Awaitable[None]]
+
+
+class RepoWatcher:
+    def __init__(self, repo_path: str, known_hashes: Dict[str, str], reindex: ReindexCallback) -> None:
+        self.repo_path = repo_path
+        self.known_hashes = known_hashes
+        self.reindex = reindex
+        # changed file -> new hash, None for removed files
+        self.pending_changes: Dict[str, Optional[str]] = {}
+        self.first_change_at: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        # fingerprint of the chunkable files last diffed against known_hashes, None once known_hashes changed
+        self.last_fingerprint: Optional[str] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+
+
+class RepoWatcherService:
+    """
+    Optional background watcher per indexed repo. It polls the repo's chunkable files through ChunkableFilesCache,
+    which only rehashes files whose stat changed, diffs them only when their fingerprint changed and batches the
+    changes over a debounce window. Only the changed
+    files are re-indexed, once no interactive request has been running for QUIET_SECONDS. A batch that removes
+    files re-indexes the full snapshot instead, as only a full snapshot drops the removed files from the indexes.
+    """
+
+    _watchers: Dict[str, RepoWatcher] = {}
+    batches = 0
+    files_reindexed = 0
+    files_removed = 0
+    last_batch_size = 0
+    max_batch_size = 0
+    last_lag_seconds = 0.0
+    max_lag_seconds = 0.0
+    total_lag_seconds = 0.0
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("REPO_WATCHER") or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._get_config().get("ENABLED", False)
+
+    @classmethod
+    def watch(cls, repo_path: str, files_and_hashes: Dict[str, str], reindex: ReindexCallback) -> None:
+        """Starts watching a repo after a full index, or resets the known state of a watched one."""
+        if not cls.is_enabled():
+            return
+        watcher = cls._watchers.get(repo_path)
+        if watcher is None:
+            watcher = RepoWatcher(repo_path, dict(files_and_hashes), reindex)
+            watcher.task = asyncio.create_task(cls._run(watcher))
+            cls._watchers[repo_path] = watcher
+            AppLogger.log_info(f"Watching {repo_path} for changes")
+            return
+        watcher.known_hashes = dict(files_and_hashes)
+        watcher.last_fingerprint = None
+        watcher.pending_changes.clear()
+        watcher.first_change_at = watcher.last_change_at = None
+
+    @classmethod
+    def on_files_indexed(cls, repo_path: str, files_and_hashes: Dict[str, str]) -> None:
+        """Records files indexed outside the watcher, so they aren't re-indexed a second time."""
+        watcher = cls._watchers.get(repo_path)
+        if watcher is None:
+            return
+        watcher.known_hashes.update(files_and_hashes)
+        watcher.last_fingerprint = None
+        for file_path, file_hash in files_and_hashes.items():
+            if watcher.pending_changes.get(file_path) == file_hash:
+                del watcher.pending_changes[file_path]
+        if not watcher.pending_changes:
+            watcher.first_change_at = watcher.last_change_at = None
+
+    @classmethod
+    def _collect_changes(cls, watcher: RepoWatcher, files_and_hashes: Dict[str, str]) -> None:
+        changes: Dict[str, Optional[str]] = {
+            file_path: file_hash
+            for file_path, file_hash in files_and_hashes.items()
+            if watcher.known_hashes.get(file_path) != file_hash
+        }
+        changes.update({file_path: None for file_path in watcher.known_hashes if file_path not in files_and_hashes})
+        # a file changed and then restored to its indexed version isn't a change anymore
+        for file_path in [file_path for file_path in watcher.pending_changes if file_path not in changes]:
+            del watcher.pending_changes[file_path]
+        new_changes = {
+            file_path: file_hash
+            for file_path, file_hash in changes.items()
+            if watcher.pending_changes.get(file_path, ...) != file_hash
+        }
+        if not new_changes:
+            return
+        now = time.monotonic()
+        watcher.pending_changes.update(new_changes)
+        watcher.last_change_at = now
+        if watcher.first_change_at is None:
+            watcher.first_change_at = now
+
+    @classmethod
+    def _is_batch_due(cls, watcher: RepoWatcher) -> bool:
+        if not watcher.pending_changes or watcher.first_change_at is None or watcher.last_change_at is None:
+            return False
+        watcher_config = cls._get_config()
+        now = time.monotonic()
+        debounce_seconds = watcher_config.get("DEBOUNCE_SECONDS") or 2
+        max_batch_delay_seconds = watcher_config.get("MAX_BATCH_DELAY_SECONDS") or 30
+        return (
+            now - watcher.last_change_at >= debounce_seconds or now - watcher.first_change_at >= max_batch_delay_seconds
+        )
+
+    @classmethod
+    async def _reindex_pending_changes(cls, watcher: RepoWatcher) -> None:
+        pending_changes, first_change_at = dict(watcher.pending_changes), watcher.first_change_at or time.monotonic()
+        files_to_reindex = {file_path: file_hash for file_path, file_hash in pending_changes.items() if file_hash}
+        # on failure the changes stay pending and are retried with the next batch
+        if len(files_to_reindex) < len(pending_changes):
+            await watcher.reindex(watcher.repo_path, None)
+        elif files_to_reindex:
+            await watcher.reindex(watcher.repo_path, files_to_reindex)
+
+        for file_path, file_hash in pending_changes.items():
+            if file_hash:
+                watcher.known_hashes[file_path] = file_hash
+            else:
+                watcher.known_hashes.pop(file_path, None)
+            # keep files that changed again while the batch was being re-indexed
+            if watcher.pending_changes.get(file_path, ...) == file_hash:
+                del watcher.pending_changes[file_path]
+        if not watcher.pending_changes:
+            watcher.first_change_at = watcher.last_change_at = None
+
+        lag_seconds = time.monotonic() - first_change_at
+        cls.batches += 1
+        cls.files_reindexed += len(files_to_reindex)
+        cls.files_removed += len(pending_changes) - len(files_to_reindex)
+        cls.last_batch_size = len(pending_changes)
+        cls.max_batch_size = max(cls.max_batch_size, len(pending_changes))
+        cls.last_lag_seconds = lag_seconds
+        cls.max_lag_seconds = max(cls.max_lag_seconds, lag_seconds)
+        cls.total_lag_seconds += lag_seconds
+        AppLogger.log_info(
+            f"Re-indexed {len(pending_changes)} changed files of {watcher.repo_path}, {lag_seconds:.2f}s after the "
+            "first change"
+        )
+
+    @classmethod
+    async def _run(cls, watcher: RepoWatcher) -> None:
+        ripgrep_path = get_rg_path()
+        while True:
+            watcher_config = cls._get_config()
+            await asyncio.sleep(watcher_config.get("POLL_INTERVAL_SECONDS") or 1)
+            try:
+                # the map is the cache's own snapshot, _collect_changes only reads it
+                files_and_hashes, fingerprint = await ChunkableFilesCache.get_chunkable_files_and_fingerprint(
+                    watcher.repo_path, ripgrep_path=ripgrep_path
+                )
+                if fingerprint != watcher.last_fingerprint:
+                    cls._collect_changes(watcher, files_and_hashes)
+                    watcher.last_fingerprint = fingerprint
+                if cls._is_batch_due(watcher):
+                    await InteractiveActivity.wait_until_idle(watcher_config.get("QUIET_SECONDS") or 1)
+                    await cls._reindex_pending_changes(watcher)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:  # noqa: BLE001
+                AppLogger.log_error(f"Repo watcher failed for {watcher.repo_path}: {ex}")
+
+    @classmethod
+    def stop_all(cls) -> None:
+        for watcher in cls._watchers.values():
+            if watcher.task:
+                watcher.task.cancel()
+        cls._watchers.clear()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return {
+            "watched_repos": len(cls._watchers),
+            "pending_changes": sum(len(watcher.pending_changes) for watcher in cls._watchers.values()),
+            "batches": cls.batches,
+            "files_reindexed": cls.files_reindexed,
+            "files_removed": cls.files_removed,
+            "last_batch_size": cls.last_batch_size,
+            "max_batch_size": cls.max_batch_size,
+            "last_lag_seconds": cls.last_lag_seconds,
+            "max_lag_seconds": cls.max_lag_seconds,
+            "avg_lag_seconds": cls.total_lag_seconds / cls.batches if cls.batches else 0.0,
+        }
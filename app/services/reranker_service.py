@@ -6,7 +6,7 @@ from deputydev_core.utils.config_manager import ConfigManager
 from deputydev_core.utils.constants.enums import ContextValueKeys
 from deputydev_core.utils.context_value import ContextValue
 
-from app.clients.one_dev_client import OneDevClient
+from app.clients.client_registry import ClientRegistry
 from app.utils.util import filter_chunks_by_denotation, jsonify_chunks
 
 
@@ -38,7 +38,7 @@ class RerankerService:
 
             if self.session_type:
                 headers["X-Session-Type"] = self.session_type
-            data = await OneDevClient().llm_reranking(payload, headers=headers)
+            data = await ClientRegistry.one_dev_client().llm_reranking(payload, headers=headers)
             filtered_and_ranked_chunks_denotations = data["reranked_denotations"]
             returned_session_id = data["session_id"]
             return (
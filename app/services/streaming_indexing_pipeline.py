@@ -0,0 +1,276 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from deputydev_core.services.initialization.extension_initialisation_manager import (
+    ExtensionInitialisationManager,
+)
+from deputydev_core.utils.app_logger import AppLogger
+from deputydev_core.utils.config_manager import ConfigManager
+from deputydev_core.utils.file_indexing_monitor import FileIndexingMonitor
+
+from app.services.indexing_checkpoint_service import IndexingCheckpoint, IndexingCheckpointService
+from app.utils.observable_progress_bar import ObservableProgressBar
+
+
+class StreamingIndexingPipeline:
+    """
+    Indexes a repo as a stream of file batches instead of one prefill over every file, so memory stays bounded
+    on huge repos.
+
+    A discover stage stats the files and packs them into batches whose estimated indexing footprint fits
+    MEMORY_BUDGET_BYTES, handing them over through a queue of QUEUE_DEPTH batches. An index stage chunks, embeds
+    and upserts one batch at a time through `prefill_vector_store`, waiting for its embeddings before taking the
+    next one. Only the in-flight batch has a per-file status dict, and the checkpoint is saved after every batch.
+
+    Progress reports carry the in-flight batch's per-file statuses along with a summary of the whole repo, counts of
+    the files per status, as per-file statuses of every file would grow with the repo.
+    """
+
+    # files stat-ed per thread hop by the discover stage
+    STAT_GROUP_SIZE = 256
+
+    _pipelines: Dict[str, "StreamingIndexingPipeline"] = {}
+
+    def __init__(
+        self,
+        initialization_manager: ExtensionInitialisationManager,
+        repo_path: str,
+        files_to_index: Dict[str, str],
+        files_up_to_date: int,
+        files_skipped: int,
+        priority_files: List[str],
+        checkpoint: Optional[IndexingCheckpoint],
+        indexing_progress_callback: Callable[
+            [float, Dict[str, Dict[str, str]], Optional[Dict[str, int]]], Awaitable[None]
+        ],
+        embedding_progress_callback: Optional[Callable[[float], Awaitable[None]]],
+        partial_ready_callback: Optional[Callable[[List[str]], Awaitable[None]]],
+        progress_intervals: tuple[float, float],
+        enable_refresh: bool,
+    ) -> None:
+        streaming_config = self._get_config()
+        self.initialization_manager = initialization_manager
+        self.repo_path = repo_path
+        # priority files go first, so they are searchable after the first batches
+        self.files_to_index = {
+            **{file_path: files_to_index[file_path] for file_path in priority_files if file_path in files_to_index},
+            **files_to_index,
+        }
+        # chunkable files that were already indexed, reported as completed
+        self.files_up_to_date = files_up_to_date
+        # chunkable files the prefilter skipped
+        self.files_skipped = files_skipped
+        self.priority_files = priority_files
+        self.pending_priority_files = len([file_path for file_path in priority_files if file_path in files_to_index])
+        self.checkpoint = checkpoint
+        self.indexing_progress_callback = indexing_progress_callback
+        self.embedding_progress_callback = embedding_progress_callback
+        self.partial_ready_callback = partial_ready_callback
+        self.progress_intervals = progress_intervals
+        self.enable_refresh = enable_refresh
+        self.memory_budget_bytes: int = streaming_config.get("MEMORY_BUDGET_BYTES") or 512 * 1024 * 1024
+        # rough memory held while indexing a file per byte of its source: chunks, embeddings and vector store objects
+        self.bytes_per_source_byte: float = streaming_config.get("BYTES_PER_SOURCE_BYTE") or 16
+        self.max_batch_files: int = streaming_config.get("MAX_BATCH_FILES") or 2000
+        self.embedding_max_wait_seconds: float = streaming_config.get("EMBEDDING_MAX_WAIT_SECONDS") or 600
+        # (files and hashes, source bytes) of the discovered batches, None once every file was discovered
+        self.batches: "asyncio.Queue[Optional[Tuple[Dict[str, str], int]]]" = asyncio.Queue(
+            maxsize=streaming_config.get("QUEUE_DEPTH") or 2
+        )
+        self.files_discovered = 0
+        self.files_done = 0
+        self.files_completed = 0
+        self.files_failed = 0
+        self.batches_done = 0
+        self.current_batch_files = 0
+        self.current_batch_bytes = 0
+        self.current_batch_statuses: Dict[str, Dict[str, str]] = {}
+        # whether the current batch's statuses aren't counted in files_completed and files_failed yet
+        self.current_batch_in_flight = False
+        self.started_at = time.monotonic()
+
+    @classmethod
+    def _get_config(cls) -> Dict[str, Any]:
+        return ConfigManager.configs.get("STREAMING_INDEXING") or {}
+
+    @classmethod
+    def should_stream(cls, files_to_index: Dict[str, str]) -> bool:
+        streaming_config = cls._get_config()
+        return streaming_config.get("ENABLED", True) and len(files_to_index) >= (
+            streaming_config.get("MIN_FILES") or 20000
+        )
+
+    def _get_file_sizes(self, file_paths: List[str]) -> Dict[str, int]:
+        file_sizes: Dict[str, int] = {}
+        for file_path in file_paths:
+            try:
+                file_sizes[file_path] = (Path(self.repo_path) / file_path).stat().st_size
+            except OSError:
+                file_sizes[file_path] = 0
+        return file_sizes
+
+    async def _discover(self) -> None:
+        max_batch_bytes = self.memory_budget_bytes / self.bytes_per_source_byte
+        batch: Dict[str, str] = {}
+        batch_bytes = 0
+        file_paths = list(self.files_to_index)
+        for start in range(0, len(file_paths), self.STAT_GROUP_SIZE):
+            file_sizes = await asyncio.to_thread(self._get_file_sizes, file_paths[start : start + self.STAT_GROUP_SIZE])
+            for file_path, file_size in file_sizes.items():
+                if batch and (batch_bytes + file_size > max_batch_bytes or len(batch) >= self.max_batch_files):
+                    await self.batches.put((batch, batch_bytes))
+                    batch, batch_bytes = {}, 0
+                batch[file_path] = self.files_to_index[file_path]
+                batch_bytes += file_size
+                self.files_discovered += 1
+        if batch:
+            await self.batches.put((batch, batch_bytes))
+        await self.batches.put(None)
+
+    async def _get_next_batch(self, discover_task: "asyncio.Task[None]") -> Optional[Tuple[Dict[str, str], int]]:
+        get_task = asyncio.create_task(self.batches.get())
+        try:
+            await asyncio.wait({get_task, discover_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not get_task.done():
+                get_task.cancel()
+        if get_task.done() and not get_task.cancelled():
+            return get_task.result()
+        # a discover stage that fails never queues the end of the batches, surface its error instead
+        discover_task.result()
+        return await self.batches.get()
+
+    def get_summary(self) -> Dict[str, int]:
+        """Counts of the repo's chunkable files per indexing status, the in-flight batch's by their live status."""
+        batch_statuses = (
+            [file_status.get("status") for file_status in self.current_batch_statuses.values()]
+            if self.current_batch_in_flight
+            else []
+        )
+        files_in_progress = len(self.files_to_index) - self.files_done
+        return {
+            "files_total": self.files_up_to_date + self.files_skipped + len(self.files_to_index),
+            "files_completed": self.files_up_to_date + self.files_completed + batch_statuses.count("COMPLETED"),
+            "files_failed": self.files_failed + batch_statuses.count("FAILED"),
+            "files_skipped": self.files_skipped,
+            "files_in_progress": files_in_progress - batch_statuses.count("COMPLETED") - batch_statuses.count("FAILED"),
+        }
+
+    def _get_progress(self, batch_files: int, batch_progress_bar: ObservableProgressBar) -> float:
+        batch_done = batch_files * batch_progress_bar.total_percentage / 100
+        return min(100.0, (self.files_done + batch_done) * 100 / max(1, len(self.files_to_index)))
+
+    async def _report_progress(
+        self,
+        batch_files: int,
+        indexing_progressbar: ObservableProgressBar,
+        embedding_progressbar: ObservableProgressBar,
+    ) -> None:
+        min_interval, max_interval = self.progress_intervals
+        try:
+            while True:
+                await self.indexing_progress_callback(
+                    self._get_progress(batch_files, indexing_progressbar),
+                    self.current_batch_statuses,
+                    self.get_summary(),
+                )
+                if self.embedding_progress_callback:
+                    await self.embedding_progress_callback(self._get_progress(batch_files, embedding_progressbar))
+                await indexing_progressbar.wait_for_change(min_interval, max_interval)
+        except asyncio.CancelledError:
+            return
+
+    async def _index_batch(self, batch: Dict[str, str], batch_bytes: int) -> None:
+        self.current_batch_files = len(batch)
+        self.current_batch_bytes = int(batch_bytes * self.bytes_per_source_byte)
+        self.current_batch_statuses = {
+            file_path: {"file_path": file_path, "status": "IN_PROGRESS"} for file_path in batch
+        }
+        file_indexing_monitor = FileIndexingMonitor(files_with_indexing_status=self.current_batch_statuses)
+        self.current_batch_statuses = file_indexing_monitor.files_with_indexing_status
+        self.current_batch_in_flight = True
+        indexing_progressbar = ObservableProgressBar()
+        embedding_progressbar = ObservableProgressBar()
+        report_task = asyncio.create_task(
+            self._report_progress(len(batch), indexing_progressbar, embedding_progressbar)
+        )
+        try:
+            # embeddings are awaited per batch, so the next batch only starts once this one's memory is released
+            await self.initialization_manager.prefill_vector_store(
+                batch,
+                indexing_progressbar=indexing_progressbar,
+                embedding_progressbar=embedding_progressbar,
+                file_indexing_progress_monitor=file_indexing_monitor,
+                enable_refresh=self.enable_refresh,
+            )
+            embedded = await embedding_progressbar.wait_until_completed(self.embedding_max_wait_seconds)
+        finally:
+            report_task.cancel()
+
+        batch_statuses = [file_status.get("status") for file_status in self.current_batch_statuses.values()]
+        self.files_completed += batch_statuses.count("COMPLETED")
+        self.files_failed += batch_statuses.count("FAILED")
+        self.current_batch_in_flight = False
+        self.files_done += len(batch)
+        self.batches_done += 1
+        if self.checkpoint is not None:
+            completed_files = {
+                file_path: file_hash
+                for file_path, file_hash in batch.items()
+                if self.current_batch_statuses.get(file_path, {}).get("status") == "COMPLETED"
+            }
+            # files whose embeddings didn't complete in time stay pending, a resumed run indexes them again
+            if embedded:
+                self.checkpoint.record_embedded(completed_files)
+            else:
+                self.checkpoint.record_chunked(completed_files)
+            await IndexingCheckpointService.save(self.checkpoint)
+
+        batch_priority_files = len([file_path for file_path in self.priority_files if file_path in batch])
+        self.pending_priority_files -= batch_priority_files
+        if batch_priority_files and not embedded and self.partial_ready_callback:
+            # the priority files aren't searchable yet, they'll be ready with the rest of the repo
+            AppLogger.log_info(
+                f"Embeddings of priority files of {self.repo_path} did not complete in time, not signalling them as ready"
+            )
+            self.partial_ready_callback = None
+        if self.partial_ready_callback and self.priority_files and self.pending_priority_files <= 0:
+            await self.partial_ready_callback(self.priority_files)
+            self.partial_ready_callback = None
+
+    async def run(self) -> None:
+        AppLogger.log_info(f"Streaming indexing of {len(self.files_to_index)} files of {self.repo_path}")
+        self._pipelines[self.repo_path] = self
+        discover_task = asyncio.create_task(self._discover())
+        try:
+            while (discovered_batch := await self._get_next_batch(discover_task)) is not None:
+                await self._index_batch(*discovered_batch)
+            await discover_task
+            await self.indexing_progress_callback(100, self.current_batch_statuses, self.get_summary())
+            if self.embedding_progress_callback:
+                await self.embedding_progress_callback(100)
+        finally:
+            discover_task.cancel()
+            if self._pipelines.get(self.repo_path) is self:
+                del self._pipelines[self.repo_path]
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "files_total": len(self.files_to_index),
+            "files_discovered": self.files_discovered,
+            "files_done": self.files_done,
+            "files_failed": self.files_failed,
+            "batches_done": self.batches_done,
+            "queued_batches": self.batches.qsize(),
+            "max_queued_batches": self.batches.maxsize,
+            "current_batch_files": self.current_batch_files,
+            "current_batch_estimated_bytes": self.current_batch_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 2),
+        }
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        return {repo_path: pipeline.get_status() for repo_path, pipeline in cls._pipelines.items()}
@@ -6,14 +6,14 @@ import html2text
 from bs4 import BeautifulSoup, Tag
 from requests.structures import CaseInsensitiveDict
 
-from app.clients.web_client import WebClient
+from app.clients.client_registry import ClientRegistry
 from app.models.dtos.collection_dtos.urls_content_dto import CacheHeaders, UrlsContentDto
 
 
 class HtmlScrapper:
     def __init__(self, timeout: int = 10):
         self.headers = {"User-Agent": "Mozilla/5.0"}
-        self.web_client = WebClient()
+        self.web_client = ClientRegistry.web_client()
 
     async def fetch_html(self, url: str, headers=None) -> Tuple[str, CaseInsensitiveDict, str]:
         if headers is None:
@@ -8,7 +8,7 @@ from deputydev_core.services.initialization.extension_initialisation_manager imp
 from deputydev_core.utils.config_manager import ConfigManager
 from deputydev_core.utils.weaviate import get_weaviate_client
 
-from app.clients.one_dev_client import OneDevClient
+from app.clients.client_registry import ClientRegistry
 from app.models.dtos.collection_dtos.urls_content_dto import UrlsContentDto
 from app.repository.urls_content_repository import UrlsContentRepository
 from app.services.url_service.helpers.html_scrapper import HtmlScrapper
@@ -99,7 +99,7 @@ class PublicUrlManager(UrlManager):
 
     async def _summarize_content(self, content, payload, headers):
         payload = {"content": content}
-        summarize_content = await OneDevClient().summarize_url_content(payload, headers)
+        summarize_content = await ClientRegistry.one_dev_client().summarize_url_content(payload, headers)
         return summarize_content
 
     def _format_urls_content(self, url_contents: Dict[str, str]) -> str:
@@ -151,5 +151,5 @@ class PublicUrlManager(UrlManager):
     async def _save_url_in_backend(self, payload: "UrlsContentDto") -> dict:
         data = payload.model_dump(include=set(self.BACKEND_FIELDS))
         data["last_indexed"] = data["last_indexed"].isoformat() if data["last_indexed"] else None
-        url = await OneDevClient().save_url(data)
+        url = await ClientRegistry.one_dev_client().save_url(data)
         return url
@@ -5,7 +5,7 @@ from deputydev_core.services.initialization.extension_initialisation_manager imp
 )
 from deputydev_core.utils.weaviate import get_weaviate_client
 
-from app.clients.one_dev_client import OneDevClient
+from app.clients.client_registry import ClientRegistry
 from app.models.dtos.collection_dtos.urls_content_dto import UrlsContentDto
 from app.repository.urls_content_repository import UrlsContentRepository
 from app.services.url_service.helpers.url_serializer import UrlSerializer
@@ -47,10 +47,10 @@ class UrlService:
         await UrlsContentRepository(weaviate_client).delete_url(url_id)
 
     async def delete_url_from_backend(self, url_id: int):
-        await OneDevClient().delete_url(url_id)
+        await ClientRegistry.one_dev_client().delete_url(url_id)
 
     async def list_urls(self, payload: "ListUrlParams"):
-        urls_objects = await OneDevClient().list_urls(payload.model_dump())
+        urls_objects = await ClientRegistry.one_dev_client().list_urls(payload.model_dump())
         return urls_objects if urls_objects else []
 
     async def update_url(self, payload: "UpdateUrlParams"):
@@ -61,7 +61,7 @@ class UrlService:
         return parsed_url_model
 
     async def update_url_in_backend(self, payload: "UpdateUrlParams") -> dict:
-        url_dict = await OneDevClient().update_url(payload.url.model_dump())
+        url_dict = await ClientRegistry.one_dev_client().update_url(payload.url.model_dump())
         return url_dict
 
     async def refill_urls_data(self):
@@ -70,7 +70,7 @@ class UrlService:
         all_url_objects = []
         weaviate_client = await self.get_weaviate_client()
         while True:
-            urls_data = await OneDevClient().list_urls(params={"limit": limit, "offset": offset})
+            urls_data = await ClientRegistry.one_dev_client().list_urls(params={"limit": limit, "offset": offset})
             url_dicts = urls_data["urls"]
             if not url_dicts:
                 break  # no more data
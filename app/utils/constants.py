@@ -1,6 +1,8 @@
 from enum import Enum
+from pathlib import Path
 
 CONFIG_PATH = "./binary_config.json"
+LOCAL_STORE_DIR = Path.home() / ".deputydev" / "binary"
 
 
 class ListenerEventTypes(Enum):
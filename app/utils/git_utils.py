@@ -0,0 +1,25 @@
+import asyncio
+import hashlib
+from typing import Optional
+
+
+async def run_git(repo_path: str, *args: str, stdin: Optional[bytes] = None) -> Optional[bytes]:
+    """Runs a git command in the repo and returns its stdout, or None if git is missing or the command failed."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            cwd=repo_path,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await process.communicate(stdin)
+    except OSError:
+        return None
+    return stdout if process.returncode == 0 else None
+
+
+def git_blob_hash(content: bytes) -> str:
+    """The object ID git assigns to a blob with exactly this content, same as `git hash-object --no-filters`."""
+    return hashlib.sha1(f"blob {len(content)}\0".encode() + content).hexdigest()
@@ -0,0 +1,34 @@
+from typing import Dict, List, Tuple
+
+
+class IndexingStatusMode:
+    SNAPSHOT = "SNAPSHOT"
+    DELTA = "DELTA"
+    # the statuses of the batch being indexed only, alongside a summary of the whole repo
+    BATCH = "BATCH"
+
+
+class IndexingStatusTracker:
+    """
+    Tracks which file indexing statuses were already sent to a client, so that after one full snapshot only
+    the files whose status changed since the previous message need to be sent.
+    """
+
+    def __init__(self) -> None:
+        self._last_sent_statuses: Dict[str, str] = {}
+        self._snapshot_sent = False
+
+    def get_changes(self, files_with_indexing_status: Dict[str, Dict[str, str]]) -> Tuple[str, List[Dict[str, str]]]:
+        if not self._snapshot_sent:
+            self._snapshot_sent = True
+            self._last_sent_statuses = {
+                file_path: file_status["status"] for file_path, file_status in files_with_indexing_status.items()
+            }
+            return IndexingStatusMode.SNAPSHOT, list(files_with_indexing_status.values())
+
+        changed_files: List[Dict[str, str]] = []
+        for file_path, file_status in files_with_indexing_status.items():
+            if self._last_sent_statuses.get(file_path) != file_status["status"]:
+                self._last_sent_statuses[file_path] = file_status["status"]
+                changed_files.append(file_status)
+        return IndexingStatusMode.DELTA, changed_files
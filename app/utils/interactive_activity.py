@@ -0,0 +1,111 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# whether the current context already tracks an interactive request, nested tracking counts it once
+_tracking: ContextVar[bool] = ContextVar("interactive_tracking", default=False)
+
+
+class InteractiveActivity:
+    """
+    Tracks interactive requests (focus and grep search, relevant chunks, file reads) so background work can yield to
+    them: callers wrap interactive work in `track()`, background jobs wait in `wait_until_idle` before starting a
+    batch.
+
+    The latencies of the last LATENCY_SAMPLES requests are kept per `background_state`, the background work that
+    ran while they were served, so the cost of indexing on interactive latency can be compared.
+    """
+
+    LATENCY_SAMPLES = 1000
+
+    in_flight = 0
+    last_active_at = 0.0
+    background_state = "IDLE"
+    _idle: Optional[asyncio.Event] = None
+    _busy: Optional[asyncio.Event] = None
+    _latencies: Dict[str, Deque[float]] = {}
+
+    @classmethod
+    def _get_idle_event(cls) -> asyncio.Event:
+        if cls._idle is None:
+            cls._idle = asyncio.Event()
+            cls._idle.set()
+        return cls._idle
+
+    @classmethod
+    def _get_busy_event(cls) -> asyncio.Event:
+        if cls._busy is None:
+            cls._busy = asyncio.Event()
+        return cls._busy
+
+    @classmethod
+    @asynccontextmanager
+    async def track(cls) -> AsyncIterator[None]:
+        if _tracking.get():
+            yield
+            return
+        token = _tracking.set(True)
+        cls.in_flight += 1
+        cls._get_idle_event().clear()
+        cls._get_busy_event().set()
+        background_state = cls.background_state
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            _tracking.reset(token)
+            cls.in_flight -= 1
+            cls.last_active_at = time.monotonic()
+            cls._latencies.setdefault(background_state, deque(maxlen=cls.LATENCY_SAMPLES)).append(
+                cls.last_active_at - started_at
+            )
+            if cls.in_flight == 0:
+                cls._get_busy_event().clear()
+                cls._get_idle_event().set()
+
+    @classmethod
+    async def wait_until_busy(cls) -> None:
+        """Waits until an interactive request is running."""
+        await cls._get_busy_event().wait()
+
+    @classmethod
+    async def wait_until_idle(cls, quiet_seconds: float) -> None:
+        """Waits until no interactive request is running and none finished in the last `quiet_seconds`."""
+        while True:
+            if cls.in_flight:
+                await cls._get_idle_event().wait()
+                continue
+            remaining = cls.last_active_at + quiet_seconds - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    @classmethod
+    def get_latency_stats(cls) -> Dict[str, Dict[str, Any]]:
+        latency_stats: Dict[str, Dict[str, Any]] = {}
+        for background_state, latencies in cls._latencies.items():
+            sorted_latencies = sorted(latencies)
+            latency_stats[background_state] = {
+                "requests": len(sorted_latencies),
+                "p50_ms": round(sorted_latencies[math.ceil(0.5 * len(sorted_latencies)) - 1] * 1000, 1),
+                "p95_ms": round(sorted_latencies[math.ceil(0.95 * len(sorted_latencies)) - 1] * 1000, 1),
+            }
+        return latency_stats
+
+
+def interactive(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorator tracking every call of an async function as interactive activity."""
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        async with InteractiveActivity.track():
+            return await func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from typing import Any
+
+from deputydev_core.utils.custom_progress_bar import CustomProgressBar
+
+
+class ObservableProgressBar(CustomProgressBar):
+    """
+    CustomProgressBar that signals an asyncio event whenever any of its attributes change, so progress monitors
+    can sleep until something actually happens instead of polling on a fixed interval.
+
+    Must be created from within a running event loop; changes made from other threads are marshalled onto it.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        object.__setattr__(self, "_observable_changed", asyncio.Event())
+        object.__setattr__(self, "_observable_loop", asyncio.get_running_loop())
+        object.__setattr__(self, "_observable_thread_id", threading.get_ident())
+        super().__init__(*args, **kwargs)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        self.notify_change()
+
+    def notify_change(self) -> None:
+        if threading.get_ident() == self._observable_thread_id:
+            self._observable_changed.set()
+        else:
+            self._observable_loop.call_soon_threadsafe(self._observable_changed.set)
+
+    async def wait_for_change(self, min_interval: float, max_interval: float) -> None:
+        """
+        Waits until the progress bar changes, then keeps coalescing further changes until `min_interval` seconds
+        have passed since the call. Completion ends the wait immediately, and `max_interval` bounds the wait even
+        if nothing changes.
+        """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            await asyncio.wait_for(self._observable_changed.wait(), timeout=max_interval)
+        except asyncio.TimeoutError:
+            return
+        self._observable_changed.clear()
+
+        while not self.is_completed():
+            remaining = started_at + min_interval - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._observable_changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+            self._observable_changed.clear()
+
+    async def wait_until_completed(self, max_wait_seconds: float) -> bool:
+        """Waits until the progress bar completes, for at most `max_wait_seconds`. Returns whether it completed."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait_seconds
+        while not self.is_completed():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await self.wait_for_change(0, remaining)
+        return True
@@ -1,7 +1,9 @@
+import asyncio
 import platform
 import stat
 import sys
 from pathlib import Path
+from typing import List
 
 
 def ensure_executable(path: Path) -> None:
@@ -55,3 +57,22 @@ def get_rg_path() -> str:
 
     ensure_executable(rg_path)
     return str(rg_path)
+
+
+async def list_repo_files(repo_path: str) -> List[str]:
+    """List the files of a repo relative to its root, honouring .gitignore and other ignore rules."""
+    process = await asyncio.create_subprocess_exec(
+        get_rg_path(),
+        "--files",
+        "--hidden",
+        "--glob",
+        "!.git",
+        cwd=repo_path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await process.communicate()
+    # rg exits with 1 when there are no files and 2 when some paths couldn't be read
+    if process.returncode not in (0, 1, 2):
+        raise RuntimeError(f"rg exited with code {process.returncode}")
+    return stdout.decode(errors="replace").splitlines()
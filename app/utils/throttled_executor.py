@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Optional, Tuple
+
+
+class ThrottledExecutor(Executor):
+    """
+    Executor facade over a shared executor that keeps at most `get_limit()` of its own tasks running on it at once,
+    queueing the others, so one consumer of the shared pool can be slowed down without touching the pool itself.
+
+    The limit is read again whenever a task finishes, and `on_limit_changed()` re-reads it right away, so it can
+    change at any time. Tasks are only handed to the shared executor, and `on_task_finished` is only called, from
+    the event loop thread the facade was created on. Shutting the facade down never shuts the shared executor down.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        get_limit: Callable[[], int],
+        on_task_finished: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.executor = executor
+        self.get_limit = get_limit
+        self.on_task_finished = on_task_finished
+        self.loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        # (caller's future, fn, args, kwargs) of the tasks waiting for a slot
+        self._pending: Deque[Tuple[Future[Any], Callable[..., Any], Tuple[Any, ...], Any]] = deque()
+        self.in_flight = 0
+        self.tasks_finished = 0
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future[Any]:
+        future: Future[Any] = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._pending.append((future, fn, args, kwargs))
+        self._drain_threadsafe()
+        return future
+
+    def _call_on_loop(self, callback: Callable[[], None]) -> None:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            callback()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback)
+
+    def _drain_threadsafe(self) -> None:
+        self._call_on_loop(self._drain)
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending or self.in_flight >= self.get_limit():
+                    return
+                future, fn, args, kwargs = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self.in_flight += 1
+            try:
+                inner_future = self.executor.submit(fn, *args, **kwargs)
+            except Exception as ex:  # noqa: BLE001
+                self._on_done(future, None, ex)
+                continue
+            inner_future.add_done_callback(lambda done, future=future: self._on_done(future, done, None))
+
+    def _on_done(
+        self, future: Future[Any], inner_future: Optional[Future[Any]], error: Optional[BaseException]
+    ) -> None:
+        # runs on the shared executor's management thread, the callback and the drain touch loop state
+        with self._lock:
+            self.in_flight -= 1
+            self.tasks_finished += 1
+        if inner_future is not None:
+            if inner_future.cancelled():
+                error = RuntimeError("Task was cancelled by the shared executor")
+            else:
+                error = inner_future.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(inner_future.result() if inner_future is not None else None)
+        self._call_on_loop(self._after_task_finished)
+
+    def _after_task_finished(self) -> None:
+        if self.on_task_finished:
+            self.on_task_finished()
+        self._drain()
+
+    def on_limit_changed(self) -> None:
+        self._drain_threadsafe()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+            if not cancel_futures:
+                return
+            pending, self._pending = list(self._pending), deque()
+        for future, *_ in pending:
+            future.cancel()
@@ -64,3 +64,15 @@ def hash_content(content: str, strip_content: bool = False) -> str:
     if strip_content:
         content = content.strip()
     return hashlib.sha256(content.encode()).hexdigest()
+
+
+def score_keyword_match(keyword: str, value: str) -> float:
+    """Case-insensitive match score of an autocomplete keyword against a value: exact > prefix > substring."""
+    keyword, value = keyword.lower(), value.lower()
+    if value == keyword:
+        return 1.0
+    if value.startswith(keyword):
+        return 0.8
+    if keyword in value:
+        return 0.5
+    return 0.0
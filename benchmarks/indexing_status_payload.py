@@ -0,0 +1,69 @@
+"""
+Compares the size and serialization time of update_chunks indexing progress messages when the full indexing
+status is re-sent on every tick versus one snapshot followed by deltas (`indexing_status_delta=True`).
+
+Usage: python -m benchmarks.indexing_status_payload [--files 50000] [--changes-per-tick 500]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.utils.indexing_status_tracker import IndexingStatusTracker
+
+
+def simulate(
+    number_of_files: int, changes_per_tick: int, build_message: Callable[[Dict[str, Dict[str, str]]], dict]
+) -> Tuple[int, int, float]:
+    files_with_indexing_status = {
+        f"src/module_{index // 100}/file_{index}.py": {
+            "file_path": f"src/module_{index // 100}/file_{index}.py",
+            "status": "IN_PROGRESS",
+        }
+        for index in range(number_of_files)
+    }
+    file_paths: List[str] = list(files_with_indexing_status)
+    ticks, total_bytes, total_seconds = 0, 0, 0.0
+    for start in range(0, number_of_files + changes_per_tick, changes_per_tick):
+        for file_path in file_paths[start : start + changes_per_tick]:
+            files_with_indexing_status[file_path]["status"] = "COMPLETED"
+        started_at = time.perf_counter()
+        message = json.dumps(build_message(files_with_indexing_status))
+        total_seconds += time.perf_counter() - started_at
+        total_bytes += len(message)
+        ticks += 1
+    return ticks, total_bytes, total_seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--changes-per-tick", type=int, default=500)
+    args = parser.parse_args()
+
+    def full_message(indexing_status: Dict[str, Dict[str, str]]) -> dict:
+        return {"task": "INDEXING", "status": "IN_PROGRESS", "indexing_status": list(indexing_status.values())}
+
+    tracker = IndexingStatusTracker()
+
+    def delta_message(indexing_status: Dict[str, Dict[str, str]]) -> dict:
+        mode, changed_files = tracker.get_changes(indexing_status)
+        return {
+            "task": "INDEXING",
+            "status": "IN_PROGRESS",
+            "indexing_status": changed_files,
+            "indexing_status_mode": mode,
+        }
+
+    for name, build_message in (("full", full_message), ("delta", delta_message)):
+        ticks, total_bytes, total_seconds = simulate(args.files, args.changes_per_tick, build_message)
+        sys.stdout.write(
+            f"{name:>5}: {ticks} messages, {total_bytes / 1024 / 1024:.2f} MiB total, "
+            f"{total_bytes / ticks / 1024:.1f} KiB/message, {total_seconds * 1000 / ticks:.2f} ms/message\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
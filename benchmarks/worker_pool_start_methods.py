@@ -0,0 +1,108 @@
+"""
+Compares the chunking worker pool under the fork and forkserver start methods: the time until every worker
+answered its first task, and each worker's resident and proportional memory (RSS / PSS, from /proc on Linux).
+PSS splits shared pages between the processes sharing them, so it grows as copy-on-write sharing breaks.
+
+A ballast allocated in the parent, and churned while the workers run, stands in for the Sanic server heap, which
+fork workers inherit and forkserver workers don't. Workers start with the pool's real initializer and import the
+WORKER_POOL.PRELOAD_MODULES, the parent imports them too, as the server has.
+
+The workers stay idle, so the figures are a floor: the parse trees and chunks of real chunking tasks come on top,
+about equally for both start methods. Preload modules that aren't installed are reported, the figures leave out
+their memory.
+
+Usage: python -m benchmarks.worker_pool_start_methods [--workers 4] [--parent-heap-mb 300] [--rounds 3]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.services.process_pool_manager import ProcessPoolManager, init_worker
+
+
+def import_preload_modules() -> List[str]:
+    """Imports the preload modules, returns the ones that aren't installed."""
+    missing_modules: List[str] = []
+    for module_name in ProcessPoolManager.get_preload_modules():
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            missing_modules.append(module_name)
+    return missing_modules
+
+
+def get_memory_kib() -> Tuple[int, int]:
+    """(RSS, PSS) of the calling process in KiB, 0 where /proc isn't available."""
+    memory_kib = {"Rss": 0, "Pss": 0}
+    try:
+        for line in Path("/proc/self/smaps_rollup").read_text().splitlines():
+            name, _, value = line.partition(":")
+            if name in memory_kib:
+                memory_kib[name] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory_kib["Rss"], memory_kib["Pss"]
+
+
+def probe_worker(delay_seconds: float) -> Tuple[int, int, int]:
+    import_preload_modules()
+    # keeps the worker busy, so every task of the first round lands on a different worker
+    time.sleep(delay_seconds)
+    return (os.getpid(), *get_memory_kib())
+
+
+def churn(ballast: List[bytearray]) -> None:
+    # rewrite the parent heap, as a busy server does, so pages shared with fork workers get copied
+    for block in ballast:
+        block[::4096] = b"\1" * len(block[::4096])
+
+
+def measure(start_method: str, workers: int, ballast: List[bytearray]) -> Tuple[float, Dict[int, Tuple[int, int]]]:
+    started_at = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ProcessPoolManager.get_mp_context(start_method),
+        initializer=init_worker,
+        initargs=(0, None),
+    ) as pool:
+        list(pool.map(probe_worker, [0.2] * workers))
+        spawn_seconds = time.perf_counter() - started_at - 0.2
+        churn(ballast)
+        results = list(pool.map(probe_worker, [0.2] * workers))
+    return spawn_seconds, {pid: (rss_kib, pss_kib) for pid, rss_kib, pss_kib in results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--parent-heap-mb", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    missing_modules = import_preload_modules()
+    if missing_modules:
+        sys.stdout.write(f"preload modules not installed, left out of the figures: {', '.join(missing_modules)}\n")
+    ballast = [bytearray(1024 * 1024) for _ in range(args.parent_heap_mb)]
+    churn(ballast)
+    for start_method in ("fork", "forkserver"):
+        if ProcessPoolManager.get_mp_context(start_method) is None:
+            sys.stdout.write(f"{start_method:>10}: not available on this platform\n")
+            continue
+        for round_number in range(1, args.rounds + 1):
+            spawn_seconds, memory = measure(start_method, args.workers, ballast)
+            average_rss_mib = sum(rss_kib for rss_kib, _ in memory.values()) / len(memory) / 1024
+            average_pss_mib = sum(pss_kib for _, pss_kib in memory.values()) / len(memory) / 1024
+            sys.stdout.write(
+                f"{start_method:>10} round {round_number}: {len(memory)} workers up in {spawn_seconds * 1000:.0f} ms, "
+                f"{average_rss_mib:.1f} MiB RSS / {average_pss_mib:.1f} MiB PSS per worker\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
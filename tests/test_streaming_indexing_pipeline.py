@@ -0,0 +1,51 @@
+import unittest
+from typing import Any, Dict
+from unittest.mock import AsyncMock, patch
+
+from deputydev_core.utils.config_manager import ConfigManager
+
+from app.services.indexing_checkpoint_service import IndexingCheckpoint, IndexingCheckpointService
+from app.services.streaming_indexing_pipeline import StreamingIndexingPipeline
+
+
+class ChunkOnlyInitializationManager:
+    """Chunks every file of a batch but never completes its embeddings."""
+
+    async def prefill_vector_store(self, batch: Dict[str, str], **kwargs: Any) -> None:
+        statuses = kwargs["file_indexing_progress_monitor"].files_with_indexing_status
+        for file_path in batch:
+            statuses[file_path]["status"] = "COMPLETED"
+
+
+class StreamingIndexingPipelineCheckpointTest(unittest.IsolatedAsyncioTestCase):
+    async def test_files_stay_pending_when_embedding_wait_times_out(self) -> None:
+        files_to_index = {"a.py": "hash-a", "b.py": "hash-b"}
+        checkpoint = IndexingCheckpoint("/repo", "version", {}, {})
+        configs = {"STREAMING_INDEXING": {"EMBEDDING_MAX_WAIT_SECONDS": 0.01}}
+        with (
+            patch.object(ConfigManager, "configs", configs),
+            patch.object(IndexingCheckpointService, "save", AsyncMock()),
+        ):
+            pipeline = StreamingIndexingPipeline(
+                initialization_manager=ChunkOnlyInitializationManager(),
+                repo_path="/repo",
+                files_to_index=files_to_index,
+                files_up_to_date=0,
+                files_skipped=0,
+                priority_files=[],
+                checkpoint=checkpoint,
+                indexing_progress_callback=AsyncMock(),
+                embedding_progress_callback=None,
+                partial_ready_callback=None,
+                progress_intervals=(0.01, 0.01),
+                enable_refresh=False,
+            )
+            await pipeline.run()
+
+        self.assertEqual(checkpoint.chunked, files_to_index)
+        self.assertEqual(checkpoint.embedded, {})
+        self.assertEqual(checkpoint.get_pending_files(files_to_index), files_to_index)
+
+
+if __name__ == "__main__":
+    unittest.main()